@@ -0,0 +1,650 @@
+'''
+Typed node classes of an AST. Nodes keep their fields in __slots__ and their node type
+in the class, so they take less memory than the equivalent tuples, and fields are read
+by name instead of by position. The tuple shape of a node, such as
+('FUNCTION_DEFINITION', name, parameters, body), can still be produced with to_tuple.
+Statement nodes also keep the line of the statement, which is not one of their fields.
+
+@author Nicolás Rodrigo Pèrez
+@date 17-10-2026
+@version 1.0
+'''
+
+
+'''
+Base class of all the AST nodes. Subclasses define the node type as the kind
+class attribute, and the node fields, in the order of the tuple shape, as fields.
+'''
+class Node:
+
+    __slots__ = ()
+    kind = None
+    fields = ()
+
+
+    '''
+    Child nodes of the node, in the order of its fields.
+
+    @rtype: list
+    @returns: list of child nodes
+    '''
+    def children(self):
+        children = []
+        for field in self.fields:
+            value = getattr(self, field)
+            if isinstance(value, Node):
+                children.append(value)
+            elif isinstance(value, list):
+                children.extend(value)
+        return children
+
+
+    def __repr__(self):
+        return repr(to_tuple(self))
+
+
+'''
+Leaf node holding the value of a token, its node type being the kind of the token.
+'''
+class Leaf(Node):
+
+    __slots__ = ('value',)
+    fields = ('value',)
+
+
+    '''
+    Create new Leaf object.
+
+    @type value: str
+    @param value: value of the token
+    '''
+    def __init__(self, value):
+        self.value = value
+
+
+class Identifier(Leaf):
+    __slots__ = ()
+    kind = 'IDENTIFIER'
+
+
+class SelfIdentifier(Leaf):
+    __slots__ = ()
+    kind = 'SELF_IDENTIFIER'
+
+
+class SelfReference(Leaf):
+    __slots__ = ()
+    kind = 'SELF'
+
+
+class ClassIdentifier(Leaf):
+    __slots__ = ()
+    kind = 'CLASS_IDENTIFIER'
+
+
+class Number(Leaf):
+    __slots__ = ()
+    kind = 'NUMBER'
+
+
+class String(Leaf):
+    __slots__ = ()
+    kind = 'STRING'
+
+
+class NoneLiteral(Leaf):
+    __slots__ = ()
+    kind = 'NONE'
+
+
+class TrueLiteral(Leaf):
+    __slots__ = ()
+    kind = 'TRUE'
+
+
+class FalseLiteral(Leaf):
+    __slots__ = ()
+    kind = 'FALSE'
+
+
+class Program(Node):
+
+    __slots__ = ('statements',)
+    kind = 'PROGRAM'
+    fields = __slots__
+
+
+    '''
+    Create new Program object.
+
+    @type statements: list
+    @param statements: list of statement nodes
+    '''
+    def __init__(self, statements):
+        self.statements = statements
+
+
+class Import(Node):
+
+    fields = ('imported',)
+    __slots__ = fields + ('line',)
+    kind = 'IMPORT'
+
+
+    '''
+    Create new Import object.
+
+    @type imported: Node
+    @param imported: imported expression
+
+    @type line: int
+    @param line: line of the statement, 0 if unknown
+    '''
+    def __init__(self, imported, line=0):
+        self.imported = imported
+        self.line = line
+
+class As(Node):
+
+    __slots__ = ('identifier', 'expression')
+    kind = 'AS'
+    fields = __slots__
+
+
+    '''
+    Create new As object.
+
+    @type identifier: Leaf
+    @param identifier: alias of the expression
+
+    @type expression: Node
+    @param expression: aliased expression
+    '''
+    def __init__(self, identifier, expression):
+        self.identifier = identifier
+        self.expression = expression
+
+
+class Assignment(Node):
+
+    fields = ('identifier', 'value')
+    __slots__ = fields + ('line',)
+    kind = 'ASSIGNMENT'
+
+
+    '''
+    Create new Assignment object.
+
+    @type identifier: Leaf
+    @param identifier: assigned identifier
+
+    @type value: Node
+    @param value: assigned expression
+
+    @type line: int
+    @param line: line of the statement, 0 if unknown
+    '''
+    def __init__(self, identifier, value, line=0):
+        self.identifier = identifier
+        self.value = value
+        self.line = line
+
+class SelfAssignment(Assignment):
+    __slots__ = ()
+    kind = 'SELF_ASSIGNMENT'
+
+
+class ClassAssignment(Node):
+
+    fields = ('identifier', 'class_name', 'arguments')
+    __slots__ = fields + ('line',)
+    kind = 'CLASS_ASSIGNMENT'
+
+
+    '''
+    Create new ClassAssignment object.
+
+    @type identifier: Leaf
+    @param identifier: assigned identifier
+
+    @type class_name: Leaf
+    @param class_name: instantiated class
+
+    @type arguments: list
+    @param arguments: list of argument nodes
+
+    @type line: int
+    @param line: line of the statement, 0 if unknown
+    '''
+    def __init__(self, identifier, class_name, arguments, line=0):
+        self.identifier = identifier
+        self.class_name = class_name
+        self.arguments = arguments
+        self.line = line
+
+class SelfClassAssignment(ClassAssignment):
+    __slots__ = ()
+    kind = 'SELF_CLASS_ASSIGNMENT'
+
+
+class AttributeAccess(Node):
+
+    fields = ('target', 'attributes')
+    __slots__ = fields + ('line',)
+    kind = 'ATTRIBUTE_ACCESS'
+
+
+    '''
+    Create new AttributeAccess object.
+
+    @type target: Node
+    @param target: node whose attributes are accessed
+
+    @type attributes: list
+    @param attributes: list of accessed attribute nodes
+
+    @type line: int
+    @param line: line of the statement, 0 if unknown
+    '''
+    def __init__(self, target, attributes, line=0):
+        self.target = target
+        self.attributes = attributes
+        self.line = line
+
+class SelfAttributeAccess(AttributeAccess):
+    __slots__ = ()
+    kind = 'SELF_ATTRIBUTE_ACCESS'
+
+
+'''
+Attribute access on an expression, as opposed to the attribute access statement.
+'''
+class ExpressionAttributeAccess(AttributeAccess):
+    __slots__ = ()
+    kind = 'ATRIBUTE_ACCESS'
+
+
+class FunctionCall(Node):
+
+    fields = ('function', 'arguments')
+    __slots__ = fields + ('line',)
+    kind = 'FUNCTION_CALL'
+
+
+    '''
+    Create new FunctionCall object.
+
+    @type function: Node
+    @param function: called node
+
+    @type arguments: list
+    @param arguments: list of argument nodes
+
+    @type line: int
+    @param line: line of the statement, 0 if unknown
+    '''
+    def __init__(self, function, arguments, line=0):
+        self.function = function
+        self.arguments = arguments
+        self.line = line
+
+class SelfFunctionCall(FunctionCall):
+    __slots__ = ()
+    kind = 'SELF_FUNCTION_CALL'
+
+
+class IfStatement(Node):
+
+    fields = ('condition', 'body')
+    __slots__ = fields + ('line',)
+    kind = 'IF_STATEMENT'
+
+
+    '''
+    Create new IfStatement object.
+
+    @type condition: Node
+    @param condition: condition expression
+
+    @type body: list
+    @param body: list of statement nodes
+
+    @type line: int
+    @param line: line of the statement, 0 if unknown
+    '''
+    def __init__(self, condition, body, line=0):
+        self.condition = condition
+        self.body = body
+        self.line = line
+
+class ElifStatement(IfStatement):
+    __slots__ = ()
+    kind = 'ELIF_STATEMENT'
+
+
+class ElseStatement(Node):
+
+    fields = ('body',)
+    __slots__ = fields + ('line',)
+    kind = 'ELSE_STATEMENT'
+
+
+    '''
+    Create new ElseStatement object.
+
+    @type body: list
+    @param body: list of statement nodes
+
+    @type line: int
+    @param line: line of the statement, 0 if unknown
+    '''
+    def __init__(self, body, line=0):
+        self.body = body
+        self.line = line
+
+class ForLoop(Node):
+
+    fields = ('identifier', 'iterable', 'body')
+    __slots__ = fields + ('line',)
+    kind = 'FOR_LOOP'
+
+
+    '''
+    Create new ForLoop object.
+
+    @type identifier: Leaf
+    @param identifier: loop variable
+
+    @type iterable: Node
+    @param iterable: iterated expression
+
+    @type body: list
+    @param body: list of statement nodes
+
+    @type line: int
+    @param line: line of the statement, 0 if unknown
+    '''
+    def __init__(self, identifier, iterable, body, line=0):
+        self.identifier = identifier
+        self.iterable = iterable
+        self.body = body
+        self.line = line
+
+class WhileLoop(Node):
+
+    fields = ('condition', 'body')
+    __slots__ = fields + ('line',)
+    kind = 'WHILE_LOOP'
+
+
+    '''
+    Create new WhileLoop object.
+
+    @type condition: Node
+    @param condition: condition expression
+
+    @type body: list
+    @param body: list of statement nodes
+
+    @type line: int
+    @param line: line of the statement, 0 if unknown
+    '''
+    def __init__(self, condition, body, line=0):
+        self.condition = condition
+        self.body = body
+        self.line = line
+
+class ClassDeclaration(Node):
+
+    fields = ('name', 'parent', 'body')
+    __slots__ = fields + ('line', 'slots')
+    kind = 'CLASS_DECLARATION'
+
+
+    '''
+    Create new ClassDeclaration object.
+
+    @type name: Leaf
+    @param name: name of the class
+
+    @type parent: Leaf
+    @param parent: parent class, or None
+
+    @type body: list
+    @param body: list of statement nodes
+
+    @type line: int
+    @param line: line of the statement, 0 if unknown
+    '''
+    def __init__(self, name, parent, body, line=0):
+        self.name = name
+        self.parent = parent
+        self.body = body
+        self.line = line
+        # names of the __slots__ of the class given by the compiler, which are not one of the fields, or None
+        self.slots = None
+
+class FunctionDefinition(Node):
+
+    fields = ('name', 'parameters', 'body')
+    __slots__ = fields + ('line', 'decorators')
+    kind = 'FUNCTION_DEFINITION'
+
+
+    '''
+    Create new FunctionDefinition object.
+
+    @type name: Leaf
+    @param name: name of the function
+
+    @type parameters: list
+    @param parameters: list of parameter nodes
+
+    @type body: list
+    @param body: list of statement nodes
+
+    @type line: int
+    @param line: line of the statement, 0 if unknown
+    '''
+    def __init__(self, name, parameters, body, line=0):
+        self.name = name
+        self.parameters = parameters
+        self.body = body
+        self.line = line
+        # expressions of the decorators added by the compiler, which are not one of the fields
+        self.decorators = []
+
+class Returned(Node):
+
+    fields = ('value',)
+    __slots__ = fields + ('line',)
+    kind = 'RETURNED'
+
+
+    '''
+    Create new Returned object.
+
+    @type value: Node
+    @param value: returned expression
+
+    @type line: int
+    @param line: line of the statement, 0 if unknown
+    '''
+    def __init__(self, value, line=0):
+        self.value = value
+        self.line = line
+
+class Pass(Node):
+
+    __slots__ = ('line',)
+    kind = 'PASS'
+
+
+    '''
+    Create new Pass object.
+
+    @type line: int
+    @param line: line of the statement, 0 if unknown
+    '''
+    def __init__(self, line=0):
+        self.line = line
+
+
+class NotExpression(Node):
+
+    __slots__ = ('operand',)
+    kind = 'NOT_EXPRESSION'
+    fields = __slots__
+
+
+    '''
+    Create new NotExpression object.
+
+    @type operand: Node
+    @param operand: negated expression
+    '''
+    def __init__(self, operand):
+        self.operand = operand
+
+
+'''
+Base class of the nodes of binary operators.
+'''
+class BinaryExpression(Node):
+
+    __slots__ = ('operator', 'left', 'right')
+    fields = __slots__
+
+
+    '''
+    Create new BinaryExpression object.
+
+    @type operator: str
+    @param operator: operator
+
+    @type left: Node
+    @param left: left operand
+
+    @type right: Node
+    @param right: right operand
+    '''
+    def __init__(self, operator, left, right):
+        self.operator = operator
+        self.left = left
+        self.right = right
+
+
+class LogicalExpression(BinaryExpression):
+    __slots__ = ()
+    kind = 'LOGICAL_EXPRESSION'
+
+
+class ComparisonExpression(BinaryExpression):
+    __slots__ = ()
+    kind = 'COMPARISON_EXPRESSION'
+
+
+class Operation(BinaryExpression):
+    __slots__ = ()
+    kind = 'OPERATION'
+
+
+'''
+Collect the node classes defining a node type, indexed by node type.
+
+@type node_class: type
+@param node_class: class whose subclasses are collected
+
+@type node_classes: dict
+@param node_classes: node classes found so far
+
+@rtype: dict
+@returns: node classes indexed by node type
+'''
+def collect_node_classes(node_class, node_classes):
+    for subclass in node_class.__subclasses__():
+        if subclass.kind is not None:
+            node_classes[subclass.kind] = subclass
+        collect_node_classes(subclass, node_classes)
+    return node_classes
+
+
+# node class of each node type
+NODE_CLASSES = collect_node_classes(Node, {})
+
+
+'''
+Get the leaf node class of the given node type, creating it if the node type has no class yet,
+such as for the kinds of the tokens of productions registered on the parser.
+
+@type kind: str
+@param kind: node type
+
+@rtype: type
+@returns: Leaf subclass
+'''
+def leaf_class(kind):
+    node_class = NODE_CLASSES.get(kind)
+    if node_class is None:
+        node_class = type(kind.title().replace('_', ''), (Leaf,), {'__slots__': (), 'kind': kind})
+        NODE_CLASSES[kind] = node_class
+    return node_class
+
+
+'''
+Convert the given AST node to the tuple shape of the node, such as
+('FUNCTION_DEFINITION', name, parameters, body), with its child nodes converted too.
+Nodes are converted without recursion, so deep ASTs can be converted for debugging.
+
+@type node: Node
+@param node: AST node
+
+@rtype: tuple
+@returns: AST node as nested tuples
+'''
+def to_tuple(node):
+    # nodes still to convert, and the [node, children count] frames of the nodes whose children are being converted
+    stack = [node]
+    results = []
+
+    while stack:
+        node = stack.pop()
+        if node.__class__ is list:
+            node, count = node
+            start = len(results) - count
+            children = iter(results[start:])
+            del results[start:]
+            values = [node.kind]
+            for field in node.fields:
+                value = getattr(node, field)
+                if isinstance(value, Node):
+                    value = next(children)
+                elif isinstance(value, list):
+                    value = [next(children) for _ in value]
+                values.append(value)
+            results.append(tuple(values))
+        else:
+            children = node.children()
+            stack.append([node, len(children)])
+            stack.extend(reversed(children))
+
+    return results[-1]
+
+
+'''
+Shift the lines of the given statements, and of the statements nested in their blocks.
+
+@type statements: list
+@param statements: list of statement nodes
+
+@type delta: int
+@param delta: number of lines to shift
+'''
+def shift_lines(statements, delta):
+    stack = list(statements)
+    while stack:
+        statement = stack.pop()
+        statement.line += delta
+        body = getattr(statement, 'body', None)
+        if body is not None:
+            stack.extend(body)
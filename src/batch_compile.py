@@ -0,0 +1,54 @@
+import sys
+import argparse
+from compiler import Compiler
+from compile_cache import CompileCache
+'''
+Compiles the source files of whole directory trees on a pool of worker processes, with
+Compiler.compile_many, printing the time of each file, the failed files and the throughput.
+
+Usage: python batch_compile.py PATH [PATH ...] [-o OUTPUT] [-j WORKERS] [--chunk-size N]
+                               [--optimize] [--cache DIRECTORY] [--quiet]
+
+@author Nicolás Rodrigo Pèrez
+@date 17-10-2026
+@version 1.0
+'''
+
+
+'''
+Parse the command line arguments, compile the given paths and print the report.
+
+@type arguments: list
+@param arguments: command line arguments, the ones of the process if None
+
+@rtype: int
+@returns: exit status, 1 if any file failed to compile
+'''
+def main(arguments=None):
+    argument_parser = argparse.ArgumentParser(description='Compile the python files of the given files and directories.')
+    argument_parser.add_argument('paths', nargs='+', help='source files and directories to compile')
+    argument_parser.add_argument('-o', '--output', help='directory to write the compiled files under, instead of next to their sources')
+    argument_parser.add_argument('-j', '--workers', type=int, help='number of worker processes, the number of CPUs by default')
+    argument_parser.add_argument('--chunk-size', type=int, default=8, help='number of files given to a worker at a time')
+    argument_parser.add_argument('--optimize', action='store_true', help='run the optimizer')
+    argument_parser.add_argument('--cache', help='directory of the compilation cache')
+    argument_parser.add_argument('--quiet', action='store_true', help='only print the failures and the totals')
+    options = argument_parser.parse_args(arguments)
+
+    cache = CompileCache(options.cache) if options.cache is not None else None
+    compiler = Compiler(0, options.optimize, cache=cache)
+    report = compiler.compile_many(options.paths, options.output, options.workers, options.chunk_size)
+
+    if not options.quiet:
+        for source, compiled, seconds, size, error in report['files']:
+            if error is None:
+                print(f'{seconds * 1e3:10.2f} ms  {source} -> {compiled}')
+    for source, error in report['failures']:
+        print(f'FAILED {source}: {error}')
+    print(f"{report['compiled']} compiled, {len(report['failures'])} failed in {report['seconds']:.2f} s "
+          f"({report['files_per_second']:.1f} files/s, {report['bytes_per_second'] / 1024:.1f} KiB/s)")
+    return 1 if report['failures'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
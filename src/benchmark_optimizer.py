@@ -0,0 +1,105 @@
+import time
+from compiler import Compiler, CODE_TARGET
+'''
+Measures the run time of the code generated for loop-heavy and recursive programs, with and
+without the Optimizer pass each one exercises, the rest of the passes being enabled.
+
+@author Nicolás Rodrigo Pèrez
+@date 17-10-2026
+@version 1.0
+'''
+
+ROUNDS = 5
+ITERATIONS = 200000
+
+# (measured pass, program) pairs: programs whose loops recompute operations on names and
+# attributes they do not assign, and programs recursing through self tail calls
+PROGRAMS = {
+    'while on attributes': ('loop_invariant_code_motion', f'''
+class Scaler(object):
+
+    def __init__(self, x):
+        self.x = x
+        self.y = 3
+
+    def run(self, n):
+        total = 0
+        i = 0
+        while i < n:
+            total = total + self.x * 2 + self.y * self.x + i
+            i = i + 1
+        return total
+
+scaler = Scaler(7)
+result = scaler.run({ITERATIONS})
+'''),
+    'nested for on names': ('loop_invariant_code_motion', f'''
+def run(n, a, b):
+    total = 0
+    for i in range(n):
+        for j in range(n):
+            total = total + a * b + (a - b) * 3 + j
+    return total
+
+result = run({int(ITERATIONS ** 0.5)}, 5, 2)
+'''),
+    'while on names': ('loop_invariant_code_motion', f'''
+def run(n, a, b):
+    total = 0
+    i = 0
+    while i < n * 2 - n:
+        total = total + (a + b) * (a - b) + i
+        i = i + 1
+    return total
+
+result = run({ITERATIONS}, 9, 4)
+'''),
+    'tail recursion': ('tail_call_elimination', f'''
+def sum_to(n, total):
+    if n == 0:
+        return total
+    rest = n - 1
+    added = total + n
+    return sum_to(rest, added)
+
+def run(n, depth):
+    total = 0
+    for i in range(n):
+        total = total + sum_to(depth, i)
+    return total
+
+result = run({ITERATIONS // 500}, 500)
+''')
+}
+
+
+'''
+Compile the given program, and measure the best run time of its code.
+
+@type source_code: str
+@param source_code: python code to compile
+
+@type flags: dict
+@param flags: optimizer flags
+
+@rtype: tuple
+@returns: best run time in seconds, and the result of the program
+'''
+def measure(source_code, flags):
+    code = Compiler(0, True, flags).compile(source_code, CODE_TARGET)
+    best = None
+    for _ in range(ROUNDS):
+        namespace = {}
+        start = time.perf_counter()
+        exec(code, namespace)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, namespace['result']
+
+
+print('program                  measured pass                  without (ms)    with (ms)    speedup')
+for name, (measured_pass, source_code) in PROGRAMS.items():
+    without_pass, expected = measure(source_code, {measured_pass: False})
+    with_pass, result = measure(source_code, {})
+    assert result == expected
+    print(f'{name:<24} {measured_pass:<30} {without_pass * 1e3:12.1f} {with_pass * 1e3:12.1f} {without_pass / with_pass:10.2f}x')
@@ -0,0 +1,71 @@
+import os
+import time
+from lexer import Lexer
+from parser import Parser
+'''
+Measures the parsing cost per statement of the test program, while registering more and more
+extra productions on the parser dispatch tables, to check that adding grammar does not
+slow down the parsing of the existing constructs.
+
+@author Nicolás Rodrigo Pèrez
+@date 17-10-2026
+@version 1.0
+'''
+
+REPETITIONS = 200
+ROUNDS = 5
+EXTRA_PRODUCTIONS = (0, 10, 50, 100, 500, 1000)
+BLOCK_STATEMENTS = ('IF_STATEMENT', 'ELIF_STATEMENT', 'ELSE_STATEMENT', 'FOR_LOOP', 'WHILE_LOOP', 'CLASS_DECLARATION', 'FUNCTION_DEFINITION')
+
+
+'''
+Count the statements of a list of statements, including the ones inside their bodies.
+
+@type statements: list
+@param statements: list of statement nodes
+
+@rtype: int
+@returns: number of statements
+'''
+def count_statements(statements):
+    count = 0
+    for statement in statements:
+        count += 1
+        if statement.kind in BLOCK_STATEMENTS:
+            count += count_statements(statement.body)
+    return count
+
+
+'''
+Create a Parser subclass with the given number of extra statement and factor productions.
+
+@type extra_productions: int
+@param extra_productions: number of productions to add
+
+@rtype: type
+@returns: Parser subclass
+'''
+def parser_with_productions(extra_productions):
+    parser_class = type(f'Parser{extra_productions}', (Parser,), {})
+    for i in range(extra_productions):
+        parser_class.register_statement(f'BENCHMARK_STATEMENT_{i}', Parser.parse_import)
+        parser_class.register_factor(f'BENCHMARK_FACTOR_{i}', Parser.parse_literal)
+    return parser_class
+
+
+test_code = open(f'{os.getcwd()}/test/full_test.py', 'r').read()
+source_code = '\n'.join([test_code] * REPETITIONS)
+tokens = Lexer(source_code).tokenize_compact()
+statements = count_statements(Parser(tokens).parse().statements)
+
+print(f'{statements} statements, {len(tokens)} tokens\n')
+print('extra productions    ns/statement')
+for extra_productions in EXTRA_PRODUCTIONS:
+    parser_class = parser_with_productions(extra_productions)
+    best = None
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        parser_class(tokens).parse()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    print(f'{extra_productions:>17}    {best / statements * 1e9:12.0f}')
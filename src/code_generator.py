@@ -1,3 +1,5 @@
+from node_visitor import NodeVisitor
+from parser import BINDING_POWERS
 '''
 Generates readable python code from the nodes of an AST.
 
@@ -5,179 +7,267 @@ Generates readable python code from the nodes of an AST.
 @date 02-05-2023
 @version 1.0
 '''
-class CodeGenerator:
+
+OPERATOR_NODES = ('LOGICAL_EXPRESSION', 'COMPARISON_EXPRESSION', 'OPERATION')
+# statements opening a block, whose body is emitted after their line
+BLOCK_STATEMENTS = ('IF_STATEMENT', 'ELIF_STATEMENT', 'ELSE_STATEMENT', 'FOR_LOOP', 'WHILE_LOOP', 'CLASS_DECLARATION', 'FUNCTION_DEFINITION')
+INDENTATION = '    '
+
+
+class CodeGenerator(NodeVisitor):
 
 
     '''
     Create new CodeGenerator object.
 
-    @type ast: tuple
+    @type ast: Program
     @param ast: an AST
     '''
     def __init__(self, ast):
         self.ast = ast
-        self.fc_check = False
 
 
     '''
-    Main function which generates the python code for the given AST node. An AST is considered an AST node in itself.
+    Main function which generates the python code for the given AST.
+
+    @raise TypeError: if the AST node is not valid
 
     @rtype: str
     @returns: plain text python code
     '''
     def generate(self):
-        return self.visit(self.ast)
-        
+        fragments = []
+        self.emit(fragments)
+        return ''.join(fragments)
+
 
     '''
-    Visit the given AST node, and generate the python code related to it.
+    Write the python code for the given AST into the given sink, one line at a time,
+    so each top-level statement is written as soon as its code is generated.
+
+    Statements are emitted in order with an explicit stack of the blocks being emitted,
+    its depth being the indentation of their statements, so the generation time is linear
+    in the size of the code. The code of the expressions is generated by NodeVisitor.visit
+    without recursion, each node after its children. Function definitions are preceded by
+    a line for each of their decorators, and classes with slots start by their __slots__.
 
     @raise TypeError: if the AST node is not valid
 
-    @type node: tuple
-    @param node: AST node
+    @type sink: list or file
+    @param sink: list the code fragments are appended to, or text file object they are written to
+
+    @rtype: int
+    @returns: number of lines written
+    '''
+    def emit(self, sink):
+        write = sink.append if isinstance(sink, list) else sink.write
+        line_generators = self.line_generators
+        # iterators over the statements of the blocks being emitted, the innermost one last
+        blocks = [iter(self.ast.statements)]
+        lines = 0
+
+        while blocks:
+            statement = next(blocks[-1], None)
+            if statement is None:
+                blocks.pop()
+                continue
+            line_generator = line_generators.get(statement.kind)
+            if line_generator is None:
+                raise TypeError(f"Invalid node type: {statement.kind}")
+            if statement.kind == 'FUNCTION_DEFINITION':
+                for decorator in statement.decorators:
+                    write(INDENTATION * (len(blocks) - 1) + '@' + self.visit(decorator) + '\n')
+                    lines += 1
+            write(INDENTATION * (len(blocks) - 1) + line_generator(self, statement) + '\n\n')
+            lines += 1
+            if statement.kind == 'CLASS_DECLARATION' and statement.slots is not None:
+                write(INDENTATION * len(blocks) + f'__slots__ = {tuple(statement.slots)!r}\n\n')
+                lines += 1
+            if statement.kind in BLOCK_STATEMENTS:
+                blocks.append(iter(statement.body))
+
+        return lines
+
+
+    '''
+    Generate the python code of the given list of expressions, separated by commas.
+
+    @type expressions: list
+    @param expressions: list of expression nodes
 
     @rtype: str
     @returns: plain text python code
     '''
-    def visit(self, node):
-
-        node_type = node[0]
-        
-        if node_type == 'PROGRAM':
-            statements = ''
-            for i in range(len(node[1])):
-                statements += self.visit(node[1][i])
-            return statements
-
-        elif node_type == 'IMPORT':
-            value = self.visit(node[1])
-            return f'import {value}\n\n'
-
-        elif node_type == 'AS':
-            value1 = node[2][1]
-            value2 = node[1][1]
-            return f'{value1} as {value2}'
-        
-        elif node_type == 'ASSIGNMENT' or node_type == 'SELF_ASSIGNMENT':
-            identifier = node[1][1]
-            value = self.visit(node[2])
-            if self.fc_check == True:
-                self.fc_check = False
-                return f'{identifier} = {value}'
-            else:
-                return f'{identifier} = {value}\n\n'
-
-        elif node_type == 'CLASS_ASSIGNMENT':
-            identifier = node[1][1]
-            value = self.visit(node[2])
-            arguments = ''
-            for i in range(len(node[3])):
-                if i == len(node[3]) - 1:
-                    arguments += node[3][i][1]
-                else:
-                    arguments += node[3][i][1] + ', '
-            return f'{identifier} = {value}({arguments})\n\n'
-        
-        elif node_type == 'IF_STATEMENT':
-            condition = self.visit(node[1])
-            if_body = ''
-            for i in range(len(node[2])):
-                if_body += self.visit(node[2][i])
-            return f'if {condition}:\n\n{if_body}'
-
-        elif node_type == 'ELIF_STATEMENT':
-            condition = self.visit(node[1])
-            elif_body = ''
-            for i in range(len(node[2])):
-                elif_body += self.visit(node[2][i])
-            return f'elif {condition}:\n\n{elif_body}'
-
-        elif node_type == 'ELSE_STATEMENT':
-            else_body = ''
-            for i in range(len(node[1])):
-                else_body += self.visit(node[1][i])
-            return f'else:\n\n{else_body}'
-        
-        elif node_type == 'FOR_LOOP':
-            identifier = node[1]
-            iterable = self.visit(node[2])
-            body = self.visit(node[3])
-            return f'for {identifier} in {iterable}:\n\n{body}'
-        
-        elif node_type == 'WHILE_LOOP':
-            condition = self.visit(node[1])
-            body = ''
-            for i in range(len(node[2])):
-                body += self.visit(node[2][i])
-            return f'while {condition}:\n\n{body}'
-        
-        elif node_type == 'CLASS_DECLARATION':
-            class_name = node[1][1]
-            parent_class = node[2][1]
-            body = ''
-            for i in range(len(node[3])):
-                body += self.visit(node[3][i])
-            if parent_class is not None:
-                return f'class {class_name}({parent_class}):\n\n{body}'
-            else:
-                return f'class {class_name}:\n\n{body}'
-        
-        elif node_type == 'FUNCTION_DEFINITION':
-            function_name = node[1][1]
-            parameters = ''
-            for i in range(len(node[2])):
-                if i == len(node[2]) - 1:
-                    parameters += node[2][i][1]
-                else:
-                    parameters += node[2][i][1] + ', '
-            body = ''
-            for i in range(len(node[3])):
-                body += self.visit(node[3][i])
-            return f'def {function_name}({parameters}):\n\n{body}'
-        
-        elif node_type == 'FUNCTION_CALL':
-            self.fc_check = True
-            function_name = node[1][1]
-            arguments = ''
-            for i in range(len(node[2])):
-                if i == len(node[2]) - 1:
-                    arguments += node[2][i][1]
-                else:
-                    arguments += node[2][i][1] + ', '
-            return f'{function_name}({arguments})\n\n'
-
-        elif node_type == 'ATRIBUTE_ACCESS':
-            identifier = node[1][1]
-            body = ''
-            for i in range(len(node[2])):
-                body += self.visit(node[2][i])
-            return f'{identifier}.{body}'
-
-        elif node_type == 'LOGICAL_EXPRESSION':
-            operator = node[1]
-            left = self.visit(node[2])
-            right = self.visit(node[3])
-            return f'{left} {operator} {right}'
-
-        elif node_type == 'COMPARISON_EXPRESSION':
-            operator = node[1]
-            left = self.visit(node[2])
-            right = self.visit(node[3])
-            return f'{left} {operator} {right}'
-        
-        elif node_type == 'OPERATION':
-            operator = node[1]
-            left = node[2][1]
-            right = self.visit(node[3])
-            return f'{left} {operator} {right}'
-
-        elif node_type == 'RETURNED':
-            returned = self.visit(node[1])
-            return f'return {returned}\n\n'
-        
-        elif node_type == 'NUMBER' or node_type == 'STRING' or node_type == 'IDENTIFIER' or node_type == 'SELF_IDENTIFIER' or node_type == 'CLASS_IDENTIFIER':
-            return f'{node[1]}'
-        
+    def expressions(self, expressions):
+        return ', '.join(self.visit(expression) for expression in expressions)
+
+
+    '''
+    Wrap the code of the operand of an operator in parentheses if it binds less than the operator,
+    or as much as the operator when it is grouped on the right side or the operator is not associative.
+
+    @type node: Node
+    @param node: AST node of the operand
+
+    @type operand: str
+    @param operand: code of the operand
+
+    @type binding_power: int
+    @param binding_power: binding power of the operator
+
+    @type grouped: bool
+    @param grouped: true if operands binding as much as the operator must be wrapped
+
+    @rtype: str
+    @returns: plain text python code
+    '''
+    def wrap_operand(self, node, operand, binding_power, grouped):
+        if node.kind in OPERATOR_NODES:
+            operand_binding_power = BINDING_POWERS[node.operator]
+        elif node.kind == 'NOT_EXPRESSION':
+            operand_binding_power = BINDING_POWERS['not']
+        else:
+            return operand
+        if operand_binding_power < binding_power or (operand_binding_power == binding_power and grouped):
+            return f'({operand})'
+        return operand
+
+
+    # line of each statement type, the body of the statements opening a block being emitted after it
+
+    def line_IMPORT(self, node):
+        return f'import {self.visit(node.imported)}'
+
+    def line_ASSIGNMENT(self, node):
+        identifier = node.identifier.value
+        return f'{identifier} = {self.visit(node.value)}'
+
+    def line_CLASS_ASSIGNMENT(self, node):
+        identifier = node.identifier.value
+        arguments = self.expressions(node.arguments)
+        return f'{identifier} = {self.visit(node.class_name)}({arguments})'
+
+    def line_IF_STATEMENT(self, node):
+        return f'if {self.visit(node.condition)}:'
+
+    def line_ELIF_STATEMENT(self, node):
+        return f'elif {self.visit(node.condition)}:'
+
+    def line_ELSE_STATEMENT(self, node):
+        return 'else:'
+
+    def line_FOR_LOOP(self, node):
+        identifier = node.identifier.value
+        return f'for {identifier} in {self.visit(node.iterable)}:'
+
+    def line_WHILE_LOOP(self, node):
+        return f'while {self.visit(node.condition)}:'
+
+    def line_CLASS_DECLARATION(self, node):
+        class_name = node.name.value
+        if node.parent is not None:
+            return f'class {class_name}({node.parent.value}):'
         else:
-            raise TypeError(f"Invalid node type: {node_type}")
\ No newline at end of file
+            return f'class {class_name}:'
+
+    def line_FUNCTION_DEFINITION(self, node):
+        function_name = node.name.value
+        parameters = ', '.join(parameter.value for parameter in node.parameters)
+        return f'def {function_name}({parameters}):'
+
+    def line_RETURNED(self, node):
+        return f'return {self.visit(node.value)}'
+
+    def line_PASS(self, node):
+        return 'pass'
+
+    def line_EXPRESSION(self, node):
+        return self.visit(node)
+
+
+    # children of each expression node type, whose code is generated before the node
+
+    def children_AS(self, node):
+        return [node.expression, node.identifier]
+
+    def children_FUNCTION_CALL(self, node):
+        return [node.function] + node.arguments
+
+    def children_ATRIBUTE_ACCESS(self, node):
+        return [node.target] + node.attributes
+
+    def children_OPERATION(self, node):
+        return [node.left, node.right]
+
+    def children_NOT_EXPRESSION(self, node):
+        return [node.operand]
+
+    children_SELF_FUNCTION_CALL = children_FUNCTION_CALL
+    children_ATTRIBUTE_ACCESS = children_ATRIBUTE_ACCESS
+    children_SELF_ATTRIBUTE_ACCESS = children_ATRIBUTE_ACCESS
+    children_LOGICAL_EXPRESSION = children_OPERATION
+    children_COMPARISON_EXPRESSION = children_OPERATION
+
+
+    # code of each expression node type, given the code of its children
+
+    def leave_AS(self, node, results):
+        return f'{results[0]} as {results[1]}'
+
+    def leave_FUNCTION_CALL(self, node, results):
+        arguments = ', '.join(results[1:])
+        return f'{results[0]}({arguments})'
+
+    def leave_ATRIBUTE_ACCESS(self, node, results):
+        return '.'.join(results)
+
+    def leave_OPERATION(self, node, results):
+        operator = node.operator
+        binding_power = BINDING_POWERS[operator]
+        left = self.wrap_operand(node.left, results[0], binding_power, node.kind == 'COMPARISON_EXPRESSION')
+        right = self.wrap_operand(node.right, results[1], binding_power, True)
+        return f'{left} {operator} {right}'
+
+    def leave_NOT_EXPRESSION(self, node, results):
+        operand = self.wrap_operand(node.operand, results[0], BINDING_POWERS['not'], False)
+        return f'not {operand}'
+
+    def leave_NUMBER(self, node, results):
+        return f'{node.value}'
+    leave_SELF_FUNCTION_CALL = leave_FUNCTION_CALL
+    leave_ATTRIBUTE_ACCESS = leave_ATRIBUTE_ACCESS
+    leave_SELF_ATTRIBUTE_ACCESS = leave_ATRIBUTE_ACCESS
+    leave_LOGICAL_EXPRESSION = leave_OPERATION
+    leave_COMPARISON_EXPRESSION = leave_OPERATION
+    leave_STRING = leave_NUMBER
+    leave_IDENTIFIER = leave_NUMBER
+    leave_SELF_IDENTIFIER = leave_NUMBER
+    leave_CLASS_IDENTIFIER = leave_NUMBER
+    leave_NONE = leave_NUMBER
+    leave_TRUE = leave_NUMBER
+    leave_FALSE = leave_NUMBER
+    leave_SELF = leave_NUMBER
+
+
+    # dispatch table, from the statement type to the function generating its line
+    line_generators = {
+        'IMPORT': line_IMPORT,
+        'ASSIGNMENT': line_ASSIGNMENT,
+        'SELF_ASSIGNMENT': line_ASSIGNMENT,
+        'CLASS_ASSIGNMENT': line_CLASS_ASSIGNMENT,
+        'SELF_CLASS_ASSIGNMENT': line_CLASS_ASSIGNMENT,
+        'IF_STATEMENT': line_IF_STATEMENT,
+        'ELIF_STATEMENT': line_ELIF_STATEMENT,
+        'ELSE_STATEMENT': line_ELSE_STATEMENT,
+        'FOR_LOOP': line_FOR_LOOP,
+        'WHILE_LOOP': line_WHILE_LOOP,
+        'CLASS_DECLARATION': line_CLASS_DECLARATION,
+        'FUNCTION_DEFINITION': line_FUNCTION_DEFINITION,
+        'RETURNED': line_RETURNED,
+        'PASS': line_PASS,
+        'FUNCTION_CALL': line_EXPRESSION,
+        'SELF_FUNCTION_CALL': line_EXPRESSION,
+        'ATRIBUTE_ACCESS': line_EXPRESSION,
+        'ATTRIBUTE_ACCESS': line_EXPRESSION,
+        'SELF_ATTRIBUTE_ACCESS': line_EXPRESSION
+    }
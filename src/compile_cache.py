@@ -0,0 +1,250 @@
+import os
+import sys
+import time
+import hashlib
+import pickle
+import tempfile
+'''
+Persistent cache of the results of the compilation phases, stored on a directory shared by
+all the processes compiling with it. Entries are addressed by the hash of what they depend on,
+so a changed source code or compiler only misses, and are evicted in least recently used order
+when the cache grows over its size cap.
+
+Each entry is written to a temporary file renamed over the entry, so processes never read a
+partially written entry, and an entry evicted or corrupted while being read is just a miss.
+Entries are pickled, so the cache directory must only be writable by trusted users.
+
+@author Nicolás Rodrigo Pèrez
+@date 17-10-2026
+@version 1.0
+'''
+
+# phases whose results are cached, each one on its own entry
+TOKENS_PHASE = 'tokens'
+AST_PHASE = 'ast'
+OUTPUT_PHASE = 'output'
+# fraction of the size cap the cache is left with after evicting
+EVICTION_TARGET = 0.9
+# seconds after which the temporary file of a write is considered left by a dead process
+TEMPORARY_LIFETIME = 3600
+
+# fingerprint of the running compiler, computed once
+fingerprint = None
+
+
+'''
+Get the fingerprint of the running compiler, which is the hash of the python version and of
+the source code of the compiler modules, so any change to the compiler invalidates the cache.
+
+@rtype: str
+@returns: hexadecimal fingerprint
+'''
+def compiler_fingerprint():
+    global fingerprint
+    if fingerprint is None:
+        digest = hashlib.sha256(sys.version.encode())
+        directory = os.path.dirname(os.path.abspath(__file__))
+        for name in sorted(os.listdir(directory)):
+            if name.endswith('.py'):
+                with open(os.path.join(directory, name), 'rb') as file:
+                    digest.update(name.encode() + b'\0' + file.read() + b'\0')
+        fingerprint = digest.hexdigest()
+    return fingerprint
+
+
+class CompileCache:
+
+
+    '''
+    Create new CompileCache object, creating its directory if it does not exist.
+
+    @type directory: str
+    @param directory: path of the directory holding the entries
+
+    @type max_bytes: int
+    @param max_bytes: size cap of the entries, in bytes
+
+    @type fingerprint: str
+    @param fingerprint: version of the compiler the entries belong to, the compiler_fingerprint if None
+    '''
+    def __init__(self, directory, max_bytes=256 * 1024 * 1024, fingerprint=None):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.fingerprint = fingerprint if fingerprint is not None else compiler_fingerprint()
+        # lookups found and not found, entries written and entries evicted by this object
+        self.counters = {'hits': 0, 'misses': 0, 'writes': 0, 'evictions': 0}
+        # estimated size of the entries, scanned on the first write
+        self.size = None
+
+
+    '''
+    Get the key of an entry depending on the given parts and on the compiler fingerprint.
+
+    @type parts: tuple
+    @param parts: strings or values with a stable repr the entry depends on
+
+    @rtype: str
+    @returns: hexadecimal key
+    '''
+    def key(self, *parts):
+        digest = hashlib.sha256(self.fingerprint.encode())
+        for part in parts:
+            digest.update(b'\0' + (part if isinstance(part, str) else repr(part)).encode('utf-8', 'surrogatepass'))
+        return digest.hexdigest()
+
+
+    '''
+    Get the path of the entry of the given phase and key.
+
+    @type phase: str
+    @param phase: TOKENS_PHASE, AST_PHASE or OUTPUT_PHASE
+
+    @type key: str
+    @param key: key of the entry
+
+    @rtype: str
+    @returns: path of the entry file
+    '''
+    def path(self, phase, key):
+        return os.path.join(self.directory, f'{key}.{phase}')
+
+
+    '''
+    Load the entry of the given phase and key, marking it as the most recently used.
+
+    @type phase: str
+    @param phase: TOKENS_PHASE, AST_PHASE or OUTPUT_PHASE
+
+    @type key: str
+    @param key: key of the entry
+
+    @returns: the cached value, or None if it is not cached
+    '''
+    def load(self, phase, key):
+        path = self.path(phase, key)
+        try:
+            with open(path, 'rb') as file:
+                data = file.read()
+            value = pickle.loads(data)
+        except OSError:
+            self.counters['misses'] += 1
+            return None
+        except Exception:
+            # entries of a corrupted or incompatible cache are removed
+            self.counters['misses'] += 1
+            self.remove(path)
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self.counters['hits'] += 1
+        return value
+
+
+    '''
+    Store the given value as the entry of the given phase and key, evicting the least recently
+    used entries if the cache grows over its size cap. Values which cannot be pickled, such as
+    too deeply nested ASTs, and values which cannot be written, such as on a full disk, are not cached.
+
+    @type phase: str
+    @param phase: TOKENS_PHASE, AST_PHASE or OUTPUT_PHASE
+
+    @type key: str
+    @param key: key of the entry
+
+    @param value: picklable value
+    '''
+    def store(self, phase, key, value):
+        try:
+            data = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        except (RecursionError, pickle.PicklingError, TypeError, AttributeError):
+            return
+        try:
+            descriptor, temporary = tempfile.mkstemp(dir=self.directory, prefix='.', suffix='.tmp')
+        except OSError:
+            return
+        try:
+            with os.fdopen(descriptor, 'wb') as file:
+                file.write(data)
+            os.replace(temporary, self.path(phase, key))
+        except OSError:
+            self.remove(temporary)
+            return
+        self.counters['writes'] += 1
+        if self.size is None:
+            self.size = self.scan()[0]
+        else:
+            self.size += len(data)
+        if self.size > self.max_bytes:
+            self.evict()
+
+
+    '''
+    Find the entries of the cache, removing the temporary files left by dead processes.
+
+    @rtype: tuple
+    @returns: total size of the entries, and list of (last use time, size, path) of each entry
+    '''
+    def scan(self):
+        entries = []
+        size = 0
+        try:
+            directory_entries = list(os.scandir(self.directory))
+        except OSError:
+            return 0, entries
+        for entry in directory_entries:
+            try:
+                status = entry.stat()
+            except OSError:
+                continue
+            if entry.name.endswith('.tmp'):
+                if status.st_mtime < time.time() - TEMPORARY_LIFETIME:
+                    self.remove(entry.path)
+                continue
+            entries.append((status.st_mtime, status.st_size, entry.path))
+            size += status.st_size
+        return size, entries
+
+
+    '''
+    Evict the least recently used entries until the cache is under its size cap, leaving room for new entries.
+    '''
+    def evict(self):
+        size, entries = self.scan()
+        entries.sort()
+        target = self.max_bytes * EVICTION_TARGET
+        for last_use, entry_size, path in entries:
+            if size <= target:
+                break
+            if self.remove(path):
+                self.counters['evictions'] += 1
+            size -= entry_size
+        self.size = size
+
+
+    '''
+    Remove all the entries of the cache.
+    '''
+    def clear(self):
+        for last_use, entry_size, path in self.scan()[1]:
+            self.remove(path)
+        self.size = 0
+
+
+    '''
+    Remove the given file, which may have been removed by another process.
+
+    @type path: str
+    @param path: path of the file
+
+    @rtype: bool
+    @returns: true if the file was removed
+    '''
+    def remove(self, path):
+        try:
+            os.remove(path)
+            return True
+        except OSError:
+            return False
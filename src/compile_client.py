@@ -0,0 +1,232 @@
+import sys
+import json
+import socket
+import struct
+import argparse
+'''
+Client of the compile server, sending the source code to compile over its Unix domain socket
+and receiving the compiled code, so each compilation costs a round trip instead of starting
+a process. It does not import the compiler.
+
+Messages are framed as the 4 bytes big-endian length of their body followed by the body,
+which is a UTF-8 JSON object. Requests are {"command": "compile", "source": ...} and
+{"command": "stats"}, answered with {"output": ...} or {"error": name, "message": ...}
+and {"stats": {...}}. A connection may send any number of requests, each one answered in order.
+
+Usage: python compile_client.py SOCKET [FILE ...] [-o OUTPUT] [--stats]
+
+@author Nicolás Rodrigo Pèrez
+@date 17-10-2026
+@version 1.0
+'''
+
+# header of a frame, with the length of its body
+FRAME_HEADER = struct.Struct('>I')
+# largest body of a frame, larger frames being rejected before reading them
+MAX_FRAME_BYTES = 64 * 1024 * 1024
+# exceptions raised by the client for the errors of the server, RuntimeError for the rest
+ERROR_TYPES = {
+    'SyntaxError': SyntaxError,
+    'IndentationError': IndentationError,
+    'ValueError': ValueError,
+    'TypeError': TypeError
+}
+
+
+'''
+Send a message on the given socket.
+
+@type connection: socket.socket
+@param connection: connected socket
+
+@type message: dict
+@param message: JSON serializable message
+'''
+def send_frame(connection, message):
+    body = json.dumps(message).encode()
+    connection.sendall(FRAME_HEADER.pack(len(body)) + body)
+
+
+'''
+Receive a message from the given socket.
+
+@raise ValueError: if the frame is larger than MAX_FRAME_BYTES or its body is not valid JSON
+@raise ConnectionError: if the connection is closed in the middle of a frame
+
+@type connection: socket.socket
+@param connection: connected socket
+
+@rtype: dict
+@returns: the received message, or None if the connection was closed between frames
+'''
+def receive_frame(connection):
+    header = receive_bytes(connection, FRAME_HEADER.size)
+    if header is None:
+        return None
+    length, = FRAME_HEADER.unpack(header)
+    if length > MAX_FRAME_BYTES:
+        raise ValueError(f"Frame too large: {length} bytes")
+    body = receive_bytes(connection, length)
+    if body is None:
+        raise ConnectionError("Connection closed in the middle of a frame")
+    return json.loads(body)
+
+
+'''
+Receive the given number of bytes from the given socket.
+
+@raise ConnectionError: if the connection is closed after some of the bytes were received
+
+@type connection: socket.socket
+@param connection: connected socket
+
+@type size: int
+@param size: number of bytes
+
+@rtype: bytes
+@returns: the received bytes, or None if the connection was closed before any of them
+'''
+def receive_bytes(connection, size):
+    data = bytearray()
+    while len(data) < size:
+        chunk = connection.recv(size - len(data))
+        if not chunk:
+            if data:
+                raise ConnectionError("Connection closed in the middle of a frame")
+            return None
+        data += chunk
+    return bytes(data)
+
+
+class CompileClient:
+
+
+    '''
+    Create new CompileClient object, connected to the compile server.
+
+    @raise OSError: if the server cannot be connected
+
+    @type path: str
+    @param path: path of the Unix domain socket of the server
+
+    @type timeout: float
+    @param timeout: seconds to wait for each answer, or None to wait forever
+    '''
+    def __init__(self, path, timeout=None):
+        self.connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.connection.settimeout(timeout)
+        try:
+            self.connection.connect(path)
+        except OSError:
+            self.connection.close()
+            raise
+
+
+    '''
+    Compile the given source code on the server.
+
+    @raise SyntaxError: if invalid syntax is detected
+    @raise IndentationError: if invalid indentation is detected
+    @raise ValueError: if a semantic error is detected
+    @raise TypeError: if the AST node is not valid
+    @raise RuntimeError: if the server failed with any other error
+
+    @type source_code: str
+    @param source_code: source code to compile
+
+    @rtype: str
+    @returns: compiled python code
+    '''
+    def compile(self, source_code):
+        answer = self.request({'command': 'compile', 'source': source_code})
+        if 'error' in answer:
+            raise ERROR_TYPES.get(answer['error'], RuntimeError)(answer['message'])
+        return answer['output']
+
+
+    '''
+    Get the counters of the server.
+
+    @rtype: dict
+    @returns: requests, cache hits and misses, errors served and restarts of the worker processes
+    '''
+    def stats(self):
+        return self.request({'command': 'stats'})['stats']
+
+
+    '''
+    Send a request to the server and receive its answer.
+
+    @raise ConnectionError: if the server closed the connection
+
+    @type request: dict
+    @param request: request message
+
+    @rtype: dict
+    @returns: answer message
+    '''
+    def request(self, request):
+        send_frame(self.connection, request)
+        answer = receive_frame(self.connection)
+        if answer is None:
+            raise ConnectionError("Connection closed by the compile server")
+        return answer
+
+
+    '''
+    Close the connection to the server.
+    '''
+    def close(self):
+        self.connection.close()
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, exception_type, exception, traceback):
+        self.close()
+
+
+'''
+Parse the command line arguments, compile the given files on the server and write their
+compiled code to the output file or to the standard output.
+
+@type arguments: list
+@param arguments: command line arguments, the ones of the process if None
+
+@rtype: int
+@returns: exit status, 1 if any file failed to compile
+'''
+def main(arguments=None):
+    argument_parser = argparse.ArgumentParser(description='Compile python files on a running compile server.')
+    argument_parser.add_argument('socket', help='path of the Unix domain socket of the server')
+    argument_parser.add_argument('files', nargs='*', help='source files to compile')
+    argument_parser.add_argument('-o', '--output', help='file to write the compiled code to, instead of the standard output')
+    argument_parser.add_argument('--stats', action='store_true', help='print the counters of the server')
+    options = argument_parser.parse_args(arguments)
+
+    status = 0
+    outputs = []
+    with CompileClient(options.socket) as client:
+        for path in options.files:
+            with open(path) as file:
+                source_code = file.read()
+            try:
+                outputs.append(client.compile(source_code))
+            except (SyntaxError, ValueError, TypeError, RuntimeError) as exception:
+                print(f'FAILED {path}: {exception.__class__.__name__}: {exception}', file=sys.stderr)
+                status = 1
+        if options.stats:
+            print(json.dumps(client.stats()), file=sys.stderr)
+
+    if options.output is not None:
+        with open(options.output, 'w') as file:
+            file.write(''.join(outputs))
+    else:
+        sys.stdout.write(''.join(outputs))
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,287 @@
+import os
+import sys
+import stat
+import signal
+import hashlib
+import argparse
+import threading
+import socketserver
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from compiler import Compiler
+from compile_cache import CompileCache
+from compile_client import send_frame, receive_frame
+'''
+Long-running compile server, keeping the compiler imported and warm on a pool of worker
+processes and answering the compile requests of the CompileClient objects on a Unix domain
+socket, with the framed protocol of compile_client.py.
+
+Each connection is served by its own thread, which hands the source code to the next free
+worker process, so requests are compiled concurrently by a bounded number of processes. The
+compiled code, or the error, of the most recently requested source codes is kept in memory,
+and requests of a source code being compiled wait for its compilation, so the same source
+code is compiled once. A pool broken by the death of a worker process is replaced, and the
+compilations it failed retried once on the new pool.
+
+Usage: python compile_server.py SOCKET [-j WORKERS] [--cache-entries N] [--optimize] [--cache DIRECTORY]
+
+@author Nicolás Rodrigo Pèrez
+@date 17-10-2026
+@version 1.0
+'''
+
+# source code compiled on each worker process when it starts, importing and warming up the compiler
+WARM_UP_SOURCE = 'x = 1\n'
+
+# compiler of the server worker processes, given when they start
+server_compiler = None
+
+
+class CompileServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+
+    # connection threads do not keep the server running
+    daemon_threads = True
+
+
+    '''
+    Create new CompileServer object listening on the given socket path, starting its worker processes.
+
+    @raise OSError: if the path exists and is not a socket, or cannot be bound
+
+    @type path: str
+    @param path: path of the Unix domain socket, replaced if a socket is left on it
+
+    @type compiler: Compiler
+    @param compiler: compiler the worker processes compile with
+
+    @type workers: int
+    @param workers: number of worker processes, the number of CPUs if None
+
+    @type cache_entries: int
+    @param cache_entries: number of results kept in memory, 0 to not keep them
+    '''
+    def __init__(self, path, compiler, workers=None, cache_entries=1024):
+        if os.path.exists(path) and stat.S_ISSOCK(os.stat(path).st_mode):
+            os.unlink(path)
+        self.compiler = compiler
+        self.workers = workers if workers is not None else os.cpu_count()
+        self.executor = self.start_executor()
+        # held while the broken pool is replaced
+        self.executor_lock = threading.Lock()
+        self.cache_entries = cache_entries
+        # answers of the most recently requested source codes, indexed by the hash of the source code
+        self.results = OrderedDict()
+        # futures of the answers of the source codes being compiled, indexed by the hash of the source code
+        self.compiling = {}
+        self.results_lock = threading.Lock()
+        self.counters = {'requests': 0, 'hits': 0, 'misses': 0, 'errors': 0, 'restarts': 0}
+        try:
+            super().__init__(path, CompileRequestHandler)
+        except OSError:
+            self.executor.shutdown()
+            raise
+
+
+    '''
+    Start a pool of worker processes, forking them and warming them up.
+
+    @rtype: ProcessPoolExecutor
+    @returns: the started pool
+    '''
+    def start_executor(self):
+        executor = ProcessPoolExecutor(self.workers, initializer=start_server_worker, initargs=(self.compiler,))
+        # forking all the workers at once, before any connection thread exists for the first pool, which also warms them up
+        executor.submit(compile_source, WARM_UP_SOURCE).result()
+        return executor
+
+
+    '''
+    Answer the given request.
+
+    @type request: dict
+    @param request: request message
+
+    @rtype: dict
+    @returns: answer message
+    '''
+    def answer(self, request):
+        command = request.get('command', 'compile') if request.__class__ is dict else None
+        if command == 'stats':
+            with self.results_lock:
+                return {'stats': dict(self.counters, entries=len(self.results))}
+        if command != 'compile' or not isinstance(request.get('source'), str):
+            return {'error': 'ValueError', 'message': f"Invalid request: {command}"}
+
+        source_code = request['source']
+        key = hashlib.sha256(source_code.encode()).digest()
+        with self.results_lock:
+            self.counters['requests'] += 1
+            answer = self.results.get(key)
+            if answer is not None:
+                self.results.move_to_end(key)
+                self.counters['hits'] += 1
+                return answer
+            future = self.compiling.get(key)
+            waiting = future is not None
+            if waiting:
+                self.counters['hits'] += 1
+            else:
+                self.counters['misses'] += 1
+                future = self.compiling[key] = Future()
+        if waiting:
+            return future.result()
+
+        try:
+            answer = self.compile(source_code)
+        except BaseException as exception:
+            with self.results_lock:
+                del self.compiling[key]
+            future.set_exception(exception)
+            raise
+        with self.results_lock:
+            del self.compiling[key]
+            if 'error' in answer:
+                self.counters['errors'] += 1
+            if self.cache_entries > 0:
+                self.results[key] = answer
+                if len(self.results) > self.cache_entries:
+                    self.results.popitem(last=False)
+        future.set_result(answer)
+        return answer
+
+
+    '''
+    Compile the given source code on the worker processes. If the pool was broken by the death
+    of a worker process, it is replaced and the source code compiled again once.
+
+    @raise BrokenProcessPool: if the source code broke the new pool too, which is replaced again
+
+    @type source_code: str
+    @param source_code: source code to compile
+
+    @rtype: dict
+    @returns: answer message, with the compiled code or the error
+    '''
+    def compile(self, source_code):
+        executor = self.executor
+        try:
+            return executor.submit(compile_source, source_code).result()
+        except BrokenProcessPool:
+            self.replace_executor(executor)
+        executor = self.executor
+        try:
+            return executor.submit(compile_source, source_code).result()
+        except BrokenProcessPool:
+            self.replace_executor(executor)
+            raise
+
+
+    '''
+    Replace the given broken pool of worker processes with a new one, unless another thread
+    already replaced it.
+
+    @type broken_executor: ProcessPoolExecutor
+    @param broken_executor: the broken pool
+    '''
+    def replace_executor(self, broken_executor):
+        with self.executor_lock:
+            if self.executor is not broken_executor:
+                return
+            broken_executor.shutdown(wait=False)
+            self.executor = self.start_executor()
+            with self.results_lock:
+                self.counters['restarts'] += 1
+
+
+    def server_close(self):
+        super().server_close()
+        self.executor.shutdown()
+        try:
+            os.unlink(self.server_address)
+        except OSError:
+            pass
+
+
+class CompileRequestHandler(socketserver.BaseRequestHandler):
+
+
+    '''
+    Answer the requests of a connection in order, until the client closes it.
+    '''
+    def handle(self):
+        while True:
+            try:
+                request = receive_frame(self.request)
+            except (ValueError, ConnectionError):
+                return
+            if request is None:
+                return
+            try:
+                answer = self.server.answer(request)
+            except Exception as exception:
+                answer = {'error': exception.__class__.__name__, 'message': str(exception)}
+            try:
+                send_frame(self.request, answer)
+            except OSError:
+                return
+
+
+'''
+Set the compiler of a server worker process, which leaves interrupts to the server process.
+
+@type compiler: Compiler
+@param compiler: compiler the worker compiles with
+'''
+def start_server_worker(compiler):
+    global server_compiler
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    server_compiler = compiler
+
+
+'''
+Compile the given source code on a server worker process.
+
+@type source_code: str
+@param source_code: source code to compile
+
+@rtype: dict
+@returns: answer message, with the compiled code or the error
+'''
+def compile_source(source_code):
+    try:
+        return {'output': server_compiler.compile(source_code)}
+    except Exception as exception:
+        return {'error': exception.__class__.__name__, 'message': str(exception)}
+
+
+'''
+Parse the command line arguments and serve the compile requests until interrupted.
+
+@type arguments: list
+@param arguments: command line arguments, the ones of the process if None
+
+@rtype: int
+@returns: exit status
+'''
+def main(arguments=None):
+    argument_parser = argparse.ArgumentParser(description='Serve compile requests on a Unix domain socket.')
+    argument_parser.add_argument('socket', help='path of the Unix domain socket to listen on')
+    argument_parser.add_argument('-j', '--workers', type=int, help='number of worker processes, the number of CPUs by default')
+    argument_parser.add_argument('--cache-entries', type=int, default=1024, help='number of results kept in memory')
+    argument_parser.add_argument('--optimize', action='store_true', help='run the optimizer')
+    argument_parser.add_argument('--cache', help='directory of the compilation cache')
+    options = argument_parser.parse_args(arguments)
+
+    cache = CompileCache(options.cache) if options.cache is not None else None
+    compiler = Compiler(0, options.optimize, cache=cache)
+    with CompileServer(options.socket, compiler, options.workers, options.cache_entries) as server:
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
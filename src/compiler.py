@@ -1,7 +1,21 @@
+import os
+import time
+import marshal
+import copy
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from lexer import Lexer
 from parser import Parser
 from semantic_analyzer import SemanticAnalyzer
 from code_generator import CodeGenerator
+from python_ast_generator import PythonAstGenerator
+from optimizer import Optimizer
+from memoizer import Memoizer
+from slots_collector import SlotsCollector
+from compile_cache import TOKENS_PHASE, AST_PHASE, OUTPUT_PHASE
+from instrumentation import LEXER_PHASE, PARSER_PHASE, SEMANTIC_PHASE, OPTIMIZER_PHASE, MEMOIZER_PHASE, SLOTS_PHASE, GENERATOR_PHASE
+from instrumentation import DUMP_DEPTH, DUMP_LENGTH, bounded_dump
 '''
 Basic python compiler based on a recursive implementation of an AST (Abstract Syntax Tree),
 heavily scalable following the simple logic used.
@@ -10,6 +24,18 @@ heavily scalable following the simple logic used.
 @date 02-05-2023
 @version 1.0
 '''
+
+# targets of Compiler.compile, python code as text or an executable code object
+TEXT_TARGET = 'text'
+CODE_TARGET = 'code'
+# extension of the source files compiled by Compiler.compile_many, and suffix of the compiled files written next to them
+SOURCE_EXTENSION = '.py'
+COMPILED_SUFFIX = '.compiled.py'
+
+# compiler of the batch worker processes, given when they start
+batch_compiler = None
+
+
 class Compiler:
 
 
@@ -18,35 +44,649 @@ class Compiler:
 
     @type debug: int
     @param debug: debug level, 0 for disabled, else enabled
+
+    @type optimize: bool
+    @param optimize: true to run the Optimizer between the Semantic Analyzer and the Code Generator
+
+    @type optimizer_flags: dict
+    @param optimizer_flags: True or False indexed by optimization pass name; passes not given are enabled
+
+    @type memoize: int
+    @param memoize: maximum number of results cached for each pure top-level function, None to not memoize them
+
+    @type slots: bool
+    @param slots: true to generate the top-level classes with the __slots__ of the attributes their methods assign
+
+    @type cache: CompileCache
+    @param cache: cache the results of the phases are stored on and reused from by compile, or None
+
+    @type instrumentation: Instrumentation
+    @param instrumentation: instrumentation recording each phase, or None
     '''
-    def __init__(self, debug):
+    def __init__(self, debug, optimize=False, optimizer_flags=None, memoize=None, slots=False, cache=None, instrumentation=None):
         self.debug = debug
+        self.optimize = optimize
+        self.optimizer_flags = optimizer_flags
+        self.memoize = memoize
+        self.slots = slots
+        self.cache = cache
+        self.instrumentation = instrumentation
+        # counters of the optimization passes of the last compiled code, indexed by pass name
+        self.optimizer_counters = {}
+        # names of the memoized functions of the last compiled code
+        self.memoized_functions = []
+        # slots of the classes of the last compiled code, indexed by class name
+        self.class_slots = {}
 
 
     '''
-    Main fuction which compiles the given python code in 4 phases:
+    Main fuction which compiles the given python code in 4 phases, the Optimizer, the Memoizer
+    and the Slots Collector running between the Semantic Analyzer and the Code Generator if enabled:
     - Lexer
     - Parser
     - Semantic Analyzer
     - Code Generator
 
-    @type source_code: str
-    @param source_code: string of python code to compile
+    A text file object can be given instead of a string, in which case tokens are
+    streamed from the Lexer to the Parser as the file is read.
+
+    With the CODE_TARGET target, the AST is lowered by PythonAstGenerator and compiled
+    straight into a code object, instead of generating python code as text. ASTs nested too
+    deeply for the built-in compile to take its nodes are compiled from the generated text.
+
+    With a cache, the compiled code, the analyzed AST and the tokens of a source code already
+    compiled are reused from it, running only the phases after the last cached one.
+
+    @raise ValueError: if the target is not valid, or the AST is nested too deeply to compile to a code object
+
+    @type source_code: str or file
+    @param source_code: string or text file object of python code to compile
+
+    @type target: str
+    @param target: TEXT_TARGET or CODE_TARGET
+
+    @type filename: str
+    @param filename: file name shown in the tracebacks of the code object
+
+    @rtype: str or code
+    @returns: compiled python code, or executable code object
+    '''
+    def compile(self, source_code, target=TEXT_TARGET, filename='<compiled>'):
+        if target != TEXT_TARGET and target != CODE_TARGET:
+            raise ValueError(f"Invalid target: {target}")
+        if self.cache is not None:
+            return self.compile_cached(source_code, target, filename)
+        analyzed_ast = self.analyze(source_code)
+        return self.generate(analyzed_ast, target, filename)
+
+
+    '''
+    Compile the given python code, reusing the results of the phases stored on the cache and
+    storing the ones computed. The tokens are keyed by the source code, the analyzed AST by the
+    tokens and the options of the compiler, and the compiled code by the AST and the target.
+
+    @type source_code: str or file
+    @param source_code: string or text file object of python code to compile, which is read whole
+
+    @type target: str
+    @param target: TEXT_TARGET or CODE_TARGET
+
+    @type filename: str
+    @param filename: file name shown in the tracebacks of the code object
+
+    @rtype: str or code
+    @returns: compiled python code, or executable code object
+    '''
+    def compile_cached(self, source_code, target, filename):
+        if not isinstance(source_code, str):
+            source_code = source_code.read()
+        cache = self.cache
+        tokens_key = cache.key(source_code)
+        options = (self.optimize, sorted((self.optimizer_flags or {}).items()), self.memoize, self.slots)
+        ast_key = cache.key(tokens_key, options)
+        output_key = cache.key(ast_key, target, filename if target == CODE_TARGET else None)
+
+        output = cache.load(OUTPUT_PHASE, output_key)
+        if output is not None:
+            compiled_code, self.optimizer_counters, self.memoized_functions, self.class_slots = output
+            if self.debug != 0: self.dump('0. Cache', '(compiled code reused)')
+            return marshal.loads(compiled_code) if target == CODE_TARGET else compiled_code
+
+        analysis = cache.load(AST_PHASE, ast_key)
+        if analysis is not None:
+            analyzed_ast, self.optimizer_counters, self.memoized_functions, self.class_slots = analysis
+            if self.debug != 0: self.dump('0. Cache', '(analyzed AST reused)')
+        else:
+            tokens = cache.load(TOKENS_PHASE, tokens_key)
+            if tokens is None:
+                tokens = self.run_phase(LEXER_PHASE, Lexer(source_code).tokenize_compact)
+                if self.debug != 0: self.dump('1. -> Lexer', tokens)
+                cache.store(TOKENS_PHASE, tokens_key, tokens)
+            elif self.debug != 0: self.dump('0. Cache', '(tokens reused)')
+            analyzed_ast = self.analyze_tokens(tokens)
+            cache.store(AST_PHASE, ast_key, (analyzed_ast, self.optimizer_counters, self.memoized_functions, self.class_slots))
+
+        compiled_code = self.generate(analyzed_ast, target, filename)
+        stored_code = marshal.dumps(compiled_code) if target == CODE_TARGET else compiled_code
+        cache.store(OUTPUT_PHASE, output_key, (stored_code, self.optimizer_counters, self.memoized_functions, self.class_slots))
+        return compiled_code
+
+
+    '''
+    Compile the source files found on the given paths on a pool of worker processes, writing
+    each compiled file next to its source file, or under the output directory with the same
+    path relative to the directory it was found in.
+
+    Directories are walked for the files with SOURCE_EXTENSION, skipping the compiled files and
+    the output directory. Files are dealt largest first to chunks of about chunk_size files, one
+    file to each chunk in turn, so every chunk given to the next free worker costs about the same.
+    The errors of a file are reported without stopping the batch. The files of a chunk whose worker
+    died, breaking the pool, are compiled again one at a time on a new worker, and the files
+    breaking it again are reported as failed.
+
+    @type paths: list
+    @param paths: paths of source files and directories
+
+    @type output_directory: str
+    @param output_directory: directory the compiled files are written under, or None to write them next to their source files
+
+    @type workers: int
+    @param workers: number of worker processes, the number of CPUs if None; 1 compiles on this process
+
+    @type chunk_size: int
+    @param chunk_size: number of files given to a worker at a time
+
+    @rtype: dict
+    @returns: report with the 'files' list of (source path, compiled path, seconds, bytes, error or None),
+              the 'failures' list of (source path, error), and the 'compiled', 'seconds', 'bytes',
+              'files_per_second' and 'bytes_per_second' totals
+    '''
+    def compile_many(self, paths, output_directory=None, workers=None, chunk_size=8):
+        start = time.perf_counter()
+        jobs = find_sources(paths, output_directory)
+        chunk_count = -(-len(jobs) // chunk_size)
+        chunks = [jobs[index::chunk_count] for index in range(chunk_count)]
+        workers = workers if workers is not None else os.cpu_count()
+        if workers < 2 or len(chunks) < 2:
+            files = [result for chunk in chunks for result in compile_chunk(chunk, self)]
+        else:
+            files = []
+            broken_jobs = []
+            with ProcessPoolExecutor(workers, initializer=start_batch_worker, initargs=(self,)) as executor:
+                futures = [executor.submit(compile_chunk, chunk) for chunk in chunks]
+                for chunk, future in zip(chunks, futures):
+                    try:
+                        files.extend(future.result())
+                    except BrokenProcessPool:
+                        broken_jobs.extend(chunk)
+            files.extend(compile_broken_jobs(broken_jobs, self))
+            order = {job[0]: index for index, job in enumerate(jobs)}
+            files.sort(key=lambda result: order[result[0]])
+
+        seconds = time.perf_counter() - start
+        total_bytes = sum(result[3] for result in files)
+        failures = [(result[0], result[4]) for result in files if result[4] is not None]
+        return {
+            'files': files,
+            'failures': failures,
+            'compiled': len(files) - len(failures),
+            'seconds': seconds,
+            'bytes': total_bytes,
+            'files_per_second': len(files) / seconds if seconds else 0.0,
+            'bytes_per_second': total_bytes / seconds if seconds else 0.0
+        }
+
+
     '''
-    def compile(self, source_code):
+    Compile the given python code on an executor without blocking the event loop.
+
+    The code is compiled on the executor's threads or processes. With a process executor the
+    compiler is sent to the worker on each call, the source code must be a string, and code
+    objects are marshalled back. With a thread executor each call compiles on a copy of the
+    compiler, so concurrent calls do not share the optimizer counters, memoized functions and
+    class slots of the compilation, which are not set on this compiler. When the timeout expires or the call is cancelled, a job that
+    has not started is dropped. A job that has already started runs to the end, and its result
+    is discarded.
+
+    @raise ValueError: if the target is not valid
+    @raise asyncio.TimeoutError: if the code is not compiled before the timeout
+
+    @type source_code: str or file
+    @param source_code: string or text file object of python code to compile
+
+    @type target: str
+    @param target: TEXT_TARGET or CODE_TARGET
+
+    @type filename: str
+    @param filename: file name shown in the tracebacks of the code object
+
+    @type executor: concurrent.futures.Executor
+    @param executor: thread or process executor, the default executor of the event loop if None
+
+    @type timeout: float
+    @param timeout: seconds to wait for the compilation, counting the wait for the semaphore, or None to wait forever
+
+    @type semaphore: asyncio.Semaphore
+    @param semaphore: semaphore limiting the compilations in flight, or None
+
+    @rtype: str or code
+    @returns: compiled python code, or executable code object
+    '''
+    async def compile_async(self, source_code, target=TEXT_TARGET, filename='<compiled>', executor=None, timeout=None, semaphore=None):
+        if target != TEXT_TARGET and target != CODE_TARGET:
+            raise ValueError(f"Invalid target: {target}")
+        return await asyncio.wait_for(self.run_on_executor(source_code, target, filename, executor, semaphore), timeout)
+
+
+    '''
+    Compile the given python code on the given executor, once the semaphore is acquired.
+
+    @type source_code: str or file
+    @param source_code: string or text file object of python code to compile
+
+    @type target: str
+    @param target: TEXT_TARGET or CODE_TARGET
+
+    @type filename: str
+    @param filename: file name shown in the tracebacks of the code object
+
+    @type executor: concurrent.futures.Executor
+    @param executor: thread or process executor, the default executor of the event loop if None
+
+    @type semaphore: asyncio.Semaphore
+    @param semaphore: semaphore limiting the compilations in flight, or None
+
+    @rtype: str or code
+    @returns: compiled python code, or executable code object
+    '''
+    async def run_on_executor(self, source_code, target, filename, executor, semaphore):
+        if semaphore is not None:
+            async with semaphore:
+                return await self.run_on_executor(source_code, target, filename, executor, None)
+        loop = asyncio.get_running_loop()
+        if isinstance(executor, ProcessPoolExecutor):
+            result = await loop.run_in_executor(executor, compile_job, self, source_code, target, filename)
+            return marshal.loads(result) if target == CODE_TARGET else result
+        # the attributes describing the compilation are set on a copy, shared by no other call
+        return await loop.run_in_executor(executor, copy.copy(self).compile, source_code, target, filename)
+
+
+    '''
+    Compile the given python codes on an executor, yielding each result as soon as it is ready,
+    in completion order.
+
+    Source codes are taken from the given iterable only while fewer than the limit are in flight,
+    so a slow consumer or a busy executor holds back the producer, and the results are yielded while
+    the next source code is awaited, so a slow producer does not hold them back. The errors of a source code,
+    including its timeout, are yielded with its key instead of stopping the batch. Closing the
+    iterator cancels the compilations still in flight.
+
+    @type sources: iterable or async iterable
+    @param sources: (key, source code) pairs
+
+    @type executor: concurrent.futures.Executor
+    @param executor: thread or process executor, the default executor of the event loop if None
+
+    @type limit: int or asyncio.Semaphore
+    @param limit: maximum number of compilations in flight, or a semaphore shared with other callers
+
+    @type timeout: float
+    @param timeout: seconds to wait for each compilation, or None to wait forever
+
+    @type target: str
+    @param target: TEXT_TARGET or CODE_TARGET
+
+    @rtype: async iterator
+    @returns: (key, compiled code or None, exception or None) of each source code
+    '''
+    async def compile_many_async(self, sources, executor=None, limit=8, timeout=None, target=TEXT_TARGET):
+        semaphore = limit if isinstance(limit, asyncio.Semaphore) else asyncio.Semaphore(limit)
+        pending = set()
+
+        async def compile_source(key, source_code):
+            try:
+                return key, await asyncio.wait_for(self.run_on_executor(source_code, target, '<compiled>', executor, None), timeout), None
+            except Exception as exception:
+                return key, None, exception
+
+        async def next_source():
+            await semaphore.acquire()
+            try:
+                return await sources.__anext__()
+            except BaseException:
+                semaphore.release()
+                raise
+
+        sources = iterate(sources)
+        # task taking the next source code once the semaphore is acquired, None when the sources are exhausted
+        taking = asyncio.ensure_future(next_source())
+        try:
+            while taking is not None or pending:
+                done, _ = await asyncio.wait(pending | {taking} if taking is not None else pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task is not taking:
+                        pending.discard(task)
+                        yield task.result()
+                if taking is not None and taking.done():
+                    try:
+                        key, source_code = taking.result()
+                    except StopAsyncIteration:
+                        taking = None
+                        continue
+                    task = asyncio.ensure_future(compile_source(key, source_code))
+                    task.add_done_callback(lambda task: semaphore.release())
+                    pending.add(task)
+                    taking = asyncio.ensure_future(next_source())
+        finally:
+            if taking is not None:
+                taking.cancel()
+            for task in pending:
+                task.cancel()
+
+
+    '''
+    Run the Code Generator phase on the given analyzed AST.
+
+    @type analyzed_ast: Program
+    @param analyzed_ast: the analyzed AST
+
+    @type target: str
+    @param target: TEXT_TARGET or CODE_TARGET
+
+    @type filename: str
+    @param filename: file name shown in the tracebacks of the code object
+
+    @rtype: str or code
+    @returns: compiled python code, or executable code object
+    '''
+    def generate(self, analyzed_ast, target, filename):
+        if target == CODE_TARGET:
+            python_ast_generator = PythonAstGenerator(analyzed_ast)
+            code_object = self.run_phase(GENERATOR_PHASE, python_ast_generator.generate_code, filename)
+            if self.debug != 0: self.dump('4. ----> Code Generator', code_object)
+            return code_object
+
+        code_generator = CodeGenerator(analyzed_ast)
+        compiled_code = self.run_phase(GENERATOR_PHASE, code_generator.generate)
+        if self.debug != 0: self.dump('4. ----> Code Generator', compiled_code)
+        return compiled_code
+
+
+    '''
+    Compile the given python code, writing the compiled code into the given file as each
+    top-level statement is generated, instead of holding the whole compiled code in memory.
+
+    @type source_code: str or file
+    @param source_code: string or text file object of python code to compile
+
+    @type destination: str or file
+    @param destination: path of the file to write, or text file object to write into
+
+    @rtype: int
+    @returns: number of lines written
+    '''
+    def compile_to(self, source_code, destination):
+        analyzed_ast = self.analyze(source_code)
+
+        code_generator = CodeGenerator(analyzed_ast)
+        if isinstance(destination, str):
+            with open(destination, 'w') as file:
+                lines = self.run_phase(GENERATOR_PHASE, code_generator.emit, file)
+        else:
+            lines = self.run_phase(GENERATOR_PHASE, code_generator.emit, destination)
+        if self.debug != 0: self.dump('4. ----> Code Generator', '(' + str(lines) + ' lines written)')
+        return lines
+
+
+    '''
+    Run the Lexer, Parser and Semantic Analyzer phases on the given python code,
+    and the Optimizer, the Memoizer and the Slots Collector if enabled.
+
+    @type source_code: str or file
+    @param source_code: string or text file object of python code to compile
+
+    @rtype: Program
+    @returns: the analyzed AST
+    '''
+    def analyze(self, source_code):
 
         lexer = Lexer(source_code)
-        tokens = lexer.tokenize()
-        if self.debug != 0: print('1. -> Lexer:\n\n' + str(tokens) + '\n\n\n')
+        if isinstance(source_code, str):
+            tokens = self.run_phase(LEXER_PHASE, lexer.tokenize_compact)
+            if self.debug != 0: self.dump('1. -> Lexer', tokens)
+        else:
+            tokens = lexer.iter_tokens()
+            if self.debug != 0: self.dump('1. -> Lexer', '(tokens streamed to the parser)')
+        return self.analyze_tokens(tokens)
+
+
+    '''
+    Run the Parser and Semantic Analyzer phases on the given tokens, and the Optimizer,
+    the Memoizer and the Slots Collector if enabled.
 
+    @type tokens: TokenBuffer or iterator
+    @param tokens: tokens of the python code to compile
+
+    @rtype: Program
+    @returns: the analyzed AST
+    '''
+    def analyze_tokens(self, tokens):
         parser = Parser(tokens)
-        ast = parser.parse()
-        if self.debug != 0: print('2. --> Parser:\n\n' + str(ast) + '\n\n\n')
+        ast = self.run_phase(PARSER_PHASE, parser.parse)
+        if self.debug != 0: self.dump('2. --> Parser', ast)
 
         semantic_analyzer = SemanticAnalyzer(ast)
-        analyzed_ast = semantic_analyzer.analyze()
-        if self.debug != 0: print('3. ---> Semantic Analizer:\n\n' + str(analyzed_ast) + '\n\n\n')
+        analyzed_ast = self.run_phase(SEMANTIC_PHASE, semantic_analyzer.analyze)
+        if self.debug != 0: self.dump('3. ---> Semantic Analizer', analyzed_ast)
 
-        code_generator = CodeGenerator(analyzed_ast)
-        compiled_code = code_generator.generate()
-        if self.debug != 0: print('4. ----> Code Generator:\n\n' + str(compiled_code) + '\n\n\n')
+        if self.optimize:
+            optimizer = Optimizer(analyzed_ast, self.optimizer_flags, semantic_analyzer)
+            analyzed_ast = self.run_phase(OPTIMIZER_PHASE, optimizer.optimize)
+            self.optimizer_counters = optimizer.counters
+            if self.debug != 0: self.dump('3. ---> Optimizer', optimizer.counters, analyzed_ast)
+
+        if self.memoize is not None:
+            self.memoized_functions = self.run_phase(MEMOIZER_PHASE, Memoizer(analyzed_ast, semantic_analyzer, self.memoize).memoize)
+            if self.debug != 0: self.dump('3. ---> Memoizer', self.memoized_functions)
+
+        if self.slots:
+            self.class_slots = self.run_phase(SLOTS_PHASE, SlotsCollector(analyzed_ast).collect)
+            if self.debug != 0: self.dump('3. ---> Slots Collector', self.class_slots)
+        return analyzed_ast
+
+
+    '''
+    Run a phase of the compilation, recording it on the instrumentation if any.
+
+    @type phase: str
+    @param phase: name of the phase
+
+    @type function: function
+    @param function: function running the phase
+
+    @type arguments: list
+    @param arguments: arguments of the function
+
+    @rtype: object
+    @returns: result of the function
+    '''
+    def run_phase(self, phase, function, *arguments):
+        if self.instrumentation is None:
+            return function(*arguments)
+        return self.instrumentation.run(phase, function, *arguments)
+
+
+    '''
+    Print the results of a phase for debugging, each one bounded in depth and length by the
+    instrumentation, or by DUMP_DEPTH and DUMP_LENGTH without instrumentation.
+
+    @type title: str
+    @param title: title of the phase
+
+    @type values: list
+    @param values: results of the phase
+    '''
+    def dump(self, title, *values):
+        depth, length = DUMP_DEPTH, DUMP_LENGTH
+        if self.instrumentation is not None:
+            depth, length = self.instrumentation.dump_depth, self.instrumentation.dump_length
+        print(title + ':\n\n' + '\n\n'.join(bounded_dump(value, depth, length) for value in values) + '\n\n\n')
+
+
+'''
+Iterate the given iterable or async iterable asynchronously.
+
+@type items: iterable or async iterable
+@param items: items to iterate
+
+@rtype: async iterator
+@returns: the items
+'''
+async def iterate(items):
+    if hasattr(items, '__aiter__'):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
+
+
+'''
+Compile the given python code on a worker process of Compiler.compile_async.
+
+@type compiler: Compiler
+@param compiler: compiler to compile with
+
+@type source_code: str
+@param source_code: python code to compile
+
+@type target: str
+@param target: TEXT_TARGET or CODE_TARGET
+
+@type filename: str
+@param filename: file name shown in the tracebacks of the code object
+
+@rtype: str or bytes
+@returns: compiled python code, or marshalled code object
+'''
+def compile_job(compiler, source_code, target, filename):
+    result = compiler.compile(source_code, target, filename)
+    return marshal.dumps(result) if target == CODE_TARGET else result
+
+
+'''
+Find the source files on the given paths, and the paths of their compiled files.
+
+@type paths: list
+@param paths: paths of source files and directories
+
+@type output_directory: str
+@param output_directory: directory the compiled files are written under, or None to write them next to their source files
+
+@rtype: list
+@returns: (source path, compiled path, size) of each source file, largest first
+'''
+def find_sources(paths, output_directory):
+    excluded = os.path.realpath(output_directory) if output_directory is not None else None
+    # (source path, directory its compiled path is relative to) pairs
+    sources = []
+    for path in paths:
+        if not os.path.isdir(path):
+            sources.append((path, os.path.dirname(path)))
+            continue
+        for directory, directories, names in os.walk(path):
+            directories[:] = sorted(name for name in directories if os.path.realpath(os.path.join(directory, name)) != excluded)
+            for name in sorted(names):
+                if name.endswith(SOURCE_EXTENSION) and not name.endswith(COMPILED_SUFFIX):
+                    sources.append((os.path.join(directory, name), path))
+
+    jobs = []
+    for source, root in sources:
+        if output_directory is None:
+            compiled = source[:-len(SOURCE_EXTENSION)] + COMPILED_SUFFIX if source.endswith(SOURCE_EXTENSION) else source + COMPILED_SUFFIX
+        else:
+            compiled = os.path.join(output_directory, os.path.relpath(source, root) if root else source)
+        try:
+            size = os.path.getsize(source)
+        except OSError:
+            size = 0
+        jobs.append((source, compiled, size))
+    jobs.sort(key=lambda job: -job[2])
+    return jobs
+
+
+'''
+Set the compiler of a batch worker process.
+
+@type compiler: Compiler
+@param compiler: compiler the worker compiles with
+'''
+def start_batch_worker(compiler):
+    global batch_compiler
+    batch_compiler = compiler
+
+
+'''
+Compile a chunk of source files, writing their compiled files.
+
+@type chunk: list
+@param chunk: (source path, compiled path, size) of each file
+
+@type compiler: Compiler
+@param compiler: compiler to compile with, the one of the batch worker process if None
+
+@rtype: list
+@returns: (source path, compiled path, seconds, bytes, error or None) of each file
+'''
+def compile_chunk(chunk, compiler=None):
+    compiler = compiler if compiler is not None else batch_compiler
+    results = []
+    for source, compiled, size in chunk:
+        start = time.perf_counter()
+        error = None
+        try:
+            with open(source) as file:
+                compiled_code = compiler.compile(file.read())
+            directory = os.path.dirname(compiled)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(compiled, 'w') as file:
+                file.write(compiled_code)
+        except Exception as exception:
+            error = f'{exception.__class__.__name__}: {exception}'
+        results.append((source, compiled, time.perf_counter() - start, size, error))
+    return results
+
+
+'''
+Compile the source files of the chunks which broke the pool of worker processes, one at a time
+on a worker of their own, so a file killing its worker fails alone. The worker is replaced
+after each file breaking it.
+
+@type jobs: list
+@param jobs: (source path, compiled path, size) of each file
+
+@type compiler: Compiler
+@param compiler: compiler the workers compile with
+
+@rtype: list
+@returns: (source path, compiled path, seconds, bytes, error or None) of each file
+'''
+def compile_broken_jobs(jobs, compiler):
+    results = []
+    executor = None
+    try:
+        for job in jobs:
+            if executor is None:
+                executor = ProcessPoolExecutor(1, initializer=start_batch_worker, initargs=(compiler,))
+            start = time.perf_counter()
+            try:
+                results.extend(executor.submit(compile_chunk, [job]).result())
+            except BrokenProcessPool as exception:
+                executor.shutdown(wait=False)
+                executor = None
+                results.append((job[0], job[1], time.perf_counter() - start, job[2], f'BrokenProcessPool: {exception}'))
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    return results
@@ -0,0 +1,302 @@
+import io
+import json
+import time
+import marshal
+import pstats
+import cProfile
+import threading
+import tracemalloc
+from collections import deque
+from ast_nodes import Node
+from optimizer import count_nodes
+'''
+Records what each phase of a compilation costs and produces: wall and CPU time, tokens per
+second, AST node counts, output bytes and peak allocations. Records are handed to the
+registered hooks as each phase ends, and can be exported as JSON. A chosen phase can be run
+under cProfile.
+
+Also dumps the results of the phases for debugging, bounded in depth and length so a dump
+costs no more than the phase it shows.
+
+@author Nicolás Rodrigo Pèrez
+@date 17-10-2026
+@version 1.0
+'''
+
+# phases of a compilation, as named on the records
+LEXER_PHASE = 'lexer'
+PARSER_PHASE = 'parser'
+SEMANTIC_PHASE = 'semantic_analyzer'
+OPTIMIZER_PHASE = 'optimizer'
+MEMOIZER_PHASE = 'memoizer'
+SLOTS_PHASE = 'slots_collector'
+GENERATOR_PHASE = 'code_generator'
+# phases whose result is an AST, whose nodes are counted
+AST_PHASES = (PARSER_PHASE, SEMANTIC_PHASE, OPTIMIZER_PHASE)
+# default depth of the AST nodes and length of the text of the debug dumps
+DUMP_DEPTH = 12
+DUMP_LENGTH = 4000
+
+
+class Instrumentation:
+
+
+    '''
+    Create new Instrumentation object, given to the Compiler to record its phases.
+
+    A compiler sent to worker processes takes a copy of its instrumentation, without the profile,
+    so the hooks must be picklable, and the records are kept on the copies.
+    Compilations running on several threads share the records, each phase recording its own,
+    and run the profiled phase one at a time. Peak allocations are measured on the whole process.
+
+    @type hooks: list
+    @param hooks: functions called with the record of each phase as it ends
+
+    @type trace_allocations: bool
+    @param trace_allocations: true to record the peak of the memory allocated by each phase, which slows it down
+
+    @type profile_phase: str
+    @param profile_phase: phase run under cProfile, or None
+
+    @type max_records: int
+    @param max_records: number of records kept, the oldest being dropped
+
+    @type dump_depth: int
+    @param dump_depth: depth of the AST nodes shown by the debug dumps
+
+    @type dump_length: int
+    @param dump_length: number of characters shown by the debug dumps
+    '''
+    def __init__(self, hooks=None, trace_allocations=False, profile_phase=None, max_records=1000,
+                 dump_depth=DUMP_DEPTH, dump_length=DUMP_LENGTH):
+        self.hooks = list(hooks) if hooks is not None else []
+        self.trace_allocations = trace_allocations
+        self.profile_phase = profile_phase
+        self.dump_depth = dump_depth
+        self.dump_length = dump_length
+        # records of the last phases run, oldest first
+        self.records = deque(maxlen=max_records)
+        # count, wall and CPU seconds of all the runs of each phase, indexed by phase
+        self.totals = {}
+        # profile of the runs of the profiled phase, created when first run
+        self.profile = None
+        self.lock = threading.Lock()
+        # held while the profiled phase runs, as a profile cannot run on several threads at once
+        self.profile_lock = threading.Lock()
+
+
+    '''
+    Register a function called with the record of each phase as it ends.
+
+    @type hook: function
+    @param hook: function taking the record
+    '''
+    def add_hook(self, hook):
+        self.hooks.append(hook)
+
+
+    '''
+    Run a phase of a compilation, recording it.
+
+    @type phase: str
+    @param phase: name of the phase
+
+    @type function: function
+    @param function: function running the phase
+
+    @type arguments: list
+    @param arguments: arguments of the function
+
+    @rtype: object
+    @returns: result of the function
+    '''
+    def run(self, phase, function, *arguments):
+        tracing = self.trace_allocations and not tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.start()
+        if self.trace_allocations:
+            tracemalloc.reset_peak()
+            allocated = tracemalloc.get_traced_memory()[0]
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+
+        try:
+            if phase == self.profile_phase:
+                with self.profile_lock:
+                    if self.profile is None:
+                        self.profile = cProfile.Profile()
+                    result = self.profile.runcall(function, *arguments)
+            else:
+                result = function(*arguments)
+        finally:
+            wall_seconds = time.perf_counter() - wall_start
+            cpu_seconds = time.thread_time() - cpu_start
+            if self.trace_allocations:
+                peak_bytes = tracemalloc.get_traced_memory()[1] - allocated
+            if tracing:
+                tracemalloc.stop()
+
+        record = {'phase': phase, 'wall_seconds': wall_seconds, 'cpu_seconds': cpu_seconds}
+        if self.trace_allocations:
+            record['peak_bytes'] = peak_bytes
+        self.measure(record, result)
+        self.records.append(record)
+        with self.lock:
+            totals = self.totals.setdefault(phase, {'count': 0, 'wall_seconds': 0.0, 'cpu_seconds': 0.0})
+            totals['count'] += 1
+            totals['wall_seconds'] += wall_seconds
+            totals['cpu_seconds'] += cpu_seconds
+        for hook in self.hooks:
+            hook(record)
+        return result
+
+
+    '''
+    Add to the record of a phase the measures of its result: the tokens and tokens per second of
+    the lexer, the AST nodes of the phases producing an AST, and the bytes of the generated code.
+
+    @type record: dict
+    @param record: record of the phase
+
+    @type result: object
+    @param result: result of the phase
+    '''
+    def measure(self, record, result):
+        phase = record['phase']
+        if phase == LEXER_PHASE and hasattr(result, '__len__'):
+            record['tokens'] = len(result)
+            record['tokens_per_second'] = len(result) / record['wall_seconds'] if record['wall_seconds'] else 0.0
+        elif phase in AST_PHASES and isinstance(result, Node):
+            record['nodes'] = count_nodes([result])
+        elif phase == GENERATOR_PHASE:
+            if isinstance(result, str):
+                record['output_bytes'] = len(result.encode())
+            elif hasattr(result, 'co_code'):
+                record['output_bytes'] = len(marshal.dumps(result))
+
+
+    '''
+    Get the statistics of the profiled phase.
+
+    @type sort: str
+    @param sort: pstats sort key
+
+    @type limit: int
+    @param limit: number of functions shown
+
+    @rtype: str
+    @returns: statistics as text, or an empty string if the phase was not profiled yet
+    '''
+    def profile_stats(self, sort='cumulative', limit=20):
+        if self.profile is None:
+            return ''
+        output = io.StringIO()
+        pstats.Stats(self.profile, stream=output).sort_stats(sort).print_stats(limit)
+        return output.getvalue()
+
+
+    '''
+    Export the records and the totals of each phase as JSON.
+
+    @type indent: int
+    @param indent: indentation of the JSON, or None to write it in one line
+
+    @rtype: str
+    @returns: JSON object with the 'records' list and the 'totals' of each phase
+    '''
+    def to_json(self, indent=None):
+        with self.lock:
+            return json.dumps({'records': list(self.records), 'totals': self.totals}, indent=indent)
+
+
+    '''
+    Forget the records, the totals and the profile.
+    '''
+    def clear(self):
+        with self.lock:
+            self.records.clear()
+            self.totals = {}
+            self.profile = None
+
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['lock']
+        del state['profile_lock']
+        state['profile'] = None
+        return state
+
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
+        self.profile_lock = threading.Lock()
+
+
+'''
+Convert the given value to text for debugging, bounded in depth and length. AST nodes are
+shown in the tuple shape of ast_nodes.to_tuple, down to the given depth, and sized values
+such as token buffers item by item, so the text is built only up to the given length.
+
+@type value: object
+@param value: value to show
+
+@type depth: int
+@param depth: depth of the AST nodes shown, deeper nodes being shown as '...'
+
+@type length: int
+@param length: number of characters shown, longer text being cut with ' ...'
+
+@rtype: str
+@returns: text of the value
+'''
+def bounded_dump(value, depth=DUMP_DEPTH, length=DUMP_LENGTH):
+    if not isinstance(value, Node):
+        if not hasattr(value, '__len__') or not hasattr(value, '__iter__') or isinstance(value, (str, dict)):
+            text = str(value)
+            return text if len(text) <= length else text[:length] + ' ...'
+        pieces = []
+        size = 1
+        for item in value:
+            pieces.append(repr(item))
+            size += len(pieces[-1]) + 2
+            if size > length:
+                return ('[' + ', '.join(pieces))[:length] + ' ...'
+        return '[' + ', '.join(pieces) + ']'
+
+    # text pieces and (node, depth) pairs still to show, the next one last
+    stack = [(value, 0)]
+    pieces = []
+    size = 0
+    while stack:
+        item = stack.pop()
+        if item.__class__ is str:
+            piece = item
+        else:
+            node, node_depth = item
+            if node_depth >= depth:
+                piece = '...'
+            else:
+                piece = f'({node.kind!r}'
+                following = []
+                for field in node.fields:
+                    field_value = getattr(node, field)
+                    following.append(', ')
+                    if isinstance(field_value, Node):
+                        following.append((field_value, node_depth + 1))
+                    elif field_value.__class__ is list:
+                        following.append('[')
+                        for index, child in enumerate(field_value):
+                            if index:
+                                following.append(', ')
+                            following.append((child, node_depth + 1) if isinstance(child, Node) else repr(child))
+                        following.append(']')
+                    else:
+                        following.append(repr(field_value))
+                following.append(')')
+                stack.extend(reversed(following))
+        pieces.append(piece)
+        size += len(piece)
+        if size > length:
+            return ''.join(pieces)[:length] + ' ...'
+    return ''.join(pieces)
@@ -1,4 +1,6 @@
+import io
 import re
+from token_buffer import TokenBuffer, intern_kind
 '''
 Tokenizes a raw string into a list of basic python tokens.
 
@@ -6,8 +8,61 @@ Tokenizes a raw string into a list of basic python tokens.
 @date 02-05-2023
 @version 1.0
 '''
+
+# (pattern, token type) pairs tried in order, token type None to skip; built once and shared by all the Lexer objects
+TOKEN_PATTERNS = [
+    (r'\bif\b', 'IF'),
+    (r'\belif\b', 'ELIF'),
+    (r'\belse\b', 'ELSE'),
+    (r'\bfor\b', 'FOR'),
+    (r'\bin\b', 'IN'),
+    (r'\bwhile\b', 'WHILE'),
+    (r'\bclass\b', 'CLASS'),
+    (r'\bdef\b', 'DEF'),
+    (r'\breturn\b', 'RETURN'),
+    (r'\bimport\b', 'IMPORT'),
+    (r'\bas\b', 'AS'),
+    (r'\bTrue\b', 'TRUE'),
+    (r'\bFalse\b', 'FALSE'),
+    (r'\bNone\b', 'NONE'),
+    (r'\bpass\b', 'PASS'),
+    (r'\band\b', 'AND'),
+    (r'\bor\b', 'OR'),
+    (r'\bnot\b', 'NOT'),
+    (r'\b[A-Z][A-Za-z0-9_]*\b', 'CLASS_IDENTIFIER'),
+    (r'\b[a-z_][a-z0-9_]*\b', 'IDENTIFIER'),
+    (r':=', 'WALRUS'),
+    (r'==', 'EQUALS'),
+    (r'=', 'ASSIGN'),
+    (r'!=', 'NOT_EQUALS'),
+    (r'>=', 'GREATER_THAN_EQUAL'),
+    (r'>', 'GREATER_THAN'),
+    (r'<=', 'LESS_THAN_EQUAL'),
+    (r'<', 'LESS_THAN'),
+    (r'\d+', 'NUMBER'),
+    (r'".*?"', 'STRING'),
+    (r'\+', 'ADD'),
+    (r'-', 'SUBTRACT'),
+    (r'\*', 'MULTIPLY'),
+    (r'/', 'DIVIDE'),
+    (r'\(', 'LEFT_PAREN'),
+    (r'\)', 'RIGHT_PAREN'),
+    (r'\[', 'LEFT_BRACKET'),
+    (r'\]', 'RIGHT_BRACKET'),
+    (r'{', 'LEFT_BRACE'),
+    (r'}', 'RIGHT_BRACE'),
+    (r'\.', 'DOT'),
+    (r',', 'COMMA'),
+    (r':', 'COLON'),
+    (r'\\', 'SLASH'),
+    (r'\s+', None)  # Skip whitespace
+]
+COMMENT_PATTERN = re.compile(r'\s*#.*\n*')
+
+
 class Lexer:
-    
+
+    master_patterns = {}
 
     '''
     Create new Lexer object which defines some of the most common keywords in python.
@@ -20,54 +75,13 @@ class Lexer:
         self.tokens = []
         self.lineno = 1
         self.indentation_stack = [0]
+        # per line snapshots, used to re-lex only the edited lines
+        self.line_token_starts = []
+        self.line_indentations = []
         self.default_indentation = 4
-        self.token_patterns = [
-            (r'\bif\b', 'IF'),
-            (r'\belif\b', 'ELIF'),
-            (r'\belse\b', 'ELSE'),
-            (r'\bfor\b', 'FOR'),
-            (r'\bin\b', 'IN'),
-            (r'\bwhile\b', 'WHILE'),
-            (r'\bclass\b', 'CLASS'),
-            (r'\bdef\b', 'DEF'),
-            (r'\breturn\b', 'RETURN'),
-            (r'\bimport\b', 'IMPORT'),
-            (r'\bas\b', 'AS'),
-            (r'\bTrue\b', 'TRUE'),
-            (r'\bFalse\b', 'FALSE'),
-            (r'\bNone\b', 'NONE'),
-            (r'\bpass\b', 'PASS'),
-            (r'\band\b', 'AND'),
-            (r'\bor\b', 'OR'),
-            (r'\bnot\b', 'NOT'),
-            (r'\b[A-Z][A-Za-z0-9_]*\b', 'CLASS_IDENTIFIER'),
-            (r'\b[a-z_][a-z0-9_]*\b', 'IDENTIFIER'),
-            (r':=', 'WALRUS'),
-            (r'==', 'EQUALS'),
-            (r'=', 'ASSIGN'),
-            (r'!=', 'NOT_EQUALS'),
-            (r'>=', 'GREATER_THAN_EQUAL'),
-            (r'>', 'GREATER_THAN'),
-            (r'<=', 'LESS_THAN_EQUAL'),
-            (r'<', 'LESS_THAN'),
-            (r'\d+', 'NUMBER'),
-            (r'".*?"', 'STRING'),
-            (r'\+', 'ADD'),
-            (r'-', 'SUBTRACT'),
-            (r'\*', 'MULTIPLY'),
-            (r'/', 'DIVIDE'),
-            (r'\(', 'LEFT_PAREN'),
-            (r'\)', 'RIGHT_PAREN'),
-            (r'\[', 'LEFT_BRACKET'),
-            (r'\]', 'RIGHT_BRACKET'),
-            (r'{', 'LEFT_BRACE'),
-            (r'}', 'RIGHT_BRACE'),
-            (r'\.', 'DOT'),
-            (r',', 'COMMA'),
-            (r':', 'COLON'),
-            (r'\\', 'SLASH'),
-            (r'\s+', None)  # Skip whitespace
-        ]
+        self.token_patterns = TOKEN_PATTERNS
+        self.master_pattern = self.compile_token_patterns(self.token_patterns)
+        self.comment_pattern = COMMENT_PATTERN
 
 
     '''
@@ -82,11 +96,161 @@ class Lexer:
         source_code_lines = source_code.split('\n')
 
         for line in source_code_lines:
+            self.save_line_state()
             self.process_line(line)
 
         return self.tokens
 
 
+    '''
+    Stores the position of the next token and the indentation stack before tokenizing a line.
+    '''
+    def save_line_state(self):
+        indentation = tuple(self.indentation_stack)
+        if self.line_indentations and self.line_indentations[-1] == indentation:
+            indentation = self.line_indentations[-1]
+        self.line_token_starts.append(len(self.tokens))
+        self.line_indentations.append(indentation)
+
+
+    '''
+    Incremental version of tokenize, which updates the tokens of a previously tokenized source
+    after some of its lines were edited. Lexing restarts at the first edited line from the
+    indentation stack saved for it, and stops after the last edited line as soon as the
+    indentation stack matches the one saved for the same old line, reusing the rest of
+    the tokens with their line numbers shifted.
+
+    @raise SyntaxError: if invalid syntax is detected
+    @raise IndentationError: if invalid indentation is detected
+
+    @type source_code: str
+    @param source_code: edited string to tokenize
+
+    @type start_line: int
+    @param start_line: first edited line on the edited string
+
+    @type end_line: int
+    @param end_line: last edited line on the edited string, start_line - 1 if lines were only deleted
+
+    @rtype: tuple
+    @returns: index of the first changed token, and the indexes after the last changed token on the old and new tokens
+    '''
+    def relex(self, source_code, start_line, end_line):
+        source_code_lines = source_code.split('\n')
+        line_delta = len(source_code_lines) - len(self.line_token_starts)
+        if start_line < 1 or end_line < start_line - 1 or end_line - line_delta > len(self.line_token_starts):
+            raise ValueError(f"Invalid edited lines: {start_line}-{end_line}")
+
+        old_tokens = self.tokens
+        old_token_starts = self.line_token_starts
+        old_indentations = self.line_indentations
+        old_indentation_stack = self.indentation_stack
+        old_lineno = self.lineno
+        first_line = min(start_line, len(old_token_starts)) - 1
+        first_token = old_token_starts[first_line] if old_token_starts else 0
+
+        self.tokens = old_tokens[:first_token]
+        self.line_token_starts = old_token_starts[:first_line]
+        self.line_indentations = old_indentations[:first_line]
+        self.indentation_stack = list(old_indentations[first_line]) if old_indentations else [0]
+        self.lineno = first_line + 1
+        try:
+            index = first_line
+            while index < len(source_code_lines):
+                old_index = index - line_delta
+                if index >= end_line and old_index < len(old_indentations) and old_indentations[old_index] == tuple(self.indentation_stack):
+                    break
+                self.save_line_state()
+                self.process_line(source_code_lines[index])
+                index += 1
+        except Exception:
+            self.tokens = old_tokens
+            self.line_token_starts = old_token_starts
+            self.line_indentations = old_indentations
+            self.indentation_stack = old_indentation_stack
+            self.lineno = old_lineno
+            raise
+
+        new_token_end = len(self.tokens)
+        if index < len(source_code_lines):
+            old_token_end = old_token_starts[index - line_delta]
+            token_delta = new_token_end - old_token_end
+            if line_delta == 0:
+                self.tokens.extend(old_tokens[old_token_end:])
+            else:
+                self.tokens.extend((token_type, value, lineno + line_delta) for token_type, value, lineno in old_tokens[old_token_end:])
+            if token_delta == 0:
+                self.line_token_starts.extend(old_token_starts[index - line_delta:])
+            else:
+                self.line_token_starts.extend(token_start + token_delta for token_start in old_token_starts[index - line_delta:])
+            self.line_indentations.extend(old_indentations[index - line_delta:])
+            self.indentation_stack = old_indentation_stack
+            self.lineno = len(source_code_lines) + 1
+        else:
+            old_token_end = len(old_tokens)
+
+        self.source_code = source_code
+        return first_token, old_token_end, new_token_end
+
+
+    '''
+    Compact version of tokenize, which stores the tokens on a TokenBuffer with integer
+    token kinds and offsets into the source code, instead of a list of tuples.
+
+    @raise SyntaxError: if invalid syntax is detected
+    @raise IndentationError: if invalid indentation is detected
+
+    @rtype: TokenBuffer
+    @returns: a buffer holding the tokens
+    '''
+    def tokenize_compact(self):
+        source_code = self.source_code
+        buffer = TokenBuffer(source_code)
+        append = buffer.append
+        kind_codes = {token_type: intern_kind(token_type) for pattern, token_type in self.token_patterns if token_type}
+        indentation_kinds = {'INDENT': intern_kind('INDENT'), 'DEDENT': intern_kind('DEDENT')}
+        line_start = 0
+
+        for line in source_code.split('\n'):
+            if self.handle_single_line_comment(line) or self.handle_empty_line(line):
+                self.lineno += 1
+            else:
+                for token_type, level, lineno in self.handle_indentation(line):
+                    append(indentation_kinds[token_type], lineno, level, line_start, line_start)
+                start, end = self.get_stripped_bounds(line)
+                for token_type, token_start, token_end in self.match_tokens(line, start, end):
+                    append(kind_codes[token_type], self.lineno, token_start, line_start + token_start, line_start + token_end)
+                self.lineno += 1
+            line_start += len(line) + 1
+
+        return buffer
+
+
+    '''
+    Streaming version of tokenize, which reads the source line by line and yields
+    each token as soon as its line is processed, without storing the tokens.
+
+    @raise SyntaxError: if invalid syntax is detected
+    @raise IndentationError: if invalid indentation is detected
+
+    @type source: str or file
+    @param source: string or text file object to tokenize, the Lexer source code if None
+
+    @rtype: generator
+    @returns: a generator of tokens
+    '''
+    def iter_tokens(self, source=None):
+        if source is None:
+            source = self.source_code
+        if isinstance(source, str):
+            source = io.StringIO(source)
+
+        for line in source:
+            if line.endswith('\n'):
+                line = line[:-1]
+            yield from self.scan_line(line)
+
+
     '''
     Goes through the chars in a line of the string to tokenize,
     looking for a match in the available token patterns.
@@ -97,38 +261,121 @@ class Lexer:
     @param line: line of the string to tokenize
     '''
     def process_line(self, line):
+        self.tokens.extend(self.scan_line(line))
+
+
+    '''
+    Yields the tokens found in a line of the string to tokenize, including
+    the INDENT and DEDENT tokens it opens or closes.
+
+    @raise SyntaxError: if invalid syntax is detected
+    @raise IndentationError: if invalid indentation is detected
+
+    @type line: str
+    @param line: line of the string to tokenize
+
+    @rtype: generator
+    @returns: a generator of tokens
+    '''
+    def scan_line(self, line):
 
         if self.handle_single_line_comment(line):
             self.lineno += 1
         elif self.handle_empty_line(line):
             self.lineno += 1
         else:
-            self.handle_indentation(line)
-            line = line.strip()
-            while line:
-                matched = False
-                for pattern, token_type in self.token_patterns:
-                    match = re.match('^' + pattern, line)
-                    if match:
-                        value = match.group(0)
-                        if token_type:
-                            self.tokens.append((token_type, value, self.lineno))
-                        line = line[len(value):]
-                        matched = True
-                        break
-                if not matched:
-                    raise SyntaxError(f"Invalid syntax in line {self.lineno}: {line}")
+            yield from self.handle_indentation(line)
+            start, end = self.get_stripped_bounds(line)
+            for token_type, token_start, token_end in self.match_tokens(line, start, end):
+                yield (token_type, line[token_start:token_end], self.lineno)
             self.lineno += 1
 
 
     '''
-    Adds INDENT and DEDENT tokens depending on the indentation level on the actual line,
+    Goes through the chars of a line between two offsets, yielding the type and offsets
+    of each token matched by the master pattern, and skipping whitespace.
+
+    @raise SyntaxError: if invalid syntax is detected
+
+    @type line: str
+    @param line: line of the string to tokenize
+
+    @type position: int
+    @param position: offset on the line where the tokens start
+
+    @type end: int
+    @param end: offset on the line where the tokens end
+
+    @rtype: generator
+    @returns: a generator of (token type, start offset, end offset) tuples
+    '''
+    def match_tokens(self, line, position, end):
+        match_token = self.master_pattern.match
+        while position < end:
+            match = match_token(line, position, end)
+            if match is None:
+                raise SyntaxError(f"Invalid syntax in line {self.lineno}: {line[position:end]}")
+            token_type = match.lastgroup
+            if token_type != '_SKIP':
+                yield (token_type, position, match.end())
+            position = match.end()
+
+
+    '''
+    Calculate the offsets where the actual line starts and ends once stripped of surrounding whitespace.
+
+    @type line: str
+    @param line: line of the string to tokenize
+
+    @rtype: tuple
+    @returns: start and end offsets of the stripped line
+    '''
+    def get_stripped_bounds(self, line):
+        start = len(line) - len(line.lstrip())
+        end = len(line.rstrip())
+        return start, end
+
+
+    '''
+    Compiles the token patterns into a single regular expression, made of one named group
+    per token type, so a token is found with one match call instead of trying each pattern.
+    Patterns keep their priority, as the alternation is tried in the same order as the list.
+
+    Leading word boundaries are dropped, as every pattern starting with one also starts with
+    a word character, and the boundary would otherwise look at the previous token.
+    Compiled expressions are shared between all Lexer objects with the same token patterns.
+
+    @type token_patterns: list
+    @param token_patterns: list of (pattern, token type) pairs, token type None to skip
+
+    @rtype: re.Pattern
+    @returns: compiled master pattern
+    '''
+    def compile_token_patterns(self, token_patterns):
+        key = tuple(token_patterns)
+        master_pattern = Lexer.master_patterns.get(key)
+        if master_pattern is None:
+            groups = []
+            for pattern, token_type in token_patterns:
+                if pattern.startswith(r'\b'):
+                    pattern = pattern[2:]
+                groups.append(f'(?P<{token_type or "_SKIP"}>{pattern})')
+            master_pattern = re.compile('|'.join(groups))
+            Lexer.master_patterns[key] = master_pattern
+        return master_pattern
+
+
+    '''
+    Yields INDENT and DEDENT tokens depending on the indentation level on the actual line,
     using a stack holding the indentation levels.
 
     @raise IndentationError: if invalid indentation is detected
 
     @type line: str
     @param line: line of the string to tokenize
+
+    @rtype: generator
+    @returns: a generator of INDENT and DEDENT tokens
     '''
     def handle_indentation(self, line):
         indentation_level = self.get_indentation_level(line)
@@ -137,13 +384,11 @@ class Lexer:
             if self.indentation_stack:
                 if indentation_level > self.indentation_stack[-1]:
                     self.indentation_stack.append(indentation_level)
-                    self.tokens.append(('INDENT', indentation_level, self.lineno))
-                    #print(str(self.tokens[-1]) + ' -- ' + line + '\n')
+                    yield ('INDENT', indentation_level, self.lineno)
                 elif indentation_level < self.indentation_stack[-1]:
                     while self.indentation_stack[-1] > indentation_level:
-                        self.tokens.append(('DEDENT', self.indentation_stack[-1], self.lineno))
+                        yield ('DEDENT', self.indentation_stack[-1], self.lineno)
                         self.indentation_stack.pop()
-                        #print(str(self.tokens[-1]) + ' -- ' + line + '\n')
         else:
             raise IndentationError(f"Invalid indentation in line {self.lineno}: {line}")
         
@@ -179,8 +424,7 @@ class Lexer:
     @returns: true if comment found, else false
     '''
     def handle_single_line_comment(self, line):
-        comment_pattern = r'\s*#.*\n*'
-        if re.match('^' + comment_pattern, line):
+        if self.comment_pattern.match(line):
             return True
         else:
             return False
@@ -0,0 +1,76 @@
+from ast_nodes import Identifier, Number, TrueLiteral, FunctionCall, ExpressionAttributeAccess, Import, As
+from optimizer import find_pure_functions
+'''
+Memoizes the pure top-level functions of an analyzed AST, decorating them with a bounded least
+recently used cache of the functools module, so repeated calls with the same arguments return
+the cached result instead of running the function again.
+
+Pure functions are the ones the partial evaluation of the Optimizer evaluates: they only assign
+their own variables, branch, loop over ranges and return, and only call pure functions, so their
+result only depends on their arguments. Each memoized function of the generated module keeps the
+statistics of its cache, read with its cache_info method or with memoization_stats.
+
+@author Nicolás Rodrigo Pèrez
+@date 17-10-2026
+@version 1.0
+'''
+
+# name the functools module is imported as on the generated code
+FUNCTOOLS_ALIAS = '_functools'
+
+
+class Memoizer:
+
+
+    '''
+    Create new Memoizer object.
+
+    @type ast: Program
+    @param ast: an analyzed AST
+
+    @type analyzer: SemanticAnalyzer
+    @param analyzer: semantic analyzer which analyzed the AST
+
+    @type maxsize: int
+    @param maxsize: maximum number of results cached for each function
+    '''
+    def __init__(self, ast, analyzer, maxsize=128):
+        self.ast = ast
+        self.analyzer = analyzer
+        self.maxsize = maxsize
+
+
+    '''
+    Main function which decorates the pure top-level functions of the AST with a cache, importing
+    the functools module before them. Arguments are cached by type too, so 1 and True are not the
+    same arguments, as they are not for the evaluation of the function.
+
+    @rtype: list
+    @returns: names of the memoized functions
+    '''
+    def memoize(self):
+        statements = self.ast.statements
+        pure_functions = find_pure_functions(statements, self.analyzer)
+        functions = [statement for statement in statements if statement in pure_functions]
+        for function in functions:
+            cache = FunctionCall(Identifier('lru_cache'), [Number(str(self.maxsize)), TrueLiteral('True')], function.line)
+            function.decorators.append(ExpressionAttributeAccess(Identifier(FUNCTOOLS_ALIAS), [cache], function.line))
+        if functions:
+            statements.insert(0, Import(As(Identifier(FUNCTOOLS_ALIAS), Identifier('functools')), statements[0].line))
+        return [function.name.value for function in functions]
+
+
+'''
+Get the cache statistics of the memoized functions of an executed generated module.
+
+@type namespace: dict
+@param namespace: global namespace the generated code was executed on
+
+@type names: list
+@param names: names of the memoized functions, as returned by Memoizer.memoize
+
+@rtype: dict
+@returns: hits, misses, maxsize and currsize of the cache of each function, indexed by function name
+'''
+def memoization_stats(namespace, names):
+    return {name: namespace[name].cache_info()._asdict() for name in names}
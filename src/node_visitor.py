@@ -0,0 +1,76 @@
+'''
+Visits the nodes of an AST without recursion, using an explicit stack,
+so deeply nested ASTs can be visited without reaching the recursion limit.
+
+@author Nicolás Rodrigo Pèrez
+@date 17-10-2026
+@version 1.0
+'''
+class NodeVisitor:
+
+
+    '''
+    Visit the given AST node in post-order. For each node type, the subclass defines a
+    children_<node type> method returning the list of child nodes to visit before the node,
+    and a leave_<node type> method receiving the node and the results of its visited children.
+    Node types without a children method have no children to visit.
+
+    @raise TypeError: if the AST node is not valid
+
+    @type node: Node
+    @param node: AST node
+
+    @returns: result of the leave method of the node
+    '''
+    def visit(self, node):
+        handlers = self.get_handlers()
+        # nodes still to visit, and the [leave method, node, children count] frames of the nodes whose children are being visited
+        stack = [node]
+        results = []
+        pop = stack.pop
+        push = stack.append
+        push_all = stack.extend
+        append = results.append
+        get_handlers = handlers.get
+
+        while stack:
+            node = pop()
+            if node.__class__ is list:
+                leave, node, count = node
+                children_results = results[-count:]
+                del results[-count:]
+                append(leave(self, node, children_results))
+                continue
+            node_handlers = get_handlers(node.kind)
+            if node_handlers is None:
+                raise TypeError(f"Invalid node type: {node.kind}")
+            children, leave = node_handlers
+            if children is not None:
+                children = children(self, node)
+                if children:
+                    push([leave, node, len(children)])
+                    push_all(reversed(children))
+                    continue
+            append(leave(self, node, []))
+
+        return results[-1]
+
+
+    '''
+    Get the children and leave methods of the visitor class, indexed by node type.
+    Handlers are collected once per class.
+
+    @rtype: dict
+    @returns: (children method or None, leave method) pairs indexed by node type
+    '''
+    def get_handlers(self):
+        cls = self.__class__
+        handlers = cls.__dict__.get('_handlers')
+        if handlers is None:
+            handlers = {}
+            for name in dir(cls):
+                if name.startswith('leave_'):
+                    node_type = name[len('leave_'):]
+                    handlers[node_type] = (getattr(cls, 'children_' + node_type, None), getattr(cls, name))
+            cls._handlers = handlers
+        return handlers
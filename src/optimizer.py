@@ -0,0 +1,1575 @@
+import ast
+import copy
+from node_visitor import NodeVisitor
+from ast_nodes import (NODE_CLASSES, Node, Leaf, Identifier, Number, String, NoneLiteral, TrueLiteral, FalseLiteral, Assignment,
+                       IfStatement, ElseStatement, WhileLoop, Returned, Pass, FunctionCall)
+'''
+Improves an analyzed AST before its code is generated, running a pipeline of optimization
+passes over it. Each pass rewrites the AST in place and counts what it removed, and can be
+enabled or disabled on its own.
+
+@author Nicolás Rodrigo Pèrez
+@date 17-10-2026
+@version 1.0
+'''
+
+# statements opening a block, whose body is optimized after them
+BLOCK_STATEMENTS = ('IF_STATEMENT', 'ELIF_STATEMENT', 'ELSE_STATEMENT', 'FOR_LOOP', 'WHILE_LOOP', 'CLASS_DECLARATION', 'FUNCTION_DEFINITION')
+LITERALS = ('NUMBER', 'STRING', 'TRUE', 'FALSE', 'NONE')
+# statements binding the name of their identifier, and statements opening a new scope
+ASSIGNMENT_STATEMENTS = ('ASSIGNMENT', 'SELF_ASSIGNMENT', 'CLASS_ASSIGNMENT', 'SELF_CLASS_ASSIGNMENT', 'FOR_LOOP')
+SCOPE_STATEMENTS = ('FUNCTION_DEFINITION', 'CLASS_DECLARATION')
+# nodes calling a function, which may change the attributes of any object
+CALLS = ('FUNCTION_CALL', 'SELF_FUNCTION_CALL', 'CLASS_ASSIGNMENT', 'SELF_CLASS_ASSIGNMENT')
+INVARIANT_OPERATORS = ('+', '-', '*')
+TEMPORARY_PREFIX = '_invariant_'
+INLINED_PREFIX = '_inline_'
+TAIL_PREFIX = '_tail_'
+IF_CHAIN_STATEMENTS = ('IF_STATEMENT', 'ELIF_STATEMENT', 'ELSE_STATEMENT')
+ATTRIBUTE_ACCESSES = ('ATRIBUTE_ACCESS', 'ATTRIBUTE_ACCESS', 'SELF_ATTRIBUTE_ACCESS')
+ARITHMETIC_OPERATORS = {
+    '+': lambda left, right: left + right,
+    '-': lambda left, right: left - right,
+    '*': lambda left, right: left * right
+}
+COMPARISON_OPERATORS = {
+    '==': lambda left, right: left == right,
+    '!=': lambda left, right: left != right,
+    '<': lambda left, right: left < right,
+    '<=': lambda left, right: left <= right,
+    '>': lambda left, right: left > right,
+    '>=': lambda left, right: left >= right
+}
+EVALUATED_OPERATORS = dict(ARITHMETIC_OPERATORS, **{'/': lambda left, right: left / right})
+# statements and expressions a function may hold to be evaluated at compile time
+EVALUATED_STATEMENTS = ('ASSIGNMENT', 'IF_STATEMENT', 'ELIF_STATEMENT', 'ELSE_STATEMENT', 'WHILE_LOOP', 'FOR_LOOP', 'RETURNED', 'PASS')
+EVALUATED_EXPRESSIONS = LITERALS + ('IDENTIFIER', 'OPERATION', 'COMPARISON_EXPRESSION', 'LOGICAL_EXPRESSION', 'NOT_EXPRESSION', 'FUNCTION_CALL')
+# value given to the nodes which are not literals
+NOT_CONSTANT = object()
+# result of the evaluated blocks which did not return
+NOT_RETURNED = object()
+
+
+class Optimizer:
+
+
+    '''
+    Create new Optimizer object.
+
+    @type ast: Program
+    @param ast: an analyzed AST
+
+    @type flags: dict
+    @param flags: True or False indexed by pass name, to enable or disable each pass; passes not given are enabled
+
+    @type analyzer: SemanticAnalyzer
+    @param analyzer: semantic analyzer which analyzed the AST, whose tables are used by some passes, or None
+    '''
+    def __init__(self, ast, flags=None, analyzer=None):
+        self.ast = ast
+        self.flags = flags if flags is not None else {}
+        self.analyzer = analyzer
+        # what each pass removed, indexed by pass name
+        self.counters = {}
+
+
+    '''
+    Main function which runs the enabled passes over the AST, in the order they were registered.
+
+    @rtype: Program
+    @returns: the optimized AST
+    '''
+    def optimize(self):
+        for optimization_pass in self.passes:
+            if self.flags.get(optimization_pass.name, True):
+                self.counters[optimization_pass.name] = optimization_pass(self.analyzer).run(self.ast)
+            else:
+                self.counters[optimization_pass.name] = 0
+        return self.ast
+
+
+    '''
+    Registers an optimization pass, run after the passes registered before it, or before the given
+    pass. Passes are shared by the Optimizer class and its subclasses, unless a subclass registers its own.
+
+    @type optimization_pass: type
+    @param optimization_pass: OptimizationPass subclass
+
+    @type before: str
+    @param before: name of the pass to run the registered pass before, or None to run it last
+    '''
+    @classmethod
+    def register_pass(cls, optimization_pass, before=None):
+        if 'passes' not in cls.__dict__:
+            cls.passes = list(cls.passes)
+        if before is None:
+            cls.passes.append(optimization_pass)
+        else:
+            index = next(index for index, registered in enumerate(cls.passes) if registered.name == before)
+            cls.passes.insert(index, optimization_pass)
+
+
+    # optimization passes, in the order they are run
+    passes = []
+
+
+'''
+Base class of the optimization passes. Passes rewriting expressions visit the AST with
+NodeVisitor.visit, each node being replaced by the result of its leave method: nodes
+without their own handlers have all their child nodes visited, and are kept with their
+child nodes replaced. Passes rewriting statements rewrite the blocks of the AST one at a time.
+'''
+class OptimizationPass(NodeVisitor):
+
+    name = None
+
+
+    '''
+    Create new OptimizationPass object.
+
+    @type analyzer: SemanticAnalyzer
+    @param analyzer: semantic analyzer which analyzed the AST, or None
+    '''
+    def __init__(self, analyzer=None):
+        self.analyzer = analyzer
+
+
+    '''
+    Run the pass over the given AST, rewriting it in place.
+
+    @type ast: Program
+    @param ast: an analyzed AST
+
+    @rtype: int
+    @returns: how much the pass removed
+    '''
+    def run(self, ast):
+        self.removed = 0
+        self.visit(ast)
+        return self.removed
+
+
+    '''
+    Rewrite each block of the given AST with rewrite_block, before the blocks nested in it.
+
+    @type ast: Program
+    @param ast: an analyzed AST
+    '''
+    def rewrite_blocks(self, ast):
+        blocks = [ast.statements]
+        while blocks:
+            statements = blocks.pop()
+            statements[:] = self.rewrite_block(statements)
+            blocks.extend(statement.body for statement in statements if statement.kind in BLOCK_STATEMENTS)
+
+
+    '''
+    Rewrite the given block.
+
+    @type statements: list
+    @param statements: list of statement nodes
+
+    @rtype: list
+    @returns: the rewritten list of statement nodes
+    '''
+    def rewrite_block(self, statements):
+        return statements
+
+
+    '''
+    Get the children and leave methods of the pass, indexed by node type, giving
+    the node types without their own handlers the generic ones.
+
+    @rtype: dict
+    @returns: (children method or None, leave method) pairs indexed by node type
+    '''
+    def get_handlers(self):
+        cls = self.__class__
+        if '_handlers' not in cls.__dict__:
+            handlers = super().get_handlers()
+            for kind, node_class in NODE_CLASSES.items():
+                children, leave = handlers.get(kind, (None, OptimizationPass.leave_node))
+                if children is None and not issubclass(node_class, Leaf):
+                    children = OptimizationPass.children_node
+                handlers[kind] = (children, leave)
+        return super().get_handlers()
+
+
+    def children_node(self, node):
+        return node.children()
+
+
+    '''
+    Replace the child nodes of the given node by the results of their leave methods.
+
+    @type node: Node
+    @param node: AST node
+
+    @type results: list
+    @param results: nodes replacing the child nodes, in order
+
+    @rtype: Node
+    @returns: the given node
+    '''
+    def leave_node(self, node, results):
+        position = 0
+        for field in node.fields:
+            value = getattr(node, field)
+            if isinstance(value, Node):
+                setattr(node, field, results[position])
+                position += 1
+            elif value.__class__ is list:
+                value[:] = results[position:position + len(value)]
+                position += len(value)
+        return node
+
+
+'''
+Folds the operations, comparisons, logical and not expressions whose operands are literals
+into a literal, counting the folded expressions. Only the operations keeping the value of the
+generated code are folded: divisions, negative results and repetitions of strings are not.
+'''
+class ConstantFolding(OptimizationPass):
+
+    name = 'constant_folding'
+
+
+    def leave_OPERATION(self, node, results):
+        node.left, node.right = results
+        left = literal_value(node.left)
+        right = literal_value(node.right)
+        if left is NOT_CONSTANT or right is NOT_CONSTANT:
+            return node
+        if node.left.kind == 'STRING' and node.right.kind == 'STRING':
+            if node.operator != '+':
+                return node
+            self.removed += 1
+            return String(node.left.value[:-1] + node.right.value[1:])
+        operation = ARITHMETIC_OPERATORS.get(node.operator)
+        if operation is None or left.__class__ not in (int, bool) or right.__class__ not in (int, bool):
+            return node
+        value = operation(left, right)
+        if value < 0:
+            return node
+        self.removed += 1
+        return Number(str(value))
+
+    def leave_COMPARISON_EXPRESSION(self, node, results):
+        node.left, node.right = results
+        left = literal_value(node.left)
+        right = literal_value(node.right)
+        if left is NOT_CONSTANT or right is NOT_CONSTANT:
+            return node
+        try:
+            value = COMPARISON_OPERATORS[node.operator](left, right)
+        except TypeError:
+            return node
+        self.removed += 1
+        return boolean_literal(value)
+
+    def leave_LOGICAL_EXPRESSION(self, node, results):
+        node.left, node.right = results
+        left = literal_value(node.left)
+        if left is NOT_CONSTANT:
+            return node
+        self.removed += 1
+        # the value of the left operand, or of the right operand when the left one does not decide
+        if bool(left) == (node.operator == 'or'):
+            return node.left
+        return node.right
+
+    def leave_NOT_EXPRESSION(self, node, results):
+        node.operand = results[0]
+        operand = literal_value(node.operand)
+        if operand is NOT_CONSTANT:
+            return node
+        self.removed += 1
+        return boolean_literal(not operand)
+
+
+'''
+Prunes the branches of the if statements whose condition is a literal, counting the removed
+branches. False branches are removed, and a true branch ends the if statement, becoming its
+else branch, or replacing the if statement by its body if no branch is kept before it.
+'''
+class BranchPruning(OptimizationPass):
+
+    name = 'branch_pruning'
+
+
+    def run(self, ast):
+        self.removed = 0
+        self.rewrite_blocks(ast)
+        return self.removed
+
+
+    def rewrite_block(self, statements):
+        statements = list(statements)
+        block = []
+        index = 0
+        while index < len(statements):
+            statement = statements[index]
+            index += 1
+            if statement.kind != 'IF_STATEMENT':
+                block.append(statement)
+                continue
+            branches = [statement]
+            while index < len(statements) and statements[index].kind in ('ELIF_STATEMENT', 'ELSE_STATEMENT'):
+                branches.append(statements[index])
+                index += 1
+                if branches[-1].kind == 'ELSE_STATEMENT':
+                    break
+            kept, inlined = self.prune(branches)
+            if inlined:
+                # the body replacing the if statement may hold if statements to prune too
+                statements[index:index] = kept
+            else:
+                block.extend(kept)
+        if not block and statements:
+            block.append(Pass(statements[0].line))
+        return block
+
+
+    '''
+    Prune the branches of an if statement.
+
+    @type branches: list
+    @param branches: IF_STATEMENT node, followed by its ELIF_STATEMENT and ELSE_STATEMENT nodes
+
+    @rtype: tuple
+    @returns: statements replacing the if statement, and true if they are the body of a branch
+    '''
+    def prune(self, branches):
+        kept = []
+        for branch in branches:
+            if branch.kind == 'ELSE_STATEMENT':
+                condition = True
+            else:
+                condition = literal_value(branch.condition)
+            if condition is NOT_CONSTANT:
+                kept.append(branch)
+            elif condition:
+                if not kept:
+                    self.removed += len(branches)
+                    return branch.body, True
+                kept.append(branch if branch.kind == 'ELSE_STATEMENT' else ElseStatement(branch.body, branch.line))
+                break
+        self.removed += len(branches) - len(kept)
+        if kept and kept[0].kind == 'ELIF_STATEMENT':
+            kept[0] = IfStatement(kept[0].condition, kept[0].body, kept[0].line)
+        return kept, False
+
+
+'''
+Removes the statements following a return statement in the same block, counting the removed statements.
+'''
+class DeadCodeElimination(OptimizationPass):
+
+    name = 'dead_code_elimination'
+
+
+    def run(self, ast):
+        self.removed = 0
+        self.rewrite_blocks(ast)
+        return self.removed
+
+
+    def rewrite_block(self, statements):
+        for index, statement in enumerate(statements):
+            if statement.kind == 'RETURNED':
+                self.removed += len(statements) - index - 1
+                return statements[:index + 1]
+        return statements
+
+
+'''
+Hoists the loop-invariant operations of the bodies of the while and for loops into temporaries
+assigned before the loop, counting the hoisted operations. An operation is invariant if it only
+adds, subtracts or multiplies literals, names not assigned in the loop, and attributes of self
+not assigned in the loop when the loop calls no function. Equal operations share a temporary.
+
+Operations are only hoisted from what runs on every iteration: the loop condition or iterable,
+the statements of the body before its first block or return statement, and the condition or
+iterable of that block if it is an if statement or a loop. Operations on the right of and and or
+are not hoisted either, so an operation which may not run, and may fail, is never run before the loop.
+
+Inner loops are optimized before the loops containing them, so their temporaries can be hoisted
+further out. The temporaries are assigned inside an if statement checking the loop runs an iteration,
+so they are not evaluated if it runs none: the loop condition for while loops, or 'range(n)' for the
+for loops over 'range(n)', n calling no function so it can be evaluated twice. Other for loops and
+while loops whose condition calls a function are not optimized.
+'''
+class LoopInvariantCodeMotion(OptimizationPass):
+
+    name = 'loop_invariant_code_motion'
+
+
+    def run(self, ast):
+        self.removed = 0
+        self.temporaries = 0
+        # (block, loop) pairs of the loops, each loop before the loops nested in it
+        loops = []
+        blocks = [ast.statements]
+        while blocks:
+            statements = blocks.pop()
+            for statement in statements:
+                if statement.kind == 'WHILE_LOOP' or statement.kind == 'FOR_LOOP':
+                    loops.append((statements, statement))
+                if statement.kind in BLOCK_STATEMENTS:
+                    blocks.append(statement.body)
+        for block, loop in reversed(loops):
+            self.hoist(block, loop)
+        return self.removed
+
+
+    '''
+    Hoist the invariant operations of the given loop before it.
+
+    @type block: list
+    @param block: list of statement nodes holding the loop
+
+    @type loop: Node
+    @param loop: WHILE_LOOP or FOR_LOOP node
+    '''
+    def hoist(self, block, loop):
+        if loop.kind == 'WHILE_LOOP':
+            if any(node.kind in CALLS for node in expression_nodes(loop)):
+                return
+            guard = copy.deepcopy(loop.condition)
+        else:
+            if not self.range_loop(loop):
+                return
+            guard = FunctionCall(Identifier('range'), [copy.deepcopy(loop.iterable.arguments[0])], loop.line)
+        assigned, calls = self.scan(loop)
+        # temporaries of the hoisted operations, indexed by the structure key of the operation
+        temporaries = {}
+        hoisted = []
+
+        # (node, field) pairs of the expressions to search, which run on every iteration
+        pending = [(loop, field) for field in loop.fields if field != 'body']
+        for statement in loop.body:
+            if statement.kind in BLOCK_STATEMENTS or statement.kind == 'RETURNED':
+                if statement.kind in ('IF_STATEMENT', 'WHILE_LOOP', 'FOR_LOOP'):
+                    pending.extend((statement, field) for field in statement.fields if field != 'body')
+                break
+            pending.extend((statement, field) for field in statement.fields)
+        while pending:
+            node, field = pending.pop()
+            value = getattr(node, field)
+            if value.__class__ is list:
+                children = enumerate(value)
+            elif isinstance(value, Node):
+                children = ((None, value),)
+            else:
+                continue
+            for index, child in children:
+                if child.kind == 'OPERATION' and self.invariant(child, assigned, calls):
+                    key = structure_key(child)
+                    temporary = temporaries.get(key)
+                    if temporary is None:
+                        temporary = f'{TEMPORARY_PREFIX}{self.temporaries}'
+                        self.temporaries += 1
+                        temporaries[key] = temporary
+                        hoisted.append(Assignment(Identifier(temporary), child, loop.line))
+                    if index is None:
+                        setattr(node, field, Identifier(temporary))
+                    else:
+                        value[index] = Identifier(temporary)
+                    self.removed += 1
+                elif child.kind == 'LOGICAL_EXPRESSION':
+                    pending.append((child, 'left'))
+                elif not isinstance(child, Leaf):
+                    pending.extend((child, child_field) for child_field in child.fields)
+
+        if not hoisted:
+            return
+        index = next(index for index, statement in enumerate(block) if statement is loop)
+        if loop.kind == 'WHILE_LOOP' and loop.condition.kind == 'TRUE':
+            block[index:index] = hoisted
+        else:
+            block[index] = IfStatement(guard, hoisted + [loop], loop.line)
+
+
+    '''
+    Check if the given for loop iterates over 'range(n)', with the builtin range and an n calling no function.
+
+    @type loop: Node
+    @param loop: FOR_LOOP node
+
+    @rtype: bool
+    @returns: true if the loop iterates over 'range(n)'
+    '''
+    def range_loop(self, loop):
+        iterable = loop.iterable
+        if (self.analyzer is None or iterable.kind != 'FUNCTION_CALL' or iterable.function.kind != 'IDENTIFIER'
+                or iterable.function.value != 'range' or len(iterable.arguments) != 1):
+            return False
+        if iterable not in self.analyzer.call_targets or self.analyzer.call_targets[iterable] is not None:
+            return False
+        nodes = [iterable.arguments[0]]
+        while nodes:
+            node = nodes.pop()
+            if node.kind in CALLS:
+                return False
+            nodes.extend(node.children())
+        return True
+
+
+    '''
+    Find the names assigned in the given loop, and whether the loop calls any function.
+
+    @type loop: Node
+    @param loop: WHILE_LOOP or FOR_LOOP node
+
+    @rtype: tuple
+    @returns: set of the assigned names, and true if the loop calls any function
+    '''
+    def scan(self, loop):
+        assigned = set()
+        calls = any(node.kind in CALLS for node in expression_nodes(loop))
+        statements = [loop]
+        while statements:
+            statement = statements.pop()
+            if statement.kind in ASSIGNMENT_STATEMENTS:
+                assigned.add(statement.identifier.value)
+            elif statement.kind in SCOPE_STATEMENTS:
+                assigned.add(statement.name.value)
+                continue
+            elif statement.kind == 'IMPORT':
+                imported = statement.imported
+                if imported.kind == 'AS':
+                    assigned.add(imported.identifier.value)
+                else:
+                    assigned.add(imported.target.value if imported.kind in ('ATRIBUTE_ACCESS', 'ATTRIBUTE_ACCESS') else imported.value)
+            if statement is not loop and statement.kind in CALLS:
+                calls = True
+            calls = calls or any(node.kind in CALLS for node in expression_nodes(statement))
+            statements.extend(getattr(statement, 'body', ()))
+        return assigned, calls
+
+
+    '''
+    Check if the given operation is loop-invariant.
+
+    @type node: Node
+    @param node: OPERATION node
+
+    @type assigned: set
+    @param assigned: names assigned in the loop
+
+    @type calls: bool
+    @param calls: true if the loop calls any function
+
+    @rtype: bool
+    @returns: true if the operation is invariant
+    '''
+    def invariant(self, node, assigned, calls):
+        nodes = [node]
+        while nodes:
+            node = nodes.pop()
+            kind = node.kind
+            if kind == 'OPERATION':
+                if node.operator not in INVARIANT_OPERATORS:
+                    return False
+                nodes.append(node.left)
+                nodes.append(node.right)
+            elif kind == 'IDENTIFIER' or kind == 'SELF':
+                if node.value in assigned:
+                    return False
+            elif kind == 'SELF_IDENTIFIER':
+                if calls or node.value in assigned or 'self' in assigned:
+                    return False
+            elif kind not in LITERALS:
+                return False
+        return True
+
+
+'''
+Evaluates at compile time the calls to pure top-level functions whose arguments are all literals,
+replacing them by the literal of their result, and counting the replaced calls. A function is pure
+if it only assigns its own variables, branches, loops over ranges and returns, and only calls pure
+functions, so it cannot print, change attributes or call unknown functions.
+
+Functions are evaluated by interpreting their AST, with the operators of python, so the result is
+the one the generated code would compute. The evaluation of a call is given up, keeping the call,
+if it fails, takes more than step_budget steps, nests more than depth_budget calls, builds values
+larger than value_budget bits or characters, nests blocks over the recursion limit, or its result has
+no literal, such as negative numbers.
+Results are memoized on the function and the values of the arguments, for all the evaluated calls.
+'''
+class PartialEvaluation(OptimizationPass):
+
+    name = 'partial_evaluation'
+    step_budget = 10000
+    depth_budget = 64
+    value_budget = 4096
+
+
+    def run(self, ast):
+        self.removed = 0
+        if self.analyzer is None:
+            return 0
+        self.pure_functions = find_pure_functions(ast.statements, self.analyzer)
+        # results of the evaluated calls, indexed by function and typed argument values
+        self.results = {}
+        # calls used as statements, which have no node to be replaced by
+        self.statement_calls = set()
+        blocks = [ast.statements]
+        while blocks:
+            statements = blocks.pop()
+            for statement in statements:
+                if statement.kind == 'FUNCTION_CALL':
+                    self.statement_calls.add(statement)
+                if statement.kind in BLOCK_STATEMENTS:
+                    blocks.append(statement.body)
+        self.visit(ast)
+        return self.removed
+
+
+    def leave_FUNCTION_CALL(self, node, results):
+        self.leave_node(node, results)
+        function = self.analyzer.call_targets.get(node)
+        if node in self.statement_calls or function not in self.pure_functions:
+            return node
+        arguments = [literal_value(argument) for argument in node.arguments]
+        if any(argument is NOT_CONSTANT for argument in arguments):
+            return node
+        key = (function, tuple((argument.__class__, argument) for argument in arguments))
+        if key not in self.results:
+            self.steps = 0
+            self.depth = 0
+            try:
+                self.results[key] = value_literal(self.call(function, arguments))
+            except (ValueError, TypeError, ArithmeticError, KeyError, RecursionError):
+                self.results[key] = None
+        literal = self.results[key]
+        if literal is None:
+            return node
+        self.removed += 1
+        return copy.copy(literal)
+
+
+    '''
+    Evaluate a call to the given pure function, memoizing its result.
+
+    @raise ValueError: if a budget is exceeded
+    @raise TypeError, ArithmeticError, KeyError: if the evaluated code fails
+
+    @type function: Node
+    @param function: FUNCTION_DEFINITION node
+
+    @type arguments: list
+    @param arguments: values of the arguments
+
+    @returns: value returned by the function
+    '''
+    def call(self, function, arguments):
+        key = (function, tuple((argument.__class__, argument) for argument in arguments))
+        if key in self.results and self.results[key] is not None:
+            return literal_value(self.results[key])
+        self.depth += 1
+        if self.depth > self.depth_budget:
+            raise ValueError(f"Call depth budget exceeded evaluating {function.name}")
+        variables = {parameter.value: argument for parameter, argument in zip(function.parameters, arguments)}
+        value = self.execute(function.body, variables)
+        self.depth -= 1
+        value = None if value is NOT_RETURNED else value
+        literal = value_literal(value)
+        if literal is not None:
+            self.results[key] = literal
+        return value
+
+
+    '''
+    Execute the given block of a pure function.
+
+    @raise ValueError: if a budget is exceeded
+    @raise TypeError, ArithmeticError, KeyError: if the evaluated code fails
+
+    @type statements: list
+    @param statements: list of statement nodes
+
+    @type variables: dict
+    @param variables: values of the variables of the function, indexed by name
+
+    @returns: value returned by the block, or NOT_RETURNED
+    '''
+    def execute(self, statements, variables):
+        index = 0
+        while index < len(statements):
+            statement = statements[index]
+            index += 1
+            self.step()
+            kind = statement.kind
+            if kind == 'ASSIGNMENT':
+                variables[statement.identifier.value] = self.evaluate(statement.value, variables)
+            elif kind == 'RETURNED':
+                return self.evaluate(statement.value, variables)
+            elif kind == 'IF_STATEMENT':
+                taken = None
+                branch = statement
+                while True:
+                    if taken is None and (branch.kind == 'ELSE_STATEMENT' or self.evaluate(branch.condition, variables)):
+                        taken = branch
+                    if index == len(statements) or statements[index].kind not in ('ELIF_STATEMENT', 'ELSE_STATEMENT'):
+                        break
+                    branch = statements[index]
+                    index += 1
+                if taken is not None:
+                    value = self.execute(taken.body, variables)
+                    if value is not NOT_RETURNED:
+                        return value
+            elif kind == 'WHILE_LOOP':
+                while self.evaluate(statement.condition, variables):
+                    value = self.execute(statement.body, variables)
+                    if value is not NOT_RETURNED:
+                        return value
+                    self.step()
+            elif kind == 'FOR_LOOP':
+                for item in range(self.evaluate(statement.iterable.arguments[0], variables)):
+                    variables[statement.identifier.value] = item
+                    value = self.execute(statement.body, variables)
+                    if value is not NOT_RETURNED:
+                        return value
+                    self.step()
+        return NOT_RETURNED
+
+
+    '''
+    Evaluate the given expression of a pure function, without recursion, with an explicit stack
+    as NodeVisitor.visit does, so long expressions can be evaluated.
+
+    @raise ValueError: if a budget is exceeded
+    @raise TypeError, ArithmeticError, KeyError: if the evaluated code fails
+
+    @type node: Node
+    @param node: expression node
+
+    @type variables: dict
+    @param variables: values of the variables of the function, indexed by name
+
+    @returns: value of the expression
+    '''
+    def evaluate(self, node, variables):
+        # nodes still to evaluate, and the [node, operands count] frames of the nodes whose operands are being evaluated
+        stack = [node]
+        values = []
+        while stack:
+            node = stack.pop()
+            if node.__class__ is list:
+                node, count = node
+                operands = values[-count:]
+                del values[-count:]
+                kind = node.kind
+                if kind == 'OPERATION':
+                    self.check_size(node.operator, operands[0], operands[1])
+                    values.append(EVALUATED_OPERATORS[node.operator](operands[0], operands[1]))
+                elif kind == 'COMPARISON_EXPRESSION':
+                    values.append(COMPARISON_OPERATORS[node.operator](operands[0], operands[1]))
+                elif kind == 'LOGICAL_EXPRESSION':
+                    # the value of the left operand, or of the right operand when the left one does not decide
+                    if bool(operands[0]) == (node.operator == 'or'):
+                        values.append(operands[0])
+                    else:
+                        stack.append(node.right)
+                elif kind == 'NOT_EXPRESSION':
+                    values.append(not operands[0])
+                else:
+                    values.append(self.call(self.analyzer.call_targets[node], operands))
+                continue
+
+            kind = node.kind
+            if kind == 'IDENTIFIER':
+                values.append(variables[node.value])
+            elif kind in LITERALS:
+                values.append(literal_value(node))
+            elif kind == 'OPERATION' or kind == 'COMPARISON_EXPRESSION':
+                stack.append([node, 2])
+                stack.append(node.right)
+                stack.append(node.left)
+            elif kind == 'LOGICAL_EXPRESSION':
+                stack.append([node, 1])
+                stack.append(node.left)
+            elif kind == 'NOT_EXPRESSION':
+                stack.append([node, 1])
+                stack.append(node.operand)
+            else:
+                self.step()
+                if node.arguments:
+                    stack.append([node, len(node.arguments)])
+                    stack.extend(reversed(node.arguments))
+                else:
+                    values.append(self.call(self.analyzer.call_targets[node], []))
+        return values[-1]
+
+
+    '''
+    Count a step of the evaluation.
+
+    @raise ValueError: if the step budget is exceeded
+    '''
+    def step(self):
+        self.steps += 1
+        if self.steps > self.step_budget:
+            raise ValueError("Step budget exceeded")
+
+
+    '''
+    Check that the result of an operation is not larger than the value budget, before computing it.
+
+    @raise ValueError: if the value budget is exceeded
+
+    @type operator: str
+    @param operator: operator of the operation
+
+    @param left: value of the left operand
+
+    @param right: value of the right operand
+    '''
+    def check_size(self, operator, left, right):
+        sizes = []
+        for value in (left, right):
+            if value.__class__ is int:
+                sizes.append(value.bit_length())
+            elif value.__class__ is str:
+                sizes.append(len(value))
+            else:
+                sizes.append(1)
+        if operator == '*':
+            # repeated strings are as long as their length times the count
+            if left.__class__ is str or right.__class__ is str:
+                count = right if left.__class__ is str else left
+                size = sizes[0] * count if left.__class__ is str else sizes[1] * count
+            else:
+                size = sizes[0] + sizes[1]
+        else:
+            size = max(sizes) + 1
+        if size > self.value_budget:
+            raise ValueError("Value budget exceeded")
+
+
+'''
+Inlines the calls to small top-level functions, counting the inlined calls. Calls are inlined when
+they are a statement, the value of an assignment or the returned value, and their function, found
+on the call targets of the SemanticAnalyzer, is a top-level function of at most size_budget nodes
+which does not call itself, defines no functions, classes or imports, and only returns at the end
+of its body or of the if statements ending it. Functions binding self are not inlined. Only the
+calls inside function bodies are inlined, as the renamed variables of a call on the module would
+be left on its globals.
+
+The call is replaced by the assignments of the arguments to the parameters, followed by the body
+of the function, with its parameters and variables renamed so they do not clash with the names of
+the caller, and its return statements assigning the result of the call. Functions using names
+which the calling function binds are not inlined on it, as the names would not be the same. The
+copied nodes are added to the bindings and call targets of the SemanticAnalyzer, so the passes
+after this one find them.
+'''
+class FunctionInlining(OptimizationPass):
+
+    name = 'function_inlining'
+    size_budget = 48
+
+
+    def run(self, ast):
+        self.removed = 0
+        if self.analyzer is None:
+            return 0
+        self.inlined = 0
+        # functions whose name is not bound again on the module, so the name always calls them
+        module_names = scope_names(ast.statements)
+        functions = set(statement for statement in ast.statements
+                        if statement.kind == 'FUNCTION_DEFINITION' and module_names.count(statement.name.value) == 1)
+        # local and free names of each inlinable function, None for the functions which cannot be inlined
+        self.inlinable = {}
+
+        # (block, statement, call, function, caller) of the calls to inline, caller being None on the module, where no call is inlined
+        calls = []
+        blocks = [(ast.statements, None)]
+        while blocks:
+            statements, caller = blocks.pop()
+            for statement in statements:
+                call = self.inlinable_call(statement) if caller is not None else None
+                if call is not None:
+                    function = self.analyzer.call_targets.get(call)
+                    if function in functions and self.function_names(function) is not None:
+                        calls.append((statements, statement, call, function, caller))
+                if statement.kind == 'FUNCTION_DEFINITION':
+                    blocks.append((statement.body, statement))
+                elif statement.kind != 'CLASS_DECLARATION' and statement.kind in BLOCK_STATEMENTS:
+                    blocks.append((statement.body, caller))
+                elif statement.kind == 'CLASS_DECLARATION':
+                    # the methods are callers, but not the statements of the class body
+                    blocks.extend((method.body, method) for method in statement.body if method.kind == 'FUNCTION_DEFINITION')
+
+        caller_locals = {}
+        for block, statement, call, function, caller in calls:
+            if caller not in caller_locals:
+                caller_locals[caller] = function_locals(caller)
+            if not caller_locals[caller].isdisjoint(self.inlinable[function][1]):
+                continue
+            index = next(index for index, block_statement in enumerate(block) if block_statement is statement)
+            block[index:index + 1] = self.inline(statement, call, function)
+            self.removed += 1
+        return self.removed
+
+
+    '''
+    Get the call of the given statement which could be inlined.
+
+    @type statement: Node
+    @param statement: statement node
+
+    @rtype: Node
+    @returns: FUNCTION_CALL node, or None
+    '''
+    def inlinable_call(self, statement):
+        if statement.kind == 'FUNCTION_CALL':
+            call = statement
+        elif statement.kind in ('ASSIGNMENT', 'SELF_ASSIGNMENT', 'RETURNED'):
+            call = statement.value
+        else:
+            return None
+        if call.kind == 'FUNCTION_CALL' and call.function.kind == 'IDENTIFIER':
+            return call
+        return None
+
+
+    '''
+    Get the local and free names of the given function, checking if it can be inlined.
+
+    @type function: Node
+    @param function: FUNCTION_DEFINITION node
+
+    @rtype: tuple
+    @returns: set of local names and set of free names, or None if the function cannot be inlined
+    '''
+    def function_names(self, function):
+        if function in self.inlinable:
+            return self.inlinable[function]
+        self.inlinable[function] = None
+        if count_nodes(function.body) > self.size_budget or not tail_returns(function.body):
+            return None
+        statements = list(function.body)
+        while statements:
+            statement = statements.pop()
+            if statement.kind in SCOPE_STATEMENTS or statement.kind == 'IMPORT':
+                return None
+            for node in expression_nodes(statement):
+                if node.kind == 'FUNCTION_CALL' and self.analyzer.call_targets.get(node) is function:
+                    return None
+            statements.extend(getattr(statement, 'body', ()))
+        local_names = function_locals(function)
+        if 'self' in local_names:
+            # self references such as self.x are not renamed with the other local names
+            return None
+        free_names = set(leaf.value.split('.')[0] for leaf in name_leaves(function.body)) - local_names
+        self.inlinable[function] = (local_names, free_names)
+        return self.inlinable[function]
+
+
+    '''
+    Build the statements replacing the given statement, with the given call inlined.
+
+    @type statement: Node
+    @param statement: statement holding the call
+
+    @type call: Node
+    @param call: FUNCTION_CALL node
+
+    @type function: Node
+    @param function: FUNCTION_DEFINITION node of the called function
+
+    @rtype: list
+    @returns: list of statement nodes
+    '''
+    def inline(self, statement, call, function):
+        prefix = f'{INLINED_PREFIX}{self.inlined}'
+        self.inlined += 1
+        names = {name: f'{prefix}_{name}' for name in self.inlinable[function][0]}
+        result = Identifier(prefix)
+        inlined = [self.assign(names[parameter.value], self.copy(argument, names), statement.line)
+                   for parameter, argument in zip(function.parameters, call.arguments)]
+
+        body = self.copy(function.body, names)
+        for leaf in name_leaves(body):
+            if leaf.value in names:
+                leaf.value = names[leaf.value]
+        if statement.kind == 'RETURNED':
+            if not always_returns(body):
+                body.append(Returned(NoneLiteral('None'), statement.line))
+            return inlined + body
+
+        if not always_returns(body):
+            inlined.append(self.assign(prefix, NoneLiteral('None'), statement.line))
+        blocks = [body]
+        while blocks:
+            block = blocks.pop()
+            if block[-1].kind == 'RETURNED':
+                block[-1] = self.assign(prefix, block[-1].value, block[-1].line)
+            blocks.extend(branch.body for branch in block if branch.kind in IF_CHAIN_STATEMENTS)
+        inlined.extend(body)
+        if statement.kind != 'FUNCTION_CALL':
+            statement.value = result
+            inlined.append(statement)
+        return inlined
+
+
+    '''
+    Copy the given nodes, adding the copies to the bindings and call targets of the analyzer,
+    the names bound by the copies being renamed.
+
+    @type value: Node or list
+    @param value: node or list of nodes
+
+    @type names: dict
+    @param names: new name of each renamed name
+
+    @rtype: Node or list
+    @returns: copy of the nodes
+    '''
+    def copy(self, value, names):
+        copies = {}
+        copied = copy.deepcopy(value, copies)
+        bindings = self.analyzer.bindings
+        call_targets = self.analyzer.call_targets
+        nodes = list(value) if value.__class__ is list else [value]
+        while nodes:
+            node = nodes.pop()
+            if node in bindings:
+                bindings[copies[id(node)]] = names.get(bindings[node], bindings[node])
+            if node in call_targets:
+                call_targets[copies[id(node)]] = call_targets[node]
+            nodes.extend(node.children())
+        return copied
+
+
+    '''
+    Build the assignment of the given value to the given name, binding the name on the analyzer.
+
+    @type name: str
+    @param name: assigned name
+
+    @type value: Node
+    @param value: assigned value
+
+    @type line: int
+    @param line: line of the assignment
+
+    @rtype: Node
+    @returns: ASSIGNMENT node
+    '''
+    def assign(self, name, value, line):
+        assignment = Assignment(Identifier(name), value, line)
+        self.analyzer.bindings[assignment] = name
+        return assignment
+
+
+'''
+Eliminates the self tail calls of the top-level functions, counting the eliminated calls. A self
+tail call returns a call to the function itself, at the end of its body or of the if statements
+ending it. Methods are not optimized, as a call on self runs the method of a subclass overriding
+it, which may be defined outside the module.
+
+The body of the function is run in a 'while True' loop, and each self tail call is replaced by
+the assignment of the arguments to the parameters, so the loop runs the body again as the call
+would, without a new frame. The paths of the body which did not return get a 'return None', so
+they still end the function. Variables are kept between iterations, so a function reading one
+before assigning it, which fails on python, reads the value of the previous iteration instead.
+'''
+class TailCallElimination(OptimizationPass):
+
+    name = 'tail_call_elimination'
+
+
+    def run(self, ast):
+        self.removed = 0
+        if self.analyzer is None:
+            return 0
+        module_names = scope_names(ast.statements)
+        for statement in ast.statements:
+            if statement.kind == 'FUNCTION_DEFINITION' and module_names.count(statement.name.value) == 1:
+                self.eliminate(statement)
+        return self.removed
+
+
+    '''
+    Check if the given statement returns a call to the given function.
+
+    @type statement: Node
+    @param statement: statement node
+
+    @type function: Node
+    @param function: FUNCTION_DEFINITION node
+
+    @rtype: bool
+    @returns: true if the statement is a self tail call
+    '''
+    def self_tail_call(self, statement, function):
+        if statement.kind != 'RETURNED' or statement.value.kind != 'FUNCTION_CALL':
+            return False
+        call = statement.value
+        return call.function.kind == 'IDENTIFIER' and self.analyzer.call_targets.get(call) is function
+
+
+    '''
+    Eliminate the self tail calls of the given function.
+
+    @type function: Node
+    @param function: FUNCTION_DEFINITION node
+    '''
+    def eliminate(self, function):
+        statements = list(function.body)
+        while statements:
+            statement = statements.pop()
+            if statement.kind in SCOPE_STATEMENTS:
+                # nested functions could read the rebound parameters
+                return
+            statements.extend(getattr(statement, 'body', ()))
+
+        # (block, true if the block ends the body) pairs
+        blocks = [(function.body, True)]
+        # blocks ending in a self tail call
+        tail_blocks = []
+        while blocks:
+            statements, tail = blocks.pop()
+            if tail:
+                self.close_branches(statements, function)
+            for index, statement in enumerate(statements):
+                if tail and index == len(statements) - 1 and self.self_tail_call(statement, function):
+                    tail_blocks.append(statements)
+                if statement.kind in BLOCK_STATEMENTS:
+                    ends_block = all(following.kind in ('ELIF_STATEMENT', 'ELSE_STATEMENT') for following in statements[index + 1:])
+                    blocks.append((statement.body, tail and ends_block and statement.kind in IF_CHAIN_STATEMENTS))
+        if not tail_blocks:
+            return
+
+        add_returns(function.body)
+        for statements in tail_blocks:
+            statements[-1:] = self.rebind(function.parameters, statements[-1])
+        function.body = [WhileLoop(TrueLiteral('True'), function.body, function.body[0].line)]
+        self.removed += len(tail_blocks)
+
+
+    '''
+    Move the statements following an if statement without else branch into a new else branch,
+    if all its branches return and one of them ends in a self tail call, so the call ends the block.
+
+    @type statements: list
+    @param statements: list of statement nodes ending the function body
+
+    @type function: Node
+    @param function: FUNCTION_DEFINITION node
+    '''
+    def close_branches(self, statements, function):
+        start = 0
+        while start < len(statements):
+            if statements[start].kind != 'IF_STATEMENT':
+                start += 1
+                continue
+            end = start + 1
+            while end < len(statements) and statements[end].kind == 'ELIF_STATEMENT':
+                end += 1
+            branches = statements[start:end]
+            if (end < len(statements) and statements[end].kind != 'ELSE_STATEMENT' and all(always_returns(branch.body) for branch in branches)
+                    and any(self.self_tail_call(branch.body[-1], function) for branch in branches)):
+                statements[end:] = [ElseStatement(statements[end:], statements[end].line)]
+                return
+            start = end
+
+
+    '''
+    Build the statements assigning the arguments of a self tail call to the parameters.
+
+    @type parameters: list
+    @param parameters: parameters of the function
+
+    @type statement: Node
+    @param statement: RETURNED node of the self tail call
+
+    @rtype: list
+    @returns: list of statement nodes
+    '''
+    def rebind(self, parameters, statement):
+        line = statement.line
+        changed = [(parameter.value, argument) for parameter, argument in zip(parameters, statement.value.arguments)
+                   if argument.kind != 'IDENTIFIER' or argument.value != parameter.value]
+        if not changed:
+            return [Pass(line)]
+        if len(changed) == 1:
+            return [Assignment(Identifier(changed[0][0]), changed[0][1], line)]
+        # arguments are evaluated before any parameter is assigned, as for the call
+        temporaries = []
+        assignments = []
+        for name, argument in changed:
+            if argument.kind in LITERALS:
+                assignments.append(Assignment(Identifier(name), argument, line))
+            else:
+                temporaries.append(Assignment(Identifier(f'{TAIL_PREFIX}{name}'), argument, line))
+                assignments.append(Assignment(Identifier(name), Identifier(f'{TAIL_PREFIX}{name}'), line))
+        return temporaries + assignments
+
+
+'''
+Iterate over the nodes of the expressions of the given statement, not including its body.
+
+@type statement: Node
+@param statement: statement node
+
+@returns: generator of expression nodes
+'''
+def expression_nodes(statement):
+    values = [getattr(statement, field) for field in statement.fields if field != 'body']
+    while values:
+        value = values.pop()
+        if value.__class__ is list:
+            values.extend(value)
+        elif isinstance(value, Node):
+            yield value
+            values.extend(getattr(value, field) for field in value.fields)
+
+
+'''
+Get a key of the structure of the given expression, equal for equal expressions, which is the
+kinds, values and list lengths of its nodes in preorder. The key is built without recursion,
+unlike repr, so it can be taken of deep expressions.
+
+@type node: Node
+@param node: expression node
+
+@rtype: tuple
+@returns: structure key
+'''
+def structure_key(node):
+    key = []
+    nodes = [node]
+    while nodes:
+        node = nodes.pop()
+        if node.__class__ is list:
+            key.append(len(node))
+            nodes.extend(reversed(node))
+            continue
+        key.append(node.kind)
+        children = []
+        for field in node.fields:
+            value = getattr(node, field)
+            if isinstance(value, Node) or value.__class__ is list:
+                children.append(value)
+            else:
+                key.append(value)
+        nodes.extend(reversed(children))
+    return tuple(key)
+
+
+'''
+Iterate over the leaves of the given statements naming a variable, which are their identifiers,
+class identifiers and self references, but not the names of the accessed attributes.
+
+@type statements: list
+@param statements: list of statement nodes
+
+@returns: generator of leaf nodes
+'''
+def name_leaves(statements):
+    nodes = list(statements)
+    while nodes:
+        node = nodes.pop()
+        if isinstance(node, Leaf):
+            if node.kind in ('IDENTIFIER', 'CLASS_IDENTIFIER', 'SELF', 'SELF_IDENTIFIER'):
+                yield node
+        elif node.kind in ATTRIBUTE_ACCESSES:
+            nodes.append(node.target)
+            for attribute in node.attributes:
+                if not isinstance(attribute, Leaf):
+                    nodes.extend(attribute.arguments)
+        else:
+            nodes.extend(node.children())
+
+
+'''
+Find the pure top-level functions, which are bound once on the module, only assign their own
+variables, branch, loop over ranges and return, and only call pure functions.
+
+@type statements: list
+@param statements: top-level statement nodes
+
+@type analyzer: SemanticAnalyzer
+@param analyzer: semantic analyzer which analyzed the statements
+
+@rtype: set
+@returns: FUNCTION_DEFINITION nodes of the pure functions
+'''
+def find_pure_functions(statements, analyzer):
+    module_names = scope_names(statements)
+    # functions called by each candidate function, None if it is not pure on its own
+    callees = {}
+    for statement in statements:
+        if statement.kind == 'FUNCTION_DEFINITION' and module_names.count(statement.name.value) == 1:
+            callees[statement] = function_callees(statement, analyzer)
+    pure_functions = set(function for function, called in callees.items() if called is not None)
+    changed = True
+    while changed:
+        changed = False
+        for function in list(pure_functions):
+            if not callees[function] <= pure_functions:
+                pure_functions.discard(function)
+                changed = True
+    return pure_functions
+
+
+'''
+Get the functions called by the given function, checking if it only holds the statements
+and expressions which can be evaluated, and only reads its own variables.
+
+@type function: Node
+@param function: FUNCTION_DEFINITION node
+
+@type analyzer: SemanticAnalyzer
+@param analyzer: semantic analyzer which analyzed the function
+
+@rtype: set
+@returns: FUNCTION_DEFINITION nodes of the called functions, or None if the function is not pure on its own
+'''
+def function_callees(function, analyzer):
+    if any(parameter.kind != 'IDENTIFIER' for parameter in function.parameters):
+        return None
+    local_names = function_locals(function)
+    callees = set()
+    statements = list(function.body)
+    while statements:
+        statement = statements.pop()
+        kind = statement.kind
+        if kind not in EVALUATED_STATEMENTS:
+            return None
+        if kind == 'ASSIGNMENT' or kind == 'RETURNED':
+            nodes = [statement.value]
+        elif kind == 'FOR_LOOP':
+            # the only builtin function called, range with its stop
+            iterable = statement.iterable
+            if (iterable.kind != 'FUNCTION_CALL' or iterable.function.kind != 'IDENTIFIER' or iterable.function.value != 'range'
+                    or analyzer.call_targets.get(iterable) is not None or len(iterable.arguments) != 1):
+                return None
+            nodes = list(iterable.arguments)
+        elif kind == 'ELSE_STATEMENT' or kind == 'PASS':
+            nodes = []
+        else:
+            nodes = [statement.condition]
+        statements.extend(getattr(statement, 'body', ()))
+        while nodes:
+            node = nodes.pop()
+            if node.kind not in EVALUATED_EXPRESSIONS:
+                return None
+            if node.kind == 'IDENTIFIER' and node.value not in local_names:
+                return None
+            if node.kind == 'FUNCTION_CALL':
+                callee = analyzer.call_targets.get(node)
+                if node.function.kind != 'IDENTIFIER' or callee is None or callee.kind != 'FUNCTION_DEFINITION':
+                    return None
+                callees.add(callee)
+                nodes.extend(node.arguments)
+            else:
+                nodes.extend(node.children())
+    return callees
+
+
+'''
+Get the names bound by the given statements and their bodies, not including the ones bound
+inside the functions and classes defined by them.
+
+@type statements: list
+@param statements: list of statement nodes
+
+@rtype: list
+@returns: list of names, once for each time they are bound
+'''
+def scope_names(statements):
+    names = []
+    statements = list(statements)
+    while statements:
+        statement = statements.pop()
+        if statement.kind in ('ASSIGNMENT', 'CLASS_ASSIGNMENT', 'FOR_LOOP'):
+            names.append(statement.identifier.value)
+        elif statement.kind in SCOPE_STATEMENTS:
+            names.append(statement.name.value)
+            continue
+        elif statement.kind == 'IMPORT':
+            imported = statement.imported
+            if imported.kind == 'AS':
+                names.append(imported.identifier.value)
+            else:
+                names.append(imported.target.value if imported.kind in ATTRIBUTE_ACCESSES else imported.value)
+        statements.extend(getattr(statement, 'body', ()))
+    return names
+
+
+'''
+Get the local names of the given function, which are its parameters and the names bound by its body.
+
+@type function: Node
+@param function: FUNCTION_DEFINITION node
+
+@rtype: set
+@returns: set of names
+'''
+def function_locals(function):
+    return set(parameter.value for parameter in function.parameters).union(scope_names(function.body))
+
+
+'''
+Count the nodes of the given statements.
+
+@type statements: list
+@param statements: list of statement nodes
+
+@rtype: int
+@returns: number of nodes
+'''
+def count_nodes(statements):
+    count = 0
+    nodes = list(statements)
+    while nodes:
+        node = nodes.pop()
+        count += 1
+        nodes.extend(node.children())
+    return count
+
+
+'''
+Check if the return statements of the given function body only end the body, or the branches
+of the if statements ending it, so the body ends right after any of them.
+
+@type body: list
+@param body: list of statement nodes
+
+@rtype: bool
+@returns: true if the return statements are in tail position
+'''
+def tail_returns(body):
+    # (block, true if the block ends the body) pairs
+    blocks = [(body, True)]
+    while blocks:
+        statements, tail = blocks.pop()
+        for index, statement in enumerate(statements):
+            if statement.kind == 'RETURNED' and (not tail or index != len(statements) - 1):
+                return False
+            if statement.kind in BLOCK_STATEMENTS:
+                # an if statement ends the block if only its elif and else branches follow it
+                ends_block = all(following.kind in ('ELIF_STATEMENT', 'ELSE_STATEMENT') for following in statements[index + 1:])
+                blocks.append((statement.body, tail and ends_block and statement.kind in IF_CHAIN_STATEMENTS))
+    return True
+
+
+'''
+Check if all the paths of the given function body end in a return statement.
+
+@type body: list
+@param body: list of statement nodes
+
+@rtype: bool
+@returns: true if the body always returns
+'''
+def always_returns(body):
+    blocks = [body]
+    while blocks:
+        statements = blocks.pop()
+        if not statements:
+            return False
+        last = statements[-1]
+        if last.kind == 'RETURNED':
+            continue
+        if last.kind != 'ELSE_STATEMENT':
+            return False
+        index = len(statements) - 1
+        while statements[index].kind != 'IF_STATEMENT':
+            blocks.append(statements[index].body)
+            index -= 1
+        blocks.append(statements[index].body)
+    return True
+
+
+'''
+Add a 'return None' to the paths of the given function body which do not end in a return
+statement, so the body always returns.
+
+@type body: list
+@param body: list of statement nodes
+'''
+def add_returns(body):
+    blocks = [body]
+    while blocks:
+        statements = blocks.pop()
+        last = statements[-1]
+        if last.kind == 'RETURNED':
+            continue
+        if last.kind not in IF_CHAIN_STATEMENTS:
+            statements.append(Returned(NoneLiteral('None'), last.line))
+            continue
+        index = len(statements) - 1
+        while statements[index].kind != 'IF_STATEMENT':
+            blocks.append(statements[index].body)
+            index -= 1
+        blocks.append(statements[index].body)
+        if last.kind != 'ELSE_STATEMENT':
+            statements.append(ElseStatement([Returned(NoneLiteral('None'), last.line)], last.line))
+
+
+'''
+Get the python value of the given literal node.
+
+@type node: Node
+@param node: AST node
+
+@returns: python value of the literal, or NOT_CONSTANT if the node is not a literal
+'''
+def literal_value(node):
+    kind = node.kind
+    if kind not in LITERALS:
+        return NOT_CONSTANT
+    if kind == 'NUMBER':
+        return int(node.value)
+    if kind == 'STRING':
+        return ast.literal_eval(node.value) if '\\' in node.value else node.value[1:-1]
+    if kind == 'NONE':
+        return None
+    return kind == 'TRUE'
+
+
+'''
+Create the literal node of the given value.
+
+@param value: python value
+
+@rtype: Leaf
+@returns: literal node, or None if the value has no literal
+'''
+def value_literal(value):
+    if value is None:
+        return NoneLiteral('None')
+    if value.__class__ is bool:
+        return boolean_literal(value)
+    if value.__class__ is int and value >= 0:
+        return Number(str(value))
+    if value.__class__ is str and not any(character in value for character in '"\\\n'):
+        return String(f'"{value}"')
+    return None
+
+
+'''
+Create the literal node of the given boolean.
+
+@type value: bool
+@param value: boolean
+
+@rtype: Leaf
+@returns: TRUE or FALSE node
+'''
+def boolean_literal(value):
+    return TrueLiteral('True') if value else FalseLiteral('False')
+
+
+Optimizer.register_pass(ConstantFolding)
+Optimizer.register_pass(BranchPruning)
+Optimizer.register_pass(DeadCodeElimination)
+Optimizer.register_pass(LoopInvariantCodeMotion)
+Optimizer.register_pass(FunctionInlining, before='constant_folding')
+Optimizer.register_pass(PartialEvaluation, before='function_inlining')
+Optimizer.register_pass(TailCallElimination, before='loop_invariant_code_motion')
@@ -1,3 +1,9 @@
+from bisect import bisect_left, bisect_right
+from collections import deque
+from token_buffer import TOKEN_KINDS, KIND_CODES, TokenBuffer, intern_kind
+from ast_nodes import (NODE_CLASSES, leaf_class, shift_lines, Program, Import, As, Identifier, SelfIdentifier, SelfReference, IfStatement, ElifStatement,
+                       ElseStatement, ForLoop, WhileLoop, ClassDeclaration, FunctionDefinition, Returned, Pass, FunctionCall, ExpressionAttributeAccess,
+                       NotExpression, LogicalExpression, ComparisonExpression, Operation)
 '''
 Generates an AST from a list of basic python tokens, and performs syntactic analysis on its nodes.
 
@@ -5,53 +11,225 @@ Generates an AST from a list of basic python tokens, and performs syntactic anal
 @date 02-05-2023
 @version 1.0
 '''
+
+IF = KIND_CODES['IF']
+ELIF = KIND_CODES['ELIF']
+ELSE = KIND_CODES['ELSE']
+FOR = KIND_CODES['FOR']
+IN = KIND_CODES['IN']
+WHILE = KIND_CODES['WHILE']
+CLASS = KIND_CODES['CLASS']
+DEF = KIND_CODES['DEF']
+RETURN = KIND_CODES['RETURN']
+IMPORT = KIND_CODES['IMPORT']
+AS = KIND_CODES['AS']
+TRUE = KIND_CODES['TRUE']
+FALSE = KIND_CODES['FALSE']
+NONE = KIND_CODES['NONE']
+PASS = KIND_CODES['PASS']
+AND = KIND_CODES['AND']
+OR = KIND_CODES['OR']
+NOT = KIND_CODES['NOT']
+CLASS_IDENTIFIER = KIND_CODES['CLASS_IDENTIFIER']
+IDENTIFIER = KIND_CODES['IDENTIFIER']
+EQUALS = KIND_CODES['EQUALS']
+ASSIGN = KIND_CODES['ASSIGN']
+NOT_EQUALS = KIND_CODES['NOT_EQUALS']
+GREATER_THAN_EQUAL = KIND_CODES['GREATER_THAN_EQUAL']
+GREATER_THAN = KIND_CODES['GREATER_THAN']
+LESS_THAN_EQUAL = KIND_CODES['LESS_THAN_EQUAL']
+LESS_THAN = KIND_CODES['LESS_THAN']
+NUMBER = KIND_CODES['NUMBER']
+STRING = KIND_CODES['STRING']
+ADD = KIND_CODES['ADD']
+SUBTRACT = KIND_CODES['SUBTRACT']
+MULTIPLY = KIND_CODES['MULTIPLY']
+DIVIDE = KIND_CODES['DIVIDE']
+LEFT_PAREN = KIND_CODES['LEFT_PAREN']
+RIGHT_PAREN = KIND_CODES['RIGHT_PAREN']
+DOT = KIND_CODES['DOT']
+COMMA = KIND_CODES['COMMA']
+COLON = KIND_CODES['COLON']
+INDENT = KIND_CODES['INDENT']
+DEDENT = KIND_CODES['DEDENT']
+
+# binding power of each operator, the higher the tighter it binds its operands
+BINDING_POWERS = {
+    'or': 1,
+    'and': 2,
+    'not': 3,
+    '==': 4, '!=': 4, '>': 4, '<': 4, '>=': 4, '<=': 4,
+    '+': 5, '-': 5,
+    '*': 6, '/': 6
+}
+# node class built by each binary operator
+BINARY_OPERATORS = {
+    OR: LogicalExpression,
+    AND: LogicalExpression,
+    EQUALS: ComparisonExpression,
+    NOT_EQUALS: ComparisonExpression,
+    GREATER_THAN: ComparisonExpression,
+    LESS_THAN: ComparisonExpression,
+    GREATER_THAN_EQUAL: ComparisonExpression,
+    LESS_THAN_EQUAL: ComparisonExpression,
+    ADD: Operation,
+    SUBTRACT: Operation,
+    MULTIPLY: Operation,
+    DIVIDE: Operation
+}
+IF_CHAIN_KINDS = frozenset((IF, ELIF))
+
+
 class Parser:
     
 
     '''
-    Create new Parser object.
+    Create new Parser object. Tokens are consumed lazily, so they can be given as a list
+    or as any iterable, such as the generator returned by Lexer.iter_tokens, or as a
+    TokenBuffer, in which case token values are only read from the source when needed.
 
-    @type tokens: list
-    @param tokens: a list of tokens
+    @type tokens: iterable
+    @param tokens: a list, iterable or TokenBuffer of tokens
     '''
     def __init__(self, tokens):
         self.tokens = tokens
+        if isinstance(tokens, TokenBuffer):
+            self.buffer = tokens
+            self.token_stream = None
+        else:
+            self.buffer = None
+            self.token_stream = iter(tokens)
+        self.lookahead = deque()
         self.current_token_index = 0
         self.current_token_line = 1
-        self.current_token = self.tokens[self.current_token_index]
-        self.if_check = False
-        self.return_check = False
+        self.current_kind = None
+        self.stream_token = None
+        self.load_token()
+        self.context = ParseContext(False)
+
+
+    '''
+    Current token in the same tuple form returned by Lexer.tokenize.
+
+    @rtype: tuple
+    @returns: current token, or None if there are no more tokens
+    '''
+    @property
+    def current_token(self):
+        if self.current_kind is None:
+            return None
+        if self.buffer is not None:
+            return self.buffer.token(self.current_token_index)
+        return self.stream_token
+
+
+    '''
+    Value of the current token, read from the source only when requested.
+
+    @rtype: str
+    @returns: current token value
+    '''
+    def current_value(self):
+        if self.buffer is not None:
+            return self.buffer.value(self.current_token_index)
+        return self.stream_token[1]
 
 
     '''
-    Checks if current token is not None and that is not the end of the list,
-    and goes on one position on the tokens list.
+    Loads the kind and line of the token at the current position, setting the kind
+    to None if there are no more tokens.
+    '''
+    def load_token(self):
+        if self.buffer is not None:
+            if self.current_token_index < len(self.buffer):
+                self.current_kind = self.buffer.kinds[self.current_token_index]
+                self.current_token_line = self.buffer.lines[self.current_token_index]
+            else:
+                self.current_kind = None
+        else:
+            token = self.next_token()
+            self.stream_token = token
+            if token is not None:
+                kind = KIND_CODES.get(token[0])
+                self.current_kind = kind if kind is not None else intern_kind(token[0])
+                self.current_token_line = token[2]
+            else:
+                self.current_kind = None
+
+
+    '''
+    Takes the next token from the lookahead buffer, or from the tokens stream if the buffer is empty.
+
+    @rtype: tuple
+    @returns: next token, or None if there are no more tokens
+    '''
+    def next_token(self):
+        if self.lookahead:
+            return self.lookahead.popleft()
+        return next(self.token_stream, None)
+
+
+    '''
+    Returns a token ahead of the current one without consuming it, buffering
+    the tokens read from the stream until they are consumed.
+
+    @type offset: int
+    @param offset: distance from the current token, 1 for the next one
+
+    @rtype: tuple
+    @returns: token at the given offset, or None if past the end of the tokens
+    '''
+    def peek(self, offset=1):
+        if self.buffer is not None:
+            index = self.current_token_index + offset
+            return self.buffer.token(index) if index < len(self.buffer) else None
+        while len(self.lookahead) < offset:
+            token = next(self.token_stream, None)
+            if token is None:
+                return None
+            self.lookahead.append(token)
+        return self.lookahead[offset - 1]
+
+
+    '''
+    Moves to the given position on the tokens, which must be a list or a TokenBuffer.
+
+    @type index: int
+    @param index: position of the token to move to
+    '''
+    def seek(self, index):
+        self.current_token_index = index
+        self.lookahead.clear()
+        if self.buffer is None:
+            self.token_stream = map(self.tokens.__getitem__, range(index, len(self.tokens)))
+        self.load_token()
+
+
+    '''
+    Checks if current token is not None and that is not the end of the tokens,
+    and goes on one position on the tokens.
     '''
     def advance(self):
         self.current_token_index += 1
-        if self.current_token is not None and self.current_token_index < len(self.tokens):
-            self.current_token = self.tokens[self.current_token_index]
-            self.current_token_line = self.current_token[2]
-        else:
-            self.current_token = None
+        if self.current_kind is not None:
+            self.load_token()
 
 
     '''
-    Check if current token is of the desired pattern, or any pattern, if so,
+    Check if current token is of the desired kind, if so,
     advance on the tokens list.
 
     @raise SyntaxError: if invalid syntax is detected
 
-    @type token_type: str
-    @param token_type: token pattern or 0
+    @type token_kind: int
+    @param token_kind: token kind code
     '''
-    def consume(self, token_type):
-        if token_type == 0:
-            self.advance()
-        elif self.current_token[0] == token_type:
+    def consume(self, token_kind):
+        if self.current_kind == token_kind:
             self.advance()
         else:
-            raise SyntaxError(f"Invalid syntax in line {self.current_token_line}: expected {token_type} got {self.current_token[1]}") 
+            got = self.current_value() if self.current_kind is not None else None
+            raise SyntaxError(f"Invalid syntax in line {self.current_token_line}: expected {TOKEN_KINDS[token_kind]} got {got}")
 
 
     '''
@@ -60,13 +238,13 @@ class Parser:
 
     @raise SyntaxError: if invalid syntax is detected
 
-    @rtype: tuple
+    @rtype: Program
     @returns: an AST
     '''
     def parse(self):
         program = self.parse_program()
-        ast = ('PROGRAM', program)
-        if self.current_token is not None:
+        ast = Program(program)
+        if self.current_kind is not None:
             raise SyntaxError(f"Invalid syntax in line {self.current_token_line}")
         return ast
 
@@ -79,11 +257,93 @@ class Parser:
     '''
     def parse_program(self):
         statements = []
-        while self.current_token is not None:
+        # token spans of each statement, used to reparse only the edited statements
+        self.statement_starts = []
+        self.statement_ends = []
+        self.statement_if_checks = []
+        while self.current_kind is not None:
+            self.statement_starts.append(self.current_token_index)
+            self.statement_if_checks.append(self.context.if_check)
             statements.append(self.parse_statement())
+            self.statement_ends.append(self.current_token_index)
+        self.statements = statements
         return statements
 
 
+    '''
+    Incremental version of parse, which updates the AST of a previously parsed program after
+    some of its tokens were changed, as returned by Lexer.relex. The statements of the program
+    before the changed tokens are reused, parsing restarts at the first statement touching them,
+    and stops after them as soon as a statement starts where an old statement started, reusing
+    the rest of the statements with their lines shifted.
+
+    @raise SyntaxError: if invalid syntax is detected
+
+    @type tokens: list
+    @param tokens: the updated list or TokenBuffer of tokens
+
+    @type first_token: int
+    @param first_token: index of the first changed token
+
+    @type old_token_end: int
+    @param old_token_end: index after the last changed token on the old tokens
+
+    @type new_token_end: int
+    @param new_token_end: index after the last changed token on the updated tokens
+
+    @rtype: Program
+    @returns: an AST
+    '''
+    def reparse(self, tokens, first_token, old_token_end, new_token_end):
+        old_statements = self.statements
+        old_starts = self.statement_starts
+        old_ends = self.statement_ends
+        old_if_checks = self.statement_if_checks
+        token_delta = new_token_end - old_token_end
+
+        self.tokens = tokens
+        self.buffer = tokens if isinstance(tokens, TokenBuffer) else None
+        kept = bisect_right(old_ends, first_token)
+        statements = old_statements[:kept]
+        starts = old_starts[:kept]
+        ends = old_ends[:kept]
+        if_checks = old_if_checks[:kept]
+        if kept < len(old_starts):
+            self.seek(old_starts[kept])
+            self.context = ParseContext(False)
+            self.context.if_check = old_if_checks[kept]
+        else:
+            self.seek(old_ends[-1] if old_ends else 0)
+
+        reused = len(old_statements)
+        while self.current_kind is not None:
+            start = self.current_token_index
+            if start >= new_token_end:
+                old_index = bisect_left(old_starts, start - token_delta)
+                if old_index < len(old_starts) and old_starts[old_index] == start - token_delta and old_if_checks[old_index] == self.context.if_check:
+                    reused = old_index
+                    break
+            starts.append(start)
+            if_checks.append(self.context.if_check)
+            statements.append(self.parse_statement())
+            ends.append(self.current_token_index)
+
+        if reused < len(old_statements) and old_statements[reused].line != self.current_token_line:
+            shift_lines(old_statements[reused:], self.current_token_line - old_statements[reused].line)
+        statements.extend(old_statements[reused:])
+        starts.extend(old_start + token_delta for old_start in old_starts[reused:])
+        ends.extend(old_end + token_delta for old_end in old_ends[reused:])
+        if_checks.extend(old_if_checks[reused:])
+        if reused < len(old_statements):
+            self.seek(len(tokens))
+
+        self.statements = statements
+        self.statement_starts = starts
+        self.statement_ends = ends
+        self.statement_if_checks = if_checks
+        return Program(statements)
+
+
     '''
     Parses the correctness of parameters in statements which require of them.
 
@@ -91,14 +351,14 @@ class Parser:
     @returns: list of parameters
     '''
     def parse_parameters(self):
-        self.consume('LEFT_PAREN')
+        self.consume(LEFT_PAREN)
         parameters = []
-        while self.current_token is not None and self.current_token[0] != 'RIGHT_PAREN':
+        while self.current_kind is not None and self.current_kind != RIGHT_PAREN:
             parameters.append(self.parse_factor())
-            if self.current_token is not None and self.current_token[0] == 'COMMA':
-                self.consume('COMMA')
-        self.consume('RIGHT_PAREN')
-        self.consume('COLON')
+            if self.current_kind is not None and self.current_kind == COMMA:
+                self.consume(COMMA)
+        self.consume(RIGHT_PAREN)
+        self.consume(COLON)
         return parameters
 
 
@@ -109,292 +369,609 @@ class Parser:
     @returns: list of arguments
     '''
     def parse_arguments(self):
-        self.consume('LEFT_PAREN')
+        self.consume(LEFT_PAREN)
         arguments = []
-        while self.current_token is not None and self.current_token[0] != 'RIGHT_PAREN':
+        while self.current_kind is not None and self.current_kind != RIGHT_PAREN:
             argument = self.parse_factor()
             arguments.append(argument)
-            if self.current_token is not None and self.current_token[0] == 'COMMA':
-                self.consume('COMMA')
-        self.consume('RIGHT_PAREN')
+            if self.current_kind is not None and self.current_kind == COMMA:
+                self.consume(COMMA)
+        self.consume(RIGHT_PAREN)
         return arguments
         
 
     '''
     Parses blocks, a block being an agrupation of statements in between an INDENT and a DEDENT token.
+    Each block is parsed on its own context, so the state of its statements does not leak
+    to the enclosing block.
+
+    @type return_check: bool
+    @param return_check: true if return statements are allowed on the block
 
     @rtype: list
     @returns: list of statements
     '''
-    def parse_block(self):
-        self.consume('INDENT')
-        statements = []
-        while self.current_token is not None and self.current_token[0] != 'DEDENT':
-            statements.append(self.parse_statement())
-        self.consume('DEDENT')
-        return statements
+    def parse_block(self, return_check):
+        return self.parse_blocks(OpenBlock(return_check, list))
 
 
     '''
-    Parses factors, a factor being the smaller of the possible python structures.
+    Parses the block opened by a statement, and all the blocks nested in it, without recursion.
+    Statements owning a block return an OpenBlock once their header is parsed, and are kept
+    on a stack of open blocks until their DEDENT token is reached, when their node is built.
 
     @raise SyntaxError: if invalid syntax is detected
 
-    @rtype: tuple
+    @type open_block: OpenBlock
+    @param open_block: block opened by the statement being parsed
+
+    @rtype: Node
+    @returns: AST node of the statement
+    '''
+    def parse_blocks(self, open_block):
+        statement_parsers = self.statement_parsers
+        blocks = []
+
+        while True:
+            if open_block is not None:
+                blocks.append((open_block, [], self.context))
+                self.context = ParseContext(open_block.return_check)
+                self.consume(INDENT)
+                open_block = None
+
+            token_kind = self.current_kind
+            if token_kind is not None and token_kind != DEDENT:
+                parse = statement_parsers.get(token_kind)
+                if parse is None:
+                    self.raise_unexpected_token()
+                context = self.context
+                line = self.current_token_line
+                node = parse(self)
+                if node.__class__ is OpenBlock:
+                    node.token_kind = token_kind
+                    node.line = line
+                    open_block = node
+                else:
+                    node.line = line
+                    blocks[-1][1].append(node)
+                    context.if_check = token_kind in IF_CHAIN_KINDS
+            else:
+                self.consume(DEDENT)
+                closed_block, statements, self.context = blocks.pop()
+                node = closed_block.build(statements)
+                if not blocks:
+                    return node
+                node.line = closed_block.line
+                blocks[-1][1].append(node)
+                self.context.if_check = closed_block.token_kind in IF_CHAIN_KINDS
+
+
+    '''
+    Parses factors, a factor being the smaller of the possible python structures,
+    using the parser registered for the kind of the current token.
+
+    @raise SyntaxError: if invalid syntax is detected
+
+    @rtype: Node
     @returns: AST node
     '''
     def parse_factor(self):
+        parse = self.factor_parsers.get(self.current_kind)
+        if parse is None:
+            if self.current_kind is None:
+                raise SyntaxError(f"Invalid syntax in line {self.current_token_line}: unexpected end of input")
+            raise SyntaxError(f"Invalid syntax in line {self.current_token_line}: {TOKEN_KINDS[self.current_kind]} {self.current_value()}")
+        return parse(self)
 
-        token_type, token_value, lineno = self.current_token
 
-        if token_type == 'NONE':
-            self.consume(0)
-            node = ('NONE', token_value)
-            return node
+    '''
+    Parses a literal factor, whose node type is the kind of its token.
 
-        elif token_type == 'NUMBER':
-            self.consume(0)
-            node = ('NUMBER', token_value)
-            return node
+    @rtype: Node
+    @returns: AST node
+    '''
+    def parse_literal(self):
+        node = leaf_class(TOKEN_KINDS[self.current_kind])(self.current_value())
+        self.advance()
+        return node
 
-        elif token_type == 'STRING':
-            self.consume(0)
-            node = ('STRING', token_value)
-            return node
 
-        elif token_type == 'CLASS_IDENTIFIER':
-            self.consume(0)
-            node = ('CLASS_IDENTIFIER', token_value)
-            return node
+    '''
+    Parses an identifier factor, which refers to self or to one of its attributes if its value is self.
 
-        elif token_type == 'IDENTIFIER':
-            self.consume(0)
-            if token_value == 'self':
-                if self.current_token[0] == 'DOT':
-                    self.consume('DOT')
-                    mod_token_value = 'self.' + self.current_token[1]
-                    self.consume(0)
-                    node = ('SELF_IDENTIFIER', mod_token_value)
-                else:
-                    node = ('SELF', token_value)
-                return node
+    @rtype: Node
+    @returns: AST node
+    '''
+    def parse_identifier(self):
+        token_value = self.current_value()
+        self.advance()
+        if token_value == 'self':
+            if self.current_kind == DOT:
+                self.consume(DOT)
+                node = SelfIdentifier('self.' + self.current_value())
+                self.advance()
             else:
-                node = ('IDENTIFIER', token_value)
-                return node
-
+                node = SelfReference(token_value)
+            return node
         else:
-            raise SyntaxError(f"Invalid syntax in line {self.current_token_line}: {token_type} {token_value}")
-        
+            return Identifier(token_value)
+
 
     '''
-    Parses expressions, an expression being an agrupation of factors and expressions.
+    Parses expressions, an expression being an agrupation of factors and expressions joined
+    by operators, using precedence climbing: operands are parsed with the binding power of
+    the operator on their left, so chains of operators of the same precedence are parsed
+    iteratively, and nodes are nested following the operators precedence.
 
-    @rtype: tuple
+    @raise SyntaxError: if invalid syntax is detected
+
+    @type min_binding_power: int
+    @param min_binding_power: operators binding less or equal than this end the expression
+
+    @rtype: Node
     @returns: AST node
     '''
-    def parse_expression(self):
-        
-        node = self.parse_factor()
+    def parse_expression(self, min_binding_power=0):
+
+        parse = self.prefix_parsers.get(self.current_kind)
+        node = parse(self) if parse is not None else self.parse_primary()
+
+        comparison_check = False
+        while True:
+            node_class = BINARY_OPERATORS.get(self.current_kind)
+            if node_class is None:
+                break
+            operator = self.current_value()
+            binding_power = BINDING_POWERS[operator]
+            if binding_power <= min_binding_power:
+                break
+            if node_class is ComparisonExpression:
+                if comparison_check:
+                    raise SyntaxError(f"Invalid syntax in line {self.current_token_line}: chained comparisons are not supported")
+                comparison_check = True
+            self.advance()
+            right = self.parse_expression(binding_power)
+            node = node_class(operator, node, right)
 
-        if self.current_token is not None and self.current_token[0] in ('MULTIPLY', 'DIVIDE', 'ADD', 'SUBTRACT'):
-            operator = self.current_token[1]
-            self.consume(0)
-            right = self.parse_factor() 
-            node = ('OPERATION', operator, node, right)
-            return node
+        if min_binding_power == 0 and self.current_kind == AS:
+            self.consume(AS)
+            identifier = self.parse_factor()
+            node = As(identifier, node)
+
+        return node
+
+
+    '''
+    Parses a primary expression, being a factor followed by any calls or attribute accesses on it.
 
-        elif self.current_token is not None and self.current_token[0] in ('EQUALS', 'NOT_EQUALS', 'GREATER_THAN', 'LESS_THAN', 'GREATER_THAN_EQUAL', 'LESS_THAN_EQUAL'):
-            cmp_operator = self.current_token[1]
-            self.consume(0)
-            cmp_right = self.parse_expression()
-            cmp_node = ('COMPARISON_EXPRESSION', cmp_operator, node, cmp_right)
-            if self.current_token is not None and self.current_token[0] in ('AND', 'OR', 'NOT'):
-                lgc_operator = self.current_token[1]
-                self.consume(0)
-                lgc_rigth = self.parse_expression()
-                lgc_node = ('LOGICAL_EXPRESSION', lgc_operator, cmp_node, lgc_rigth)
-                return lgc_node
+    @rtype: Node
+    @returns: AST node
+    '''
+    def parse_primary(self):
+        node = self.parse_factor()
+        while True:
+            if self.current_kind == LEFT_PAREN:
+                arguments = self.parse_arguments()
+                node = FunctionCall(node, arguments)
+            elif self.current_kind == DOT:
+                node = ExpressionAttributeAccess(node, self.parse_attributes())
             else:
-                return cmp_node
-
-        elif self.current_token is not None and self.current_token[0] in ('DOT'):
-            expressions = []
-            while self.current_token is not None and self.current_token[0] in ('DOT'):
-                self.consume('DOT')
-                expressions.append(self.parse_expression())
-            node = ('ATRIBUTE_ACCESS', node, expressions)
-            return node
+                return node
 
-        elif self.current_token is not None and self.current_token[0] in ('LEFT_PAREN'):
-            arguments = self.parse_arguments()
-            node = ('FUNCTION_CALL', node, arguments)
-            return node
 
-        elif self.current_token is not None and self.current_token[0] in ('AS'):
-            self.consume('AS')
-            identifier = self.parse_factor()
-            node = ('AS', identifier, node)
-            return node
-            
-        else:
-            return node
+    '''
+    Parses the chain of attributes accessed on an expression, each one being
+    a factor, called if followed by its arguments.
+
+    @rtype: list
+    @returns: list of accessed attributes nodes
+    '''
+    def parse_attributes(self):
+        attributes = []
+        while self.current_kind == DOT:
+            self.consume(DOT)
+            attribute = self.parse_factor()
+            if self.current_kind == LEFT_PAREN:
+                arguments = self.parse_arguments()
+                attribute = FunctionCall(attribute, arguments)
+            attributes.append(attribute)
+        return attributes
+
 
+    '''
+    Parses the negation of an expression.
+
+    @rtype: Node
+    @returns: AST node
+    '''
+    def parse_not(self):
+        self.consume(NOT)
+        operand = self.parse_expression(BINDING_POWERS['not'])
+        return NotExpression(operand)
 
+
+    '''
+    Parses an expression in between parentheses, which has no node of its own.
+
+    @rtype: Node
+    @returns: AST node
     '''
-    Parses statements, a statement being an agrupation of factors, expressions and statements.
+    def parse_group(self):
+        self.consume(LEFT_PAREN)
+        node = self.parse_expression()
+        self.consume(RIGHT_PAREN)
+        return node
+
+
+    '''
+    Parses statements, a statement being an agrupation of factors, expressions and statements,
+    using the parser registered for the kind of the current token. Statements continuing
+    an if statement are only allowed right after an IF or ELIF statement of the same block.
 
     @raise SyntaxError: if invalid syntax is detected
 
-    @rtype: tuple
+    @rtype: Node
     @returns: AST node
     '''
     def parse_statement(self):
+        token_kind = self.current_kind
+        parse = self.statement_parsers.get(token_kind)
+        if parse is None:
+            self.raise_unexpected_token()
+        context = self.context
+        line = self.current_token_line
+        node = parse(self)
+        if node.__class__ is OpenBlock:
+            node = self.parse_blocks(node)
+        node.line = line
+        context.if_check = token_kind in IF_CHAIN_KINDS
+        return node
 
-        token_type, token_value, lineno = self.current_token
 
-        if token_type == 'IDENTIFIER':
+    '''
+    Raises a syntax error for the current token.
 
-            if token_value != 'self':
-                identifier = self.parse_factor()
+    @raise SyntaxError: always
+    '''
+    def raise_unexpected_token(self):
+        raise SyntaxError(f"Invalid syntax in line {self.current_token_line}: {TOKEN_KINDS[self.current_kind]} {self.current_value()}")
 
-                if self.current_token[0] == 'ASSIGN':
-                    self.consume('ASSIGN')
 
-                    if self.current_token[0] == 'CLASS_IDENTIFIER':
-                        class_name = self.parse_factor()
-                        arguments = self.parse_arguments()
-                        node = ('CLASS_ASSIGNMENT', identifier, class_name, arguments)
-                    else:
-                        expression = self.parse_expression()
-                        node = ('ASSIGNMENT', identifier, expression)
-                    return node
+    '''
+    Parses statements starting with an identifier, using the parser registered
+    for the kind of the token following the identifier.
 
-                elif self.current_token[0] == 'DOT':
-                    expressions = []
-                    while self.current_token is not None and self.current_token[0] in ('DOT'):
-                        self.consume('DOT')
-                        expressions.append(self.parse_expression())
-                    node = ('ATTRIBUTE_ACCESS', identifier, expressions)
-                    return node
+    @raise SyntaxError: if invalid syntax is detected
 
-                elif self.current_token[0] == 'LEFT_PAREN':
-                    arguments = self.parse_arguments()
-                    node = ('FUNCTION_CALL', identifier, arguments)
-                    return node
+    @rtype: Node
+    @returns: AST node
+    '''
+    def parse_identifier_statement(self):
+        token_kind = self.current_kind
+        token_value = self.current_value()
+        identifier = self.parse_factor()
+        parse = self.identifier_statement_parsers.get(self.current_kind)
+        if parse is None:
+            raise SyntaxError(f"Invalid syntax in line {self.current_token_line}: {TOKEN_KINDS[token_kind]} {token_value}")
+        prefix = 'SELF_' if token_value == 'self' else ''
+        return parse(self, identifier, prefix)
 
-                else:
-                    raise SyntaxError(f"Invalid syntax in line {self.current_token_line}: {token_type} {token_value}")
 
-            else:
-                identifier = self.parse_factor()
-
-                if self.current_token[0] == 'ASSIGN':
-                    self.consume('ASSIGN')
-
-                    if self.current_token[0] == 'CLASS_IDENTIFIER':
-                        class_name = self.parse_factor()
-                        arguments = self.parse_arguments()
-                        node = ('SELF_CLASS_ASSIGNMENT', identifier, class_name, arguments)
-                    else:
-                        expression = self.parse_expression()
-                        node = ('SELF_ASSIGNMENT', identifier, expression)
-                    return node
+    '''
+    Parses an assignment to an identifier, of a class instance or of an expression.
 
-                elif self.current_token[0] == 'DOT':
-                    expressions = []
-                    while self.current_token is not None and self.current_token[0] in ('DOT'):
-                        self.consume('DOT')
-                        expressions.append(self.parse_expression())
-                    node = ('SELF_ATTRIBUTE_ACCESS', identifier, expressions)
-                    return node
+    @type identifier: Leaf
+    @param identifier: assigned identifier node
 
-                elif self.current_token[0] == 'LEFT_PAREN':
-                    arguments = self.parse_arguments()
-                    node = ('SELF_FUNCTION_CALL', identifier, arguments)
-                    return node
+    @type prefix: str
+    @param prefix: 'SELF_' if the identifier refers to self, else ''
 
-                else:
-                    raise SyntaxError(f"Invalid syntax in line {self.current_token_line}: {token_type} {token_value}")
+    @rtype: Node
+    @returns: AST node
+    '''
+    def parse_assignment(self, identifier, prefix):
+        self.consume(ASSIGN)
+        if self.current_kind == CLASS_IDENTIFIER:
+            class_name = self.parse_factor()
+            arguments = self.parse_arguments()
+            return NODE_CLASSES[prefix + 'CLASS_ASSIGNMENT'](identifier, class_name, arguments)
+        else:
+            expression = self.parse_expression()
+            return NODE_CLASSES[prefix + 'ASSIGNMENT'](identifier, expression)
 
-        elif token_type == 'IMPORT':
-            self.consume('IMPORT')
-            imported = self.parse_expression()
-            node = ('IMPORT', imported)
-            return node
 
-        elif token_type == 'IF':
-            self.consume('IF')
-            if_condition = self.parse_expression()
-            self.consume('COLON')
-            if_body = self.parse_block()
-            node = ('IF_STATEMENT', if_condition, if_body)
-            self.if_check = True
-            return node
+    '''
+    Parses an access to the attributes of an identifier.
 
-        elif token_type == 'ELIF' and self.if_check == True:
-            self.consume('ELIF')
-            elif_condition = self.parse_expression()
-            self.consume('COLON')
-            elif_body = self.parse_block()
-            node = ('ELIF_STATEMENT', elif_condition, elif_body)
-            return node
+    @type identifier: Leaf
+    @param identifier: accessed identifier node
 
-        elif token_type == 'ELSE' and self.if_check == True:
-            self.consume('ELSE')
-            self.consume('COLON')
-            else_body = self.parse_block()
-            node = ('ELSE_STATEMENT', else_body)
-            self.if_check = False
-            return node
+    @type prefix: str
+    @param prefix: 'SELF_' if the identifier refers to self, else ''
 
-        elif token_type == 'FOR':
-            self.consume('FOR')
-            identifier = self.parse_factor()
-            self.consume('IN')
-            iterable = self.parse_expression()
-            self.consume('COLON')
-            body = self.parse_block()
-            node = ('FOR_LOOP', identifier, iterable, body)
-            return node
+    @rtype: Node
+    @returns: AST node
+    '''
+    def parse_attribute_access(self, identifier, prefix):
+        attributes = self.parse_attributes()
+        return NODE_CLASSES[prefix + 'ATTRIBUTE_ACCESS'](identifier, attributes)
 
-        elif token_type == 'WHILE':
-            self.consume('WHILE')
-            condition = self.parse_expression()
-            self.consume(0)
-            body = self.parse_block()
-            node = ('WHILE_LOOP', condition, body)
-            return node
 
-        elif token_type == 'CLASS':
-            self.consume('CLASS')
-            class_name = self.parse_factor()
-            parent_class = None
-            self.consume('LEFT_PAREN')
-            if self.current_token[0] != 'RIGHT_PAREN':
-                parent_class = self.parse_factor()
-            self.consume('RIGHT_PAREN')
-            self.consume('COLON')
-            body = self.parse_block()
-            node = ('CLASS_DECLARATION', class_name, parent_class, body)
-            self.if_check = False
-            return node
+    '''
+    Parses a call to an identifier.
 
-        elif token_type == 'DEF':
-            self.return_check = True
-            self.consume('DEF')
-            function_name = self.parse_factor()
-            parameters = self.parse_parameters()
-            body = self.parse_block()
-            node = ('FUNCTION_DEFINITION', function_name, parameters, body)
-            self.if_check = False
-            self.return_check = False
-            return node
+    @type identifier: Leaf
+    @param identifier: called identifier node
 
-        elif token_type == 'RETURN' and self.return_check == True:
-            self.consume('RETURN')
-            returned = self.parse_expression()
-            node = ('RETURNED', returned)
-            return node
+    @type prefix: str
+    @param prefix: 'SELF_' if the identifier refers to self, else ''
 
-        else:
-            raise SyntaxError(f"Invalid syntax in line {self.current_token_line}: {token_type} {token_value}")
+    @rtype: Node
+    @returns: AST node
+    '''
+    def parse_call_statement(self, identifier, prefix):
+        arguments = self.parse_arguments()
+        return NODE_CLASSES[prefix + 'FUNCTION_CALL'](identifier, arguments)
+
+
+    '''
+    Parses an import statement.
+
+    @rtype: Node
+    @returns: AST node
+    '''
+    def parse_import(self):
+        self.consume(IMPORT)
+        imported = self.parse_expression()
+        return Import(imported)
+
+
+    '''
+    Parses an if statement.
+
+    @rtype: OpenBlock
+    @returns: block opened by the statement
+    '''
+    def parse_if(self):
+        self.consume(IF)
+        if_condition = self.parse_expression()
+        self.consume(COLON)
+        return OpenBlock(self.context.return_check, lambda if_body: IfStatement(if_condition, if_body))
+
+
+    '''
+    Parses an elif statement, which must follow an IF or ELIF statement.
+
+    @raise SyntaxError: if not following an IF or ELIF statement
+
+    @rtype: OpenBlock
+    @returns: block opened by the statement
+    '''
+    def parse_elif(self):
+        if not self.context.if_check:
+            self.raise_unexpected_token()
+        self.consume(ELIF)
+        elif_condition = self.parse_expression()
+        self.consume(COLON)
+        return OpenBlock(self.context.return_check, lambda elif_body: ElifStatement(elif_condition, elif_body))
+
+
+    '''
+    Parses an else statement, which must follow an IF or ELIF statement.
+
+    @raise SyntaxError: if not following an IF or ELIF statement
+
+    @rtype: OpenBlock
+    @returns: block opened by the statement
+    '''
+    def parse_else(self):
+        if not self.context.if_check:
+            self.raise_unexpected_token()
+        self.consume(ELSE)
+        self.consume(COLON)
+        return OpenBlock(self.context.return_check, lambda else_body: ElseStatement(else_body))
+
+
+    '''
+    Parses a for loop.
+
+    @rtype: OpenBlock
+    @returns: block opened by the statement
+    '''
+    def parse_for(self):
+        self.consume(FOR)
+        identifier = self.parse_factor()
+        self.consume(IN)
+        iterable = self.parse_expression()
+        self.consume(COLON)
+        return OpenBlock(self.context.return_check, lambda body: ForLoop(identifier, iterable, body))
+
+
+    '''
+    Parses a while loop.
+
+    @rtype: OpenBlock
+    @returns: block opened by the statement
+    '''
+    def parse_while(self):
+        self.consume(WHILE)
+        condition = self.parse_expression()
+        self.consume(COLON)
+        return OpenBlock(self.context.return_check, lambda body: WhileLoop(condition, body))
+
+
+    '''
+    Parses a class declaration, with an optional parent class.
+
+    @rtype: OpenBlock
+    @returns: block opened by the statement
+    '''
+    def parse_class(self):
+        self.consume(CLASS)
+        class_name = self.parse_factor()
+        parent_class = None
+        self.consume(LEFT_PAREN)
+        if self.current_kind != RIGHT_PAREN:
+            parent_class = self.parse_factor()
+        self.consume(RIGHT_PAREN)
+        self.consume(COLON)
+        return OpenBlock(False, lambda body: ClassDeclaration(class_name, parent_class, body))
+
+
+    '''
+    Parses a function definition, whose body allows return statements.
+
+    @rtype: OpenBlock
+    @returns: block opened by the statement
+    '''
+    def parse_function(self):
+        self.consume(DEF)
+        function_name = self.parse_factor()
+        parameters = self.parse_parameters()
+        return OpenBlock(True, lambda body: FunctionDefinition(function_name, parameters, body))
+
+
+    '''
+    Parses a return statement, which must be inside a function.
+
+    @raise SyntaxError: if not inside a function
+
+    @rtype: Node
+    @returns: AST node
+    '''
+    def parse_return(self):
+        if not self.context.return_check:
+            self.raise_unexpected_token()
+        self.consume(RETURN)
+        returned = self.parse_expression()
+        return Returned(returned)
+
+
+    '''
+    Parses a pass statement.
+
+    @rtype: Node
+    @returns: AST node
+    '''
+    def parse_pass(self):
+        self.consume(PASS)
+        return Pass()
+
+
+    '''
+    Registers the parser of the statements starting with the given token kind,
+    replacing any previous one. Parsers are shared by the Parser class and its
+    subclasses, unless a subclass registers its own.
+
+    @type token_kind: int or str
+    @param token_kind: token kind code or name
+
+    @type parse: function
+    @param parse: function taking the Parser and returning the statement node
+    '''
+    @classmethod
+    def register_statement(cls, token_kind, parse):
+        if 'statement_parsers' not in cls.__dict__:
+            cls.statement_parsers = dict(cls.statement_parsers)
+        if isinstance(token_kind, str):
+            token_kind = intern_kind(token_kind)
+        cls.statement_parsers[token_kind] = parse
+
+
+    '''
+    Registers the parser of the factors starting with the given token kind,
+    replacing any previous one. Parsers are shared by the Parser class and its
+    subclasses, unless a subclass registers its own.
+
+    @type token_kind: int or str
+    @param token_kind: token kind code or name
+
+    @type parse: function
+    @param parse: function taking the Parser and returning the factor node
+    '''
+    @classmethod
+    def register_factor(cls, token_kind, parse):
+        if 'factor_parsers' not in cls.__dict__:
+            cls.factor_parsers = dict(cls.factor_parsers)
+        if isinstance(token_kind, str):
+            token_kind = intern_kind(token_kind)
+        cls.factor_parsers[token_kind] = parse
+
+
+    # dispatch tables, from the kind of the first token to the function parsing the production
+    statement_parsers = {
+        IDENTIFIER: parse_identifier_statement,
+        IMPORT: parse_import,
+        IF: parse_if,
+        ELIF: parse_elif,
+        ELSE: parse_else,
+        FOR: parse_for,
+        WHILE: parse_while,
+        CLASS: parse_class,
+        DEF: parse_function,
+        RETURN: parse_return,
+        PASS: parse_pass
+    }
+    identifier_statement_parsers = {
+        ASSIGN: parse_assignment,
+        DOT: parse_attribute_access,
+        LEFT_PAREN: parse_call_statement
+    }
+    prefix_parsers = {
+        NOT: parse_not,
+        LEFT_PAREN: parse_group
+    }
+    factor_parsers = {
+        TRUE: parse_literal,
+        FALSE: parse_literal,
+        NONE: parse_literal,
+        NUMBER: parse_literal,
+        STRING: parse_literal,
+        CLASS_IDENTIFIER: parse_literal,
+        IDENTIFIER: parse_identifier
+    }
+
+
+'''
+Block opened by a statement whose header was parsed, holding how to build
+the statement node once the statements of the block are parsed.
+'''
+class OpenBlock:
+
+    __slots__ = ('return_check', 'build', 'token_kind', 'line')
+
+
+    '''
+    Create new OpenBlock object.
+
+    @type return_check: bool
+    @param return_check: true if return statements are allowed on the block
+
+    @type build: function
+    @param build: function taking the list of statements of the block and returning the node
+    '''
+    def __init__(self, return_check, build):
+        self.return_check = return_check
+        self.build = build
+        self.token_kind = None
+        # line of the statement, set once its header is parsed
+        self.line = 0
+
+
+'''
+State of the block being parsed, which decides the statements allowed on it.
+'''
+class ParseContext:
+
+    __slots__ = ('if_check', 'return_check')
+
+
+    '''
+    Create new ParseContext object.
+
+    @type return_check: bool
+    @param return_check: true if return statements are allowed
+    '''
+    def __init__(self, return_check):
+        self.if_check = False
+        self.return_check = return_check
@@ -0,0 +1,320 @@
+import ast
+from node_visitor import NodeVisitor
+from code_generator import CodeGenerator
+'''
+Lowers the nodes of an AST to the nodes of the python standard library ast module, with the
+lines of the statements, so they can be compiled to a code object by the built-in compile
+without generating and parsing python code again.
+
+@author Nicolás Rodrigo Pèrez
+@date 17-10-2026
+@version 1.0
+'''
+
+# statements opening a block, whose body is lowered after them
+BLOCK_STATEMENTS = ('IF_STATEMENT', 'ELIF_STATEMENT', 'ELSE_STATEMENT', 'FOR_LOOP', 'WHILE_LOOP', 'CLASS_DECLARATION', 'FUNCTION_DEFINITION')
+OPERATORS = {
+    '+': ast.Add,
+    '-': ast.Sub,
+    '*': ast.Mult,
+    '/': ast.Div,
+    'and': ast.And,
+    'or': ast.Or,
+    '==': ast.Eq,
+    '!=': ast.NotEq,
+    '<': ast.Lt,
+    '<=': ast.LtE,
+    '>': ast.Gt,
+    '>=': ast.GtE
+}
+# expression contexts, shared by all the python nodes
+LOAD = ast.Load()
+STORE = ast.Store()
+
+
+class PythonAstGenerator(NodeVisitor):
+
+
+    '''
+    Create new PythonAstGenerator object.
+
+    @type ast: Program
+    @param ast: an AST
+    '''
+    def __init__(self, ast):
+        self.ast = ast
+        # location of the statement being lowered, given to all its python nodes
+        self.position = None
+
+
+    '''
+    Main function which lowers the given AST to a python module node.
+
+    Statements are lowered in order with an explicit stack of the blocks being lowered, as
+    CodeGenerator.emit does, ELIF and ELSE statements being lowered into the orelse block of
+    the previous if statement. Expressions are lowered by NodeVisitor.visit without recursion,
+    each node after its children.
+
+    @raise TypeError: if the AST node is not valid
+
+    @rtype: ast.Module
+    @returns: python module node
+    '''
+    def generate(self):
+        module_body = []
+        statement_generators = self.statement_generators
+        # [statements iterator, python statements, last python if statement] of the blocks being lowered
+        blocks = [[iter(self.ast.statements), module_body, None]]
+
+        while blocks:
+            block = blocks[-1]
+            statement = next(block[0], None)
+            if statement is None:
+                blocks.pop()
+                continue
+            statement_generator = statement_generators.get(statement.kind)
+            if statement_generator is None:
+                raise TypeError(f"Invalid node type: {statement.kind}")
+            self.position = {'lineno': statement.line, 'col_offset': 0}
+            python_statement = statement_generator(self, statement)
+
+            if statement.kind == 'ELSE_STATEMENT':
+                body = block[2].orelse
+                block[2] = None
+            elif statement.kind == 'ELIF_STATEMENT':
+                block[2].orelse.append(python_statement)
+                body = python_statement.body
+                block[2] = python_statement
+            else:
+                block[1].append(python_statement)
+                body = getattr(python_statement, 'body', None)
+                block[2] = python_statement if statement.kind == 'IF_STATEMENT' else None
+            if statement.kind in BLOCK_STATEMENTS:
+                blocks.append([iter(statement.body), body, None])
+
+        return ast.Module(module_body, [])
+
+
+    '''
+    Lower the given AST and compile it to a code object.
+
+    The built-in compile validates the python nodes recursively, so nodes nested too deeply,
+    such as the ones of an expression adding thousands of terms, are compiled from the python
+    code generated by CodeGenerator instead, which is not validated.
+
+    @raise TypeError: if the AST node is not valid
+    @raise ValueError: if the AST is nested too deeply to be compiled by python, even as text
+
+    @type filename: str
+    @param filename: file name shown in the tracebacks of the code
+
+    @rtype: code
+    @returns: executable code object
+    '''
+    def generate_code(self, filename='<compiled>'):
+        try:
+            return compile(self.generate(), filename, 'exec')
+        except RecursionError:
+            pass
+        try:
+            return compile(CodeGenerator(self.ast).generate(), filename, 'exec')
+        except RecursionError:
+            raise ValueError("Expression nested too deeply to be compiled to a code object") from None
+
+
+    '''
+    Lower the given name, dotted names such as 'self.x' being lowered to attribute nodes.
+
+    @type name: str
+    @param name: name
+
+    @type context: ast.expr_context
+    @param context: LOAD or STORE
+
+    @rtype: ast.expr
+    @returns: python name or attribute node
+    '''
+    def name(self, name, context):
+        if '.' not in name:
+            return ast.Name(name, context, **self.position)
+        parts = name.split('.')
+        node = ast.Name(parts[0], LOAD, **self.position)
+        for part in parts[1:-1]:
+            node = ast.Attribute(node, part, LOAD, **self.position)
+        return ast.Attribute(node, parts[-1], context, **self.position)
+
+
+    '''
+    Get the dotted name of the given imported expression.
+
+    @raise TypeError: if the expression is not a name or an attribute access on names
+
+    @type node: Node
+    @param node: imported expression
+
+    @rtype: str
+    @returns: dotted name
+    '''
+    def imported_name(self, node):
+        if node.kind == 'IDENTIFIER' or node.kind == 'CLASS_IDENTIFIER':
+            return node.value
+        if node.kind in ('ATRIBUTE_ACCESS', 'ATTRIBUTE_ACCESS'):
+            return '.'.join(self.imported_name(part) for part in [node.target] + node.attributes)
+        raise TypeError(f"Invalid node type: {node.kind}")
+
+
+    # python statement of each statement type, whose body is filled after it
+
+    def statement_IMPORT(self, node):
+        imported = node.imported
+        if imported.kind == 'AS':
+            alias = ast.alias(self.imported_name(imported.expression), imported.identifier.value, **self.position)
+        else:
+            alias = ast.alias(self.imported_name(imported), None, **self.position)
+        return ast.Import([alias], **self.position)
+
+    def statement_ASSIGNMENT(self, node):
+        target = self.name(node.identifier.value, STORE)
+        return ast.Assign([target], self.visit(node.value), **self.position)
+
+    def statement_CLASS_ASSIGNMENT(self, node):
+        target = self.name(node.identifier.value, STORE)
+        arguments = [self.visit(argument) for argument in node.arguments]
+        value = ast.Call(self.visit(node.class_name), arguments, [], **self.position)
+        return ast.Assign([target], value, **self.position)
+
+    def statement_IF_STATEMENT(self, node):
+        return ast.If(self.visit(node.condition), [], [], **self.position)
+
+    def statement_ELSE_STATEMENT(self, node):
+        return None
+
+    def statement_FOR_LOOP(self, node):
+        target = self.name(node.identifier.value, STORE)
+        return ast.For(target, self.visit(node.iterable), [], [], **self.position)
+
+    def statement_WHILE_LOOP(self, node):
+        return ast.While(self.visit(node.condition), [], [], **self.position)
+
+    def statement_CLASS_DECLARATION(self, node):
+        bases = [self.name(node.parent.value, LOAD)] if node.parent is not None else []
+        body = []
+        if node.slots is not None:
+            slots = ast.Tuple([ast.Constant(slot, **self.position) for slot in node.slots], LOAD, **self.position)
+            body.append(ast.Assign([ast.Name('__slots__', STORE, **self.position)], slots, **self.position))
+        return ast.ClassDef(node.name.value, bases, [], body, [], **self.position)
+
+    def statement_FUNCTION_DEFINITION(self, node):
+        parameters = [ast.arg(parameter.value, **self.position) for parameter in node.parameters]
+        arguments = ast.arguments([], parameters, None, [], [], None, [])
+        decorators = [self.visit(decorator) for decorator in node.decorators]
+        return ast.FunctionDef(node.name.value, arguments, [], decorators, **self.position)
+
+    def statement_RETURNED(self, node):
+        return ast.Return(self.visit(node.value), **self.position)
+
+    def statement_PASS(self, node):
+        return ast.Pass(**self.position)
+
+    def statement_EXPRESSION(self, node):
+        return ast.Expr(self.visit(node), **self.position)
+
+
+    # children of each expression node type, lowered before the node
+
+    def children_FUNCTION_CALL(self, node):
+        return [node.function] + node.arguments
+
+    def children_ATRIBUTE_ACCESS(self, node):
+        return [node.target] + node.attributes
+
+    def children_OPERATION(self, node):
+        return [node.left, node.right]
+
+    def children_NOT_EXPRESSION(self, node):
+        return [node.operand]
+
+    children_SELF_FUNCTION_CALL = children_FUNCTION_CALL
+    children_ATTRIBUTE_ACCESS = children_ATRIBUTE_ACCESS
+    children_SELF_ATTRIBUTE_ACCESS = children_ATRIBUTE_ACCESS
+    children_LOGICAL_EXPRESSION = children_OPERATION
+    children_COMPARISON_EXPRESSION = children_OPERATION
+
+
+    # python node of each expression node type, given the python nodes of its children
+
+    def leave_FUNCTION_CALL(self, node, results):
+        return ast.Call(results[0], results[1:], [], **self.position)
+
+    def leave_ATRIBUTE_ACCESS(self, node, results):
+        target = results[0]
+        for attribute in results[1:]:
+            if attribute.__class__ is ast.Call:
+                function = ast.Attribute(target, attribute.func.id, LOAD, **self.position)
+                target = ast.Call(function, attribute.args, [], **self.position)
+            else:
+                target = ast.Attribute(target, attribute.id, LOAD, **self.position)
+        return target
+
+    def leave_OPERATION(self, node, results):
+        return ast.BinOp(results[0], OPERATORS[node.operator](), results[1], **self.position)
+
+    def leave_LOGICAL_EXPRESSION(self, node, results):
+        return ast.BoolOp(OPERATORS[node.operator](), results, **self.position)
+
+    def leave_COMPARISON_EXPRESSION(self, node, results):
+        return ast.Compare(results[0], [OPERATORS[node.operator]()], [results[1]], **self.position)
+
+    def leave_NOT_EXPRESSION(self, node, results):
+        return ast.UnaryOp(ast.Not(), results[0], **self.position)
+
+    def leave_IDENTIFIER(self, node, results):
+        return self.name(node.value, LOAD)
+
+    def leave_NUMBER(self, node, results):
+        return ast.Constant(int(node.value), **self.position)
+
+    def leave_STRING(self, node, results):
+        value = node.value
+        # escape sequences are read as python reads them from the generated code
+        value = ast.literal_eval(value) if '\\' in value else value[1:-1]
+        return ast.Constant(value, **self.position)
+
+    def leave_NONE(self, node, results):
+        return ast.Constant(None, **self.position)
+
+    def leave_TRUE(self, node, results):
+        return ast.Constant(True, **self.position)
+
+    def leave_FALSE(self, node, results):
+        return ast.Constant(False, **self.position)
+    leave_SELF_FUNCTION_CALL = leave_FUNCTION_CALL
+    leave_ATTRIBUTE_ACCESS = leave_ATRIBUTE_ACCESS
+    leave_SELF_ATTRIBUTE_ACCESS = leave_ATRIBUTE_ACCESS
+    leave_SELF_IDENTIFIER = leave_IDENTIFIER
+    leave_CLASS_IDENTIFIER = leave_IDENTIFIER
+    leave_SELF = leave_IDENTIFIER
+
+
+    # dispatch table, from the statement type to the function lowering it
+    statement_generators = {
+        'IMPORT': statement_IMPORT,
+        'ASSIGNMENT': statement_ASSIGNMENT,
+        'SELF_ASSIGNMENT': statement_ASSIGNMENT,
+        'CLASS_ASSIGNMENT': statement_CLASS_ASSIGNMENT,
+        'SELF_CLASS_ASSIGNMENT': statement_CLASS_ASSIGNMENT,
+        'IF_STATEMENT': statement_IF_STATEMENT,
+        'ELIF_STATEMENT': statement_IF_STATEMENT,
+        'ELSE_STATEMENT': statement_ELSE_STATEMENT,
+        'FOR_LOOP': statement_FOR_LOOP,
+        'WHILE_LOOP': statement_WHILE_LOOP,
+        'CLASS_DECLARATION': statement_CLASS_DECLARATION,
+        'FUNCTION_DEFINITION': statement_FUNCTION_DEFINITION,
+        'RETURNED': statement_RETURNED,
+        'PASS': statement_PASS,
+        'FUNCTION_CALL': statement_EXPRESSION,
+        'SELF_FUNCTION_CALL': statement_EXPRESSION,
+        'ATRIBUTE_ACCESS': statement_EXPRESSION,
+        'ATTRIBUTE_ACCESS': statement_EXPRESSION,
+        'SELF_ATTRIBUTE_ACCESS': statement_EXPRESSION
+    }
@@ -1,3 +1,7 @@
+import builtins
+from node_visitor import NodeVisitor
+from ast_nodes import Leaf
+from symbol_table import SymbolTable, BUILTIN_SCOPE, MODULE_SCOPE, CLASS_SCOPE, FUNCTION_SCOPE
 '''
 Performs semantic analysis on the nodes of an AST.
 
@@ -5,227 +9,294 @@ Performs semantic analysis on the nodes of an AST.
 @date 02-05-2023
 @version 1.0
 '''
-class SemanticAnalyzer:
+
+class SemanticAnalyzer(NodeVisitor):
     
 
     '''
     Create new SemanticAnalyzer object.
 
-    @type ast: tuple
+    @type ast: Program
     @param ast: an AST
     '''
     def __init__(self, ast):
         self.ast = ast
-        self.symbols = {}
-        # add some predefined functions
-        self.symbols[('IDENTIFIER', 'print')] = ([('STRING', 'string')], [])
+        self.symbols = SymbolTable()
+        # side tables keyed by node: name bound by each defining node, and node defining the function of each call, None for builtin functions
+        self.bindings = {}
+        self.call_targets = {}
+        # method definitions by name, to check the calls on attributes
+        self.methods = {}
+        # add the predefined names
+        self.symbols.enter(BUILTIN_SCOPE)
+        for name in dir(builtins):
+            self.symbols.bind(name, None)
 
 
     '''
     Main function which analyzes the given AST node. An AST is considered an AST node in itself.
 
-    @rtype: tuple
-    @returns: AST node
+    Nodes are visited by NodeVisitor.visit without recursion, each node after its children,
+    and checked in place: the AST is not copied, and the results of the analysis are recorded
+    in the symbols, bindings and call_targets tables instead.
+
+    Names are resolved on the scopes of the module, classes and functions enclosing them.
+    Names used inside a function can be bound after the function, so the ones not bound
+    yet are checked again when the function scope is left, and at the end of the module.
+
+    @raise TypeError: if the AST node is not valid
+    @raise ValueError: if the number of arguments for a function is not correct
+    @raise ValueError: if a function, class or variable is not defined
+
+    @rtype: Program
+    @returns: the analyzed AST, unchanged
     '''
     def analyze(self):
-        return self.visit(self.ast)
+        self.symbols.enter(MODULE_SCOPE)
+        self.visit(self.ast)
+        self.leave_scope()
+        return self.ast
+
+
+    # children of each node type, visited before the node, opening the scopes of classes and functions
+
+    def children_PROGRAM(self, node):
+        return node.statements
+
+    def children_ASSIGNMENT(self, node):
+        return [node.value]
+
+    def children_CLASS_ASSIGNMENT(self, node):
+        return [node.class_name] + node.arguments
+
+    def children_ATRIBUTE_ACCESS(self, node):
+        # attribute names are not resolved, only the target and the arguments of the called attributes
+        children = [node.target]
+        for attribute in node.attributes:
+            if attribute.kind == 'FUNCTION_CALL':
+                children.extend(attribute.arguments)
+        return children
+
+    def children_IF_STATEMENT(self, node):
+        return [node.condition] + node.body
+
+    def children_ELSE_STATEMENT(self, node):
+        return node.body
+
+    def children_FOR_LOOP(self, node):
+        self.bind(node.identifier.value, node)
+        return [node.iterable] + node.body
+
+    def children_WHILE_LOOP(self, node):
+        return [node.condition] + node.body
+
+    def children_CLASS_DECLARATION(self, node):
+        if node.parent is not None:
+            self.reference(node.parent.value, node.parent)
+        self.symbols.enter(CLASS_SCOPE)
+        return node.body
+
+    def children_FUNCTION_DEFINITION(self, node):
+        if self.symbols.scope.kind == CLASS_SCOPE:
+            self.methods[node.name.value] = node
+        self.symbols.enter(FUNCTION_SCOPE)
+        for parameter in node.parameters:
+            self.bind(parameter.value, parameter)
+        return node.body
+
+    def children_FUNCTION_CALL(self, node):
+        return node.arguments
+
+    def children_RETURNED(self, node):
+        return [node.value]
+
+    def children_OPERATION(self, node):
+        return [node.left, node.right]
+
+    def children_NOT_EXPRESSION(self, node):
+        return [node.operand]
+
+    def children_AS(self, node):
+        return [node.expression]
+
+    children_SELF_ASSIGNMENT = children_ASSIGNMENT
+    children_SELF_CLASS_ASSIGNMENT = children_CLASS_ASSIGNMENT
+    children_ATTRIBUTE_ACCESS = children_ATRIBUTE_ACCESS
+    children_SELF_ATTRIBUTE_ACCESS = children_ATRIBUTE_ACCESS
+    children_ELIF_STATEMENT = children_IF_STATEMENT
+    children_SELF_FUNCTION_CALL = children_FUNCTION_CALL
+    children_LOGICAL_EXPRESSION = children_OPERATION
+    children_COMPARISON_EXPRESSION = children_OPERATION
+
+
+    # analysis of each node type, once its children are analyzed
+
+    def leave_IMPORT(self, node, results):
+        imported = node.imported
+        if imported.kind == 'AS':
+            imported = imported.identifier
+        while not isinstance(imported, Leaf):
+            imported = imported.target
+        self.bind(imported.value, node)
+
+    def leave_ASSIGNMENT(self, node, results):
+        self.bind(node.identifier.value, node)
+
+    def leave_ATRIBUTE_ACCESS(self, node, results):
+        for attribute in node.attributes:
+            if attribute.kind == 'FUNCTION_CALL' and isinstance(attribute.function, Leaf):
+                method = self.methods.get(attribute.function.value)
+                if method is not None:
+                    self.resolve(attribute, method)
+
+    def leave_CLASS_DECLARATION(self, node, results):
+        self.leave_scope()
+        self.bind(node.name.value, node)
+
+    def leave_FUNCTION_CALL(self, node, results):
+        function_name = node.function
+        if function_name.kind == 'SELF_IDENTIFIER':
+            method = self.methods.get(function_name.value[len('self.'):])
+            if method is not None:
+                self.resolve(node, method)
+        elif isinstance(function_name, Leaf):
+            self.reference(function_name.value, node)
+        else:
+            raise ValueError(f"Undefined function: {function_name}")
+
+    def leave_IDENTIFIER(self, node, results):
+        self.reference(node.value, node)
+
+    def leave_NUMBER(self, node, results):
+        return None
+
+    leave_SELF_ASSIGNMENT = leave_NUMBER
+    leave_CLASS_ASSIGNMENT = leave_ASSIGNMENT
+    leave_SELF_CLASS_ASSIGNMENT = leave_NUMBER
+    leave_ATTRIBUTE_ACCESS = leave_ATRIBUTE_ACCESS
+    leave_SELF_ATTRIBUTE_ACCESS = leave_ATRIBUTE_ACCESS
+    leave_FUNCTION_DEFINITION = leave_CLASS_DECLARATION
+    leave_CLASS_IDENTIFIER = leave_IDENTIFIER
+    leave_PROGRAM = leave_NUMBER
+    leave_AS = leave_NUMBER
+    leave_IF_STATEMENT = leave_NUMBER
+    leave_ELIF_STATEMENT = leave_NUMBER
+    leave_ELSE_STATEMENT = leave_NUMBER
+    leave_FOR_LOOP = leave_NUMBER
+    leave_WHILE_LOOP = leave_NUMBER
+    leave_SELF_FUNCTION_CALL = leave_NUMBER
+    leave_RETURNED = leave_NUMBER
+    leave_OPERATION = leave_NUMBER
+    leave_LOGICAL_EXPRESSION = leave_NUMBER
+    leave_COMPARISON_EXPRESSION = leave_NUMBER
+    leave_NOT_EXPRESSION = leave_NUMBER
+    leave_STRING = leave_NUMBER
+    leave_SELF_IDENTIFIER = leave_NUMBER
+    leave_NONE = leave_NUMBER
+    leave_TRUE = leave_NUMBER
+    leave_FALSE = leave_NUMBER
+    leave_PASS = leave_NUMBER
+    leave_SELF = leave_NUMBER
 
 
     '''
-    Visit the given AST node, and if required, store the node values on the current program global symbols.
+    Bind a name on the current scope to the node defining it.
 
-    @raise TypeError: if the AST node is not valid
-    @raise ValueError: if the number of arguments for a function is not correct
-    @raise ValueError: if a function is not defined
+    @type name: str
+    @param name: bound name
+
+    @type node: Node
+    @param node: node defining the name
+    '''
+    def bind(self, name, node):
+        self.symbols.bind(name, node)
+        self.bindings[node] = name
 
-    @type node: tuple
-    @param node: AST node
 
-    @rtype: tuple
-    @returns: AST node
     '''
-    def visit(self, node):
-        
-        node_type = node[0]
-
-        #print(str(node) + '\n')
-        
-        if node_type == 'PROGRAM':
-            statements = []
-            for statement in node[1]:
-                statements.append(self.visit(statement))
-            return ('PROGRAM', statements)
-        
-        elif node_type == 'IMPORT':
-            body = node[1]
-            return ('IMPORT', body)
-
-        elif node_type == 'ASSIGNMENT':
-            identifier = node[1]
-            value = self.visit(node[2])
-            self.symbols[identifier] = value
-            return ('ASSIGNMENT', identifier, value)
-
-        elif node_type == 'SELF_ASSIGNMENT':
-            identifier = node[1]
-            value = self.visit(node[2])
-            self.symbols[identifier] = value
-            return ('SELF_ASSIGNMENT', identifier, value)
-
-        elif node_type == 'CLASS_ASSIGNMENT':
-            identifier = node[1]
-            class_identifier = node[2]
-            arguments = []
-            for argument in node[3]:
-                arguments.append(self.visit(argument))
-            self.symbols[identifier] = (class_identifier, arguments)
-            return ('CLASS_ASSIGNMENT', identifier, class_identifier, arguments)
-
-        elif node_type == 'ATRIBUTE_ACCESS':
-            identifier = node[1]
-            body = []
-            for statement in node[2]:
-                body.append(self.visit(statement))
-            self.symbols[identifier] = body
-            return ('ATRIBUTE_ACCESS', identifier, body)
-
-        elif node_type == 'IF_STATEMENT':
-            if_condition = self.visit(node[1])
-            if_body = []
-            for statement in node[2]:
-                if_body.append(self.visit(statement))
-            return ('IF_STATEMENT', if_condition, if_body)
-
-        elif node_type == 'ELIF_STATEMENT':
-            elif_condition = self.visit(node[1])
-            elif_body = []
-            for statement in node[2]:
-                elif_body.append(self.visit(statement))
-            return ('ELIF_STATEMENT', elif_condition, elif_body)
-
-        elif node_type == 'ELSE_STATEMENT':
-            else_body = []
-            for statement in node[1]:
-                else_body.append(self.visit(statement))
-            return ('ELSE_STATEMENT', else_body)
-        
-        elif node_type == 'FOR_LOOP':
-            identifier = node[1]
-            iterable = self.visit(node[2])
-            body = self.visit(node[3])
-            return ('FOR_LOOP', identifier, iterable, body)
-        
-        elif node_type == 'WHILE_LOOP':
-            condition = self.visit(node[1])
-            body = []
-            for statement in node[2]:
-                body.append(self.visit(statement))
-            return ('WHILE_LOOP', condition, body)
-        
-        elif node_type == 'CLASS_DECLARATION':
-            class_name = node[1]
-            parent_class = node[2]
-            body = []
-            for statement in node[3]:
-                body.append(self.visit(statement))
-            self.symbols[class_name] = (parent_class, body)
-            return ('CLASS_DECLARATION', class_name, parent_class, body)
-        
-        elif node_type == 'FUNCTION_DEFINITION':
-            function_name = node[1]
-            parameters = node[2]
-            body = []
-            for statement in node[3]:
-                body.append(self.visit(statement))
-            self.symbols[function_name] = (parameters, body)
-            return ('FUNCTION_DEFINITION', function_name, parameters, body)
-        
-        elif node_type == 'FUNCTION_CALL':
-            function_name = node[1]
-            arguments = []
-            for argument in node[2]:
-                arguments.append(self.visit(argument))
-            if function_name[1] == 'print':
-                #return self.call_function(function, arguments)
-                return node
-            if function_name in self.symbols:
-                function = self.symbols[function_name]
-                if ('SELF', 'self') in function[0]:
-                    if len(arguments) == len(function[0]) - 1:
-                        #return self.call_function(function, arguments)
-                        return node
-                    else:
-                        raise ValueError(f"Invalid number of arguments for class function {function_name}")
+    Resolve a name referenced by a node. Names not bound yet inside a function are
+    deferred to the end of the function scope, as they can be bound later.
+
+    @raise ValueError: if the name is not defined, or the number of arguments of a call is not correct
+
+    @type name: str
+    @param name: referenced name
+
+    @type node: Node
+    @param node: identifier or function call node referencing the name
+    '''
+    def reference(self, name, node):
+        binding = self.symbols.lookup(name)
+        if binding is not None:
+            self.resolve(node, binding[1])
+            return
+        scope = self.symbols.scope
+        while scope.kind != FUNCTION_SCOPE:
+            scope = scope.parent
+            if scope is None:
+                self.raise_undefined(node)
+        scope.deferred.append((name, node))
+
+
+    '''
+    Close the current scope, resolving the references deferred to it. References still not bound
+    are deferred to the enclosing function scope, or to the module scope.
+
+    @raise ValueError: if a deferred name is not defined at the end of the module
+    '''
+    def leave_scope(self):
+        scope = self.symbols.scope
+        if scope.deferred:
+            enclosing = scope.parent
+            while enclosing.kind not in (FUNCTION_SCOPE, MODULE_SCOPE, BUILTIN_SCOPE):
+                enclosing = enclosing.parent
+            for name, node in scope.deferred:
+                binding = self.symbols.lookup(name)
+                if binding is not None:
+                    self.resolve(node, binding[1])
+                elif scope.kind == MODULE_SCOPE:
+                    self.raise_undefined(node)
                 else:
-                    if len(arguments) == len(function[0]):
-                        #return self.call_function(function, arguments)
-                        return node
-                    else:
-                        raise ValueError(f"Invalid number of arguments for function {function_name}")
-            else:
-                raise ValueError(f"Undefined function: {function_name}")
-
-        elif node_type == 'RETURNED':
-            returned = self.visit(node[1])
-            return ('RETURNED', returned)
-        
-        elif node_type == 'OPERATION':
-            operator = node[1]
-            left = self.visit(node[2])
-            right = self.visit(node[3])
-            return ('OPERATION', operator, left, right)
-
-        elif node_type == 'LOGICAL_EXPRESSION':
-            operator = node[1]
-            left = self.visit(node[2])
-            right = self.visit(node[3])
-            return ('LOGICAL_EXPRESSION', operator, left, right)
-
-        elif node_type == 'COMPARISON_EXPRESSION':
-            operator = node[1]
-            left = self.visit(node[2])
-            right = self.visit(node[3])
-            return ('COMPARISON_EXPRESSION', operator, left, right)
-        
-        elif node_type in ('NUMBER', 'STRING', 'IDENTIFIER', 'SELF_IDENTIFIER'):
-            '''
-            if node_type in ('IDENTIFIER', 'SELF_IDENTIFIER'):
-                identifier = node[1]
-                if identifier not in self.symbols:
-                    raise ValueError(f"Undefined variable: {identifier}")
-            '''
-            return node
-        
-        else:
-            raise TypeError(f"Invalid node type: {node_type}")
+                    enclosing.deferred.append((name, node))
+        self.symbols.leave()
 
 
     '''
-    (EXPERIMENTAL)
+    Record the node defining the name referenced by a node, checking the number of
+    arguments of function calls.
+
+    @raise ValueError: if the number of arguments for a function is not correct
+
+    @type node: Node
+    @param node: identifier or function call node
+
+    @type definition: Node
+    @param definition: node defining the name, None for builtin names
+    '''
+    def resolve(self, node, definition):
+        if node.kind != 'FUNCTION_CALL':
+            return
+        self.call_targets[node] = definition
+        if definition is not None and definition.kind == 'FUNCTION_DEFINITION':
+            parameters = definition.parameters
+            if any(parameter.kind == 'SELF' for parameter in parameters):
+                if len(node.arguments) != len(parameters) - 1:
+                    raise ValueError(f"Invalid number of arguments for class function {node.function}")
+            elif len(node.arguments) != len(parameters):
+                raise ValueError(f"Invalid number of arguments for function {node.function}")
 
-    Simulates the execution of the code inside a function, merging its local symbols
-    with the global symbols, and checking for runTime errors.
 
-    @type function: tuple
-    @param function: function definition in the global symbols
+    '''
+    Raises the error of a name referenced by a node not being defined.
 
-    @type arguments: list
-    @param arguments: arguments passed to the function on its calling
+    @raise ValueError: always
 
-    @rtype: list
-    @returns: list of analyzed statements inside the functions body
+    @type node: Node
+    @param node: identifier or function call node
     '''
-    def call_function(self, function, arguments):
-        analyzer = SemanticAnalyzer()
-        parameters = function[1]
-        body = function[2]
-        local_symbols = {}
-        for param, arg in zip(parameters, arguments):
-            local_symbols[param] = arg
-        #print('local symbols: ' + str(local_symbols) + '\n')
-        analyzer.symbols = {**self.symbols, **local_symbols}
-        #print('merged symbols: ' + str(analyzer.symbols) + '\n')
-        statements = []
-        for statement in body:
-            statements.append(analyzer.visit(statement))
-        return statements
\ No newline at end of file
+    def raise_undefined(self, node):
+        if node.kind == 'FUNCTION_CALL':
+            raise ValueError(f"Undefined function: {node.function}")
+        elif node.kind == 'CLASS_IDENTIFIER':
+            raise ValueError(f"Undefined class: {node.value}")
+        raise ValueError(f"Undefined variable: {node.value}")
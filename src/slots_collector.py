@@ -0,0 +1,117 @@
+from optimizer import scope_names
+'''
+Collects the attributes the methods of each top-level class assign on self, so the class can
+be generated with __slots__, and its instances keep their attributes in fixed slots instead of
+a per-instance __dict__, taking less memory and being accessed faster.
+
+The language only assigns attributes on self, so the attributes of the instances of a class are
+the ones its methods and the methods of its compiled parent classes assign. Each class declares
+the slots of the attributes its compiled parent classes do not declare. Classes are not given
+slots if any attribute is also a name of the class body or of a compiled parent class body, such
+as a method or a class variable, or if any function other than a method of a top-level class
+assigns attributes on self, as its class would not be known. Methods are assumed to be called
+on instances of their class. Instances with slots cannot be weakly referenced.
+
+@author Nicolás Rodrigo Pèrez
+@date 17-10-2026
+@version 1.0
+'''
+
+# statements assigning their identifier, which is an attribute of self when it is a SELF_IDENTIFIER
+ASSIGNMENT_STATEMENTS = ('SELF_ASSIGNMENT', 'SELF_CLASS_ASSIGNMENT', 'FOR_LOOP')
+
+
+class SlotsCollector:
+
+
+    '''
+    Create new SlotsCollector object.
+
+    @type ast: Program
+    @param ast: an analyzed AST
+    '''
+    def __init__(self, ast):
+        self.ast = ast
+
+
+    '''
+    Main function which gives the slots of each top-level class declaration of the AST
+    whose attributes can all be stored in slots.
+
+    @rtype: dict
+    @returns: list of the slots of each class given slots, indexed by class name
+    '''
+    def collect(self):
+        statements = self.ast.statements
+        module_names = scope_names(statements)
+        classes = {}
+        for statement in statements:
+            if statement.kind == 'CLASS_DECLARATION' and module_names.count(statement.name.value) == 1:
+                classes[statement.name.value] = statement
+        methods = set(method for declaration in classes.values() for method in declaration.body
+                      if method.kind == 'FUNCTION_DEFINITION')
+        if self.assigns_foreign_attributes(methods):
+            return {}
+
+        attributes = {name: self.class_attributes(declaration) for name, declaration in classes.items()}
+        class_names = {name: set(scope_names(declaration.body)) for name, declaration in classes.items()}
+        slots = {}
+        for name, declaration in classes.items():
+            inherited = set()
+            inherited_names = set()
+            ancestor = declaration.parent.value if declaration.parent is not None else None
+            seen = {name}
+            while ancestor in classes and ancestor not in seen:
+                seen.add(ancestor)
+                inherited |= attributes[ancestor]
+                inherited_names |= class_names[ancestor]
+                parent = classes[ancestor].parent
+                ancestor = parent.value if parent is not None else None
+            if not attributes[name].isdisjoint(class_names[name] | inherited_names):
+                continue
+            declaration.slots = sorted(attributes[name] - inherited)
+            slots[name] = declaration.slots
+        return slots
+
+
+    '''
+    Check if any statement outside the given methods assigns an attribute on self.
+
+    @type methods: set
+    @param methods: FUNCTION_DEFINITION nodes of the methods of the top-level classes
+
+    @rtype: bool
+    @returns: true if an attribute is assigned on self outside the methods
+    '''
+    def assigns_foreign_attributes(self, methods):
+        # (statement, true if it is inside one of the methods) pairs
+        statements = [(statement, False) for statement in self.ast.statements]
+        while statements:
+            statement, in_method = statements.pop()
+            if not in_method and statement.kind in ASSIGNMENT_STATEMENTS and statement.identifier.kind == 'SELF_IDENTIFIER':
+                return True
+            if statement.kind == 'FUNCTION_DEFINITION':
+                # nested functions bind their own self
+                in_method = statement in methods
+            statements.extend((child, in_method) for child in getattr(statement, 'body', ()))
+        return False
+
+
+    '''
+    Get the attributes the methods of the given class assign on self.
+
+    @type declaration: Node
+    @param declaration: CLASS_DECLARATION node
+
+    @rtype: set
+    @returns: set of attribute names
+    '''
+    def class_attributes(self, declaration):
+        attributes = set()
+        statements = [method for method in declaration.body if method.kind == 'FUNCTION_DEFINITION']
+        while statements:
+            statement = statements.pop()
+            if statement.kind in ASSIGNMENT_STATEMENTS and statement.identifier.kind == 'SELF_IDENTIFIER':
+                attributes.add(statement.identifier.value.split('.')[1])
+            statements.extend(getattr(statement, 'body', ()))
+        return attributes
@@ -0,0 +1,151 @@
+'''
+Scoped symbol table, holding the bindings of the names of the builtin, module, class
+and function scopes being analyzed.
+
+Names are interned to integer ids, and each name id keeps the stack of its bindings on the
+open scopes, the innermost one last (shallow binding). Entering a scope copies nothing,
+leaving it pops the bindings made on it, and resolving a name only reads its last binding,
+unless the binding belongs to a class scope the name is not resolved from.
+
+@author Nicolás Rodrigo Pèrez
+@date 17-10-2026
+@version 1.0
+'''
+
+BUILTIN_SCOPE = 'builtin'
+MODULE_SCOPE = 'module'
+CLASS_SCOPE = 'class'
+FUNCTION_SCOPE = 'function'
+
+
+'''
+Scope opened on the symbol table.
+'''
+class Scope:
+
+    __slots__ = ('kind', 'parent', 'name_ids', 'deferred')
+
+
+    '''
+    Create new Scope object.
+
+    @type kind: str
+    @param kind: BUILTIN_SCOPE, MODULE_SCOPE, CLASS_SCOPE or FUNCTION_SCOPE
+
+    @type parent: Scope
+    @param parent: enclosing scope, or None
+    '''
+    def __init__(self, kind, parent):
+        self.kind = kind
+        self.parent = parent
+        # ids of the names bound on the scope
+        self.name_ids = []
+        # references which could not be resolved yet, checked when the scope is left
+        self.deferred = []
+
+
+class SymbolTable:
+
+
+    '''
+    Create new SymbolTable object, with no open scopes.
+    '''
+    def __init__(self):
+        self.name_ids = {}
+        self.names = []
+        # stack of [scope, node] bindings of each name id
+        self.bindings = []
+        self.scope = None
+
+
+    '''
+    Get the id of the given name, interning it if it has no id yet.
+
+    @type name: str
+    @param name: name
+
+    @rtype: int
+    @returns: name id
+    '''
+    def intern(self, name):
+        name_id = self.name_ids.get(name)
+        if name_id is None:
+            name_id = len(self.names)
+            self.name_ids[name] = name_id
+            self.names.append(name)
+            self.bindings.append([])
+        return name_id
+
+
+    '''
+    Open a new scope inside the current one.
+
+    @type kind: str
+    @param kind: BUILTIN_SCOPE, MODULE_SCOPE, CLASS_SCOPE or FUNCTION_SCOPE
+
+    @rtype: Scope
+    @returns: the opened scope
+    '''
+    def enter(self, kind):
+        self.scope = Scope(kind, self.scope)
+        return self.scope
+
+
+    '''
+    Close the current scope, removing the bindings made on it.
+
+    @rtype: Scope
+    @returns: the closed scope
+    '''
+    def leave(self):
+        scope = self.scope
+        bindings = self.bindings
+        for name_id in scope.name_ids:
+            bindings[name_id].pop()
+        self.scope = scope.parent
+        return scope
+
+
+    '''
+    Bind the given name on the current scope, replacing its previous binding on the scope.
+
+    @type name: str
+    @param name: bound name
+
+    @type node: Node
+    @param node: node the name is bound to, None for builtin names
+
+    @rtype: int
+    @returns: name id
+    '''
+    def bind(self, name, node):
+        name_id = self.intern(name)
+        stack = self.bindings[name_id]
+        if stack and stack[-1][0] is self.scope:
+            stack[-1][1] = node
+        else:
+            stack.append([self.scope, node])
+            self.scope.name_ids.append(name_id)
+        return name_id
+
+
+    '''
+    Resolve the given name from the current scope. Bindings of class scopes are
+    only visible from the class scope itself, as in python.
+
+    @type name: str
+    @param name: resolved name
+
+    @rtype: list
+    @returns: the [scope, node] binding of the name, or None if the name is not bound
+    '''
+    def lookup(self, name):
+        name_id = self.name_ids.get(name)
+        if name_id is None:
+            return None
+        stack = self.bindings[name_id]
+        for index in range(len(stack) - 1, -1, -1):
+            binding = stack[index]
+            if binding[0].kind != CLASS_SCOPE or binding[0] is self.scope:
+                return binding
+        return None
@@ -0,0 +1,82 @@
+import io
+import contextlib
+from compiler import Compiler
+'''
+Runs programs which the optimizer once changed the behavior of, checking that the optimized
+code prints the same output, or fails with the same error, as the code compiled without it.
+
+@author Nicolás Rodrigo Pèrez
+@date 17-10-2026
+@version 1.0
+'''
+
+# (name, source code) of the programs checked
+REGRESSIONS = [
+    ('invariant of a for loop running no iteration', '''import sys
+
+def h(a, b, n):
+    t = 0
+    for i in range(n):
+        t = t + a * b
+    return t
+
+x = sys.argv
+r = h(x, x, 0)
+print(r)
+r = h(3, 4, 5)
+print(r)
+'''),
+    ('invariant of a branch not taken', '''a = "x"
+b = 1
+flag = 0
+i = 0
+n = 3
+while i < n:
+    if flag == 1:
+        y = a + b
+    i = i + 1
+print(i)
+'''),
+    ('temporaries of a call inlined on the module', '''import sys
+
+def f(a):
+    b = a + 1
+    return b
+
+a = sys.argv
+n = len(a)
+r = f(n)
+g = globals()
+k = sorted(g)
+print(k)
+''')
+]
+
+
+'''
+Compile and run the given source code, capturing what it prints and the error it fails with.
+
+@type source_code: str
+@param source_code: source code to run
+
+@type optimize: bool
+@param optimize: true to run the optimizer
+
+@rtype: str
+@returns: printed output, followed by the name of the error if any
+'''
+def run(source_code, optimize):
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        try:
+            exec(Compiler(0, optimize).compile(source_code), {})
+        except Exception as exception:
+            print(exception.__class__.__name__)
+    return output.getvalue()
+
+
+for name, source_code in REGRESSIONS:
+    expected = run(source_code, False)
+    actual = run(source_code, True)
+    assert actual == expected, f'{name}: {actual!r} != {expected!r}'
+    print(f'ok {name}')
@@ -0,0 +1,137 @@
+from array import array
+'''
+Compact storage for the tokens of a source code, using integer token kinds
+and parallel arrays instead of a list of tuples.
+
+@author Nicolás Rodrigo Pèrez
+@date 17-10-2026
+@version 1.0
+'''
+
+# interned token kinds, the code of a kind being its position on the list
+TOKEN_KINDS = [
+    'IF', 'ELIF', 'ELSE', 'FOR', 'IN', 'WHILE', 'CLASS', 'DEF', 'RETURN', 'IMPORT', 'AS',
+    'TRUE', 'FALSE', 'NONE', 'PASS', 'AND', 'OR', 'NOT', 'CLASS_IDENTIFIER', 'IDENTIFIER',
+    'WALRUS', 'EQUALS', 'ASSIGN', 'NOT_EQUALS', 'GREATER_THAN_EQUAL', 'GREATER_THAN',
+    'LESS_THAN_EQUAL', 'LESS_THAN', 'NUMBER', 'STRING', 'ADD', 'SUBTRACT', 'MULTIPLY',
+    'DIVIDE', 'LEFT_PAREN', 'RIGHT_PAREN', 'LEFT_BRACKET', 'RIGHT_BRACKET', 'LEFT_BRACE',
+    'RIGHT_BRACE', 'DOT', 'COMMA', 'COLON', 'SLASH', 'INDENT', 'DEDENT'
+]
+KIND_CODES = {kind: code for code, kind in enumerate(TOKEN_KINDS)}
+INDENT = KIND_CODES['INDENT']
+DEDENT = KIND_CODES['DEDENT']
+
+
+'''
+Get the integer code of a token kind, registering it if it is a new kind.
+
+@type kind: str
+@param kind: token kind
+
+@rtype: int
+@returns: integer code of the token kind
+'''
+def intern_kind(kind):
+    code = KIND_CODES.get(kind)
+    if code is None:
+        code = len(TOKEN_KINDS)
+        TOKEN_KINDS.append(kind)
+        KIND_CODES[kind] = code
+    return code
+
+
+'''
+Holds the tokens of a source code in parallel arrays of kind codes, lines, columns
+and start and end offsets into the source code. Token values are not stored,
+but sliced from the source code when requested.
+
+INDENT and DEDENT tokens have no text on the source code, so their column
+holds their indentation level, which is their value.
+'''
+class TokenBuffer:
+
+
+    '''
+    Create new empty TokenBuffer object.
+
+    @type source_code: str
+    @param source_code: string the tokens are read from
+    '''
+    def __init__(self, source_code):
+        self.source_code = source_code
+        self.kinds = array('H')
+        self.lines = array('I')
+        self.columns = array('I')
+        self.starts = array('I')
+        self.ends = array('I')
+
+
+    '''
+    Add a new token at the end of the buffer.
+
+    @type kind: int
+    @param kind: token kind code
+
+    @type line: int
+    @param line: line of the token
+
+    @type column: int
+    @param column: column of the token, or indentation level for INDENT and DEDENT tokens
+
+    @type start: int
+    @param start: offset of the first char of the token on the source code
+
+    @type end: int
+    @param end: offset after the last char of the token on the source code
+    '''
+    def append(self, kind, line, column, start, end):
+        self.kinds.append(kind)
+        self.lines.append(line)
+        self.columns.append(column)
+        self.starts.append(start)
+        self.ends.append(end)
+
+
+    '''
+    Get the value of a token, slicing it from the source code.
+
+    @type index: int
+    @param index: position of the token on the buffer
+
+    @rtype: str or int
+    @returns: token value, or indentation level for INDENT and DEDENT tokens
+    '''
+    def value(self, index):
+        if self.kinds[index] in (INDENT, DEDENT):
+            return self.columns[index]
+        return self.source_code[self.starts[index]:self.ends[index]]
+
+
+    '''
+    Get a token in the same tuple form returned by Lexer.tokenize.
+
+    @type index: int
+    @param index: position of the token on the buffer
+
+    @rtype: tuple
+    @returns: token
+    '''
+    def token(self, index):
+        return (TOKEN_KINDS[self.kinds[index]], self.value(index), self.lines[index])
+
+
+    def __len__(self):
+        return len(self.kinds)
+
+
+    def __getitem__(self, index):
+        return self.token(index)
+
+
+    def __iter__(self):
+        for index in range(len(self.kinds)):
+            yield self.token(index)
+
+
+    def __repr__(self):
+        return repr(list(self))